@@ -1,6 +1,6 @@
 """CLI main entry point"""
 
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import typer
 from rich.console import Console
@@ -142,6 +142,155 @@ def dqr_analyze(
         console.print(f"📄 Would generate JSON summary: {json_output}")
 
 
+# Cache commands
+cache_app = typer.Typer(help="HTTP cache administration")
+app.add_typer(cache_app, name="cache")
+
+
+def _format_bytes(size: float) -> str:
+    """Format a byte count for display"""
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ["KB", "MB", "GB"]:
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            break
+    return f"{size:.1f} {unit}"
+
+
+def _open_cache(cache_dir: str):
+    """Open an on-disk HTTP cache without expiring or capping entries
+
+    The route policies the entries were cached under are not known here, so
+    nothing is evicted by TTL or entry count; only ``prune`` and ``clear``
+    remove entries.
+    """
+    from pydhis2.core.cache import HTTPCache
+    return HTTPCache(cache_dir=cache_dir, expire_entries=False, max_size=None)
+
+
+def _load_warm_requests(queries_file: str) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Load (endpoint, params) pairs from a warm-up YAML file
+
+    Each item under ``queries`` is either ``{endpoint, params}`` or
+    ``{analytics: {dx, ou, pe, ...}}``.
+    """
+    import yaml
+
+    from pydhis2.core.types import AnalyticsQuery
+
+    with open(queries_file, encoding="utf-8") as f:
+        spec = yaml.safe_load(f) or {}
+
+    requests = []
+    for item in spec.get("queries", []):
+        if "analytics" in item:
+            query = AnalyticsQuery(**item["analytics"])
+            requests.append(("/api/analytics", query.to_params()))
+        elif "endpoint" in item:
+            requests.append((item["endpoint"], item.get("params")))
+        else:
+            raise ValueError(f"Query must define 'endpoint' or 'analytics': {item}")
+    return requests
+
+
+@cache_app.command("stats")
+def cache_stats(
+    cache_dir: str = typer.Option(".pydhis2_cache", "--cache-dir", help="Cache directory"),
+    top: int = typer.Option(10, "--top", help="Number of routes to list"),
+):
+    """Show cache size, entry count, hit ratio and top routes"""
+    stats = _open_cache(cache_dir).get_stats(top=top)
+
+    console.print(f"Cache directory: {stats['cache_dir']}")
+    console.print(f"Entries: {stats['entries']}")
+    console.print(f"Size: {_format_bytes(stats['size_bytes'])}")
+    console.print(
+        f"Hit ratio: {stats['hit_ratio']:.1%} "
+        f"({stats['hits']} hits, {stats['misses']} misses)"
+    )
+    if stats['top_routes']:
+        console.print("Top routes:")
+        for route in stats['top_routes']:
+            console.print(
+                f"   {route['route']}: {route['entries']} entries, "
+                f"{_format_bytes(route['bytes'])}, {route['hits']} hits"
+            )
+
+
+@cache_app.command("prune")
+def cache_prune(
+    cache_dir: str = typer.Option(".pydhis2_cache", "--cache-dir", help="Cache directory"),
+    max_age: Optional[float] = typer.Option(None, "--max-age", help="Evict entries older than this many seconds"),
+    max_bytes: Optional[int] = typer.Option(None, "--max-bytes", help="Evict oldest entries until the cache fits in this many bytes"),
+):
+    """Evict cache entries by age or total size"""
+    result = _open_cache(cache_dir).prune(max_age=max_age, max_bytes=max_bytes)
+    console.print(
+        f"✓ Removed {result['removed']} entries, freed {_format_bytes(result['freed_bytes'])} "
+        f"({result['remaining']} remaining)"
+    )
+
+
+@cache_app.command("clear")
+def cache_clear(
+    cache_dir: str = typer.Option(".pydhis2_cache", "--cache-dir", help="Cache directory"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Do not ask for confirmation"),
+):
+    """Remove all cache entries"""
+    import asyncio
+
+    if not yes and not typer.confirm(f"Remove all cache entries in {cache_dir}?"):
+        raise typer.Abort()
+
+    cache = _open_cache(cache_dir)
+    count = len(cache._memory_cache)
+    asyncio.run(cache.clear())
+    console.print(f"✓ Cleared {count} cache entries")
+
+
+@cache_app.command("warm")
+def cache_warm(
+    queries_file: str = typer.Option(..., "--queries", help="YAML file with the queries to pre-fetch"),
+    url: str = typer.Option(..., "--url", help="DHIS2 base URL"),
+    cache_dir: str = typer.Option(".pydhis2_cache", "--cache-dir", help="Cache directory"),
+    concurrency: int = typer.Option(4, "--concurrency", help="Concurrent requests"),
+    rps: float = typer.Option(5.0, "--rps", help="Requests per second"),
+    username: Optional[str] = typer.Option(None, "--username", help="Username"),
+    password: Optional[str] = typer.Option(None, "--password", help="Password", hide_input=True),
+):
+    """Pre-fetch queries from a YAML file into the cache"""
+    import asyncio
+    import os
+
+    from pydhis2.core.client import AsyncDHIS2Client
+    from pydhis2.core.types import DHIS2Config
+
+    requests = _load_warm_requests(queries_file)
+    username = username or os.getenv("DHIS2_USERNAME")
+    password = password or os.getenv("DHIS2_PASSWORD")
+
+    config = DHIS2Config(
+        base_url=url,
+        auth=(username, password) if username and password else None,
+        cache_dir=cache_dir,
+        concurrency=concurrency,
+        rps=rps,
+    )
+
+    async def _warm():
+        # Warm through the CLI view of the cache so existing entries are kept
+        async with AsyncDHIS2Client(config, cache=_open_cache(cache_dir)) as client:
+            return await client.warm_cache(requests, concurrency=concurrency)
+
+    result = asyncio.run(_warm())
+    console.print(f"✓ Warmed {result['warmed']}/{result['requested']} queries")
+    for failure in result['failures']:
+        console.print(f"   Failed {failure['endpoint']}: {failure['error']}")
+    if result['failed']:
+        raise typer.Exit(code=1)
+
+
 # Demo commands
 demo_app = typer.Typer(help="Run demo scripts")
 app.add_typer(demo_app, name="demo")
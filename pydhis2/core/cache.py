@@ -6,14 +6,70 @@ import logging
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
-from urllib.parse import urlencode, urlparse
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlparse
 
 import aiofiles
 import aiohttp
 
+from pydhis2.core.types import CachePolicy
+
 logger = logging.getLogger(__name__)
 
+# Parameters whose values are DHIS2 dimension expressions ("dx:A;B")
+DIMENSION_PARAMS = frozenset({'dimension', 'filter'})
+
+# Parameter values equal to the server default; they never change the response
+NOOP_DEFAULT_PARAMS: Dict[str, str] = {
+    'outputIdScheme': 'UID',
+    'displayProperty': 'NAME',
+    'skipMeta': 'false',
+    'skipData': 'false',
+    'skipRounding': 'false',
+    'hierarchyMeta': 'false',
+    'ignoreLimit': 'false',
+}
+
+
+def _normalize_param_value(value: Any) -> str:
+    """Render a single parameter value the way it is sent on the wire"""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def _canonicalize_dimension(value: str) -> str:
+    """Sort the items of a dimension expression, e.g. ``dx:B;A`` -> ``dx:A;B``"""
+    dim, sep, items = value.partition(':')
+    # Leave anything that is not a plain "dim:item;item" expression untouched
+    # (metadata filters such as "name:eq:foo" use the same parameter name)
+    if not sep or ':' in items:
+        return value
+    return f"{dim}:{';'.join(sorted(items.split(';')))}"
+
+
+def canonicalize_params(params: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str]]:
+    """Convert request parameters to a canonical, order-independent list of pairs.
+
+    Multi-valued parameters are flattened and sorted, UIDs inside dimension
+    items are sorted, and parameters equal to the server default are dropped,
+    so semantically identical queries produce the same list.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        for item in values:
+            item = _normalize_param_value(item)
+            if NOOP_DEFAULT_PARAMS.get(key) == item:
+                continue
+            if key in DIMENSION_PARAMS:
+                item = _canonicalize_dimension(item)
+            pairs.append((key, item))
+
+    return sorted(set(pairs))
+
 
 @dataclass
 class CacheEntry:
@@ -61,12 +117,18 @@ class HTTPCache:
         self,
         cache_dir: Union[str, Path] = ".pydhis2_cache",
         ttl: int = 3600,  # Default 1 hour TTL
-        max_size: int = 100,  # Maximum number of cache entries
+        max_size: Optional[int] = 100,  # Maximum number of cache entries; None for no limit
+        route_policies: Optional[Dict[str, CachePolicy]] = None,
+        expire_entries: bool = True,
     ):
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl = ttl
         self.max_size = max_size
+        self.route_policies: Dict[str, CachePolicy] = dict(route_policies or {})
+        # Without the route policies entries were written under, TTLs are unknown;
+        # expire_entries=False keeps every entry until it is pruned by age or size
+        self.expire_entries = expire_entries
 
         # In-memory cache
         self._memory_cache: Dict[str, CacheEntry] = {}
@@ -74,8 +136,43 @@ class HTTPCache:
         # Cache index file
         self.index_file = self.cache_dir / "cache_index.json"
 
+        # Lookup statistics, accumulated across runs
+        self.stats_file = self.cache_dir / "cache_stats.json"
+        self._hits = 0
+        self._misses = 0
+        self._route_hits: Dict[str, int] = {}
+        self._stats_dirty = False
+
         # Load existing cache
         self._load_cache_index()
+        self._load_cache_stats()
+
+    def configure_route_policy(self, route_pattern: str, policy: CachePolicy) -> None:
+        """Configure the TTL and stale grace window for a route prefix"""
+        self.route_policies[route_pattern] = policy
+
+    def get_policy(self, url: str) -> Optional[CachePolicy]:
+        """Get the policy configured for a URL, matched by the longest route prefix"""
+        path = urlparse(url).path
+        matches = [pattern for pattern in self.route_policies if path.startswith(pattern)]
+        if not matches:
+            return None
+        return self.route_policies[max(matches, key=len)]
+
+    def _effective_policy(self, url: str) -> CachePolicy:
+        """Get the route policy for a URL, falling back to the global TTL"""
+        return self.get_policy(url) or CachePolicy(ttl=self.ttl)
+
+    def _is_retained(self, entry: CacheEntry) -> bool:
+        """Check whether an entry is still fresh or within its stale grace window"""
+        if not self.expire_entries:
+            return True
+        policy = self._effective_policy(entry.url)
+        return not entry.is_expired(policy.ttl + policy.stale_grace)
+
+    def is_stale(self, entry: CacheEntry) -> bool:
+        """Check whether an entry has outlived the TTL of its route"""
+        return entry.is_expired(self._effective_policy(entry.url).ttl)
 
     def _load_cache_index(self) -> None:
         """Load cache index"""
@@ -86,7 +183,7 @@ class HTTPCache:
 
                 for url, entry_data in index_data.items():
                     entry = CacheEntry.from_dict(entry_data)
-                    if not entry.is_expired(self.ttl):
+                    if self._is_retained(entry):
                         self._memory_cache[url] = entry
                     else:
                         # Clean up expired files
@@ -102,7 +199,7 @@ class HTTPCache:
             index_data = {
                 url: entry.to_dict()
                 for url, entry in self._memory_cache.items()
-                if not entry.is_expired(self.ttl)
+                if self._is_retained(entry)
             }
 
             with open(self.index_file, 'w', encoding='utf-8') as f:
@@ -111,17 +208,47 @@ class HTTPCache:
         except Exception as e:
             logger.warning(f"Failed to save cache index: {e}")
 
+    def _load_cache_stats(self) -> None:
+        """Load lookup statistics"""
+        if self.stats_file.exists():
+            try:
+                with open(self.stats_file, encoding='utf-8') as f:
+                    stats_data = json.load(f)
+                self._hits = stats_data.get('hits', 0)
+                self._misses = stats_data.get('misses', 0)
+                self._route_hits = stats_data.get('route_hits', {})
+            except Exception as e:
+                logger.warning(f"Failed to load cache stats: {e}")
+
+    def save_stats(self) -> None:
+        """Persist lookup statistics if they changed"""
+        if not self._stats_dirty:
+            return
+        try:
+            with open(self.stats_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'hits': self._hits,
+                    'misses': self._misses,
+                    'route_hits': self._route_hits,
+                }, f, indent=2)
+            self._stats_dirty = False
+        except Exception as e:
+            logger.warning(f"Failed to save cache stats: {e}")
+
     def _get_cache_key(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
-        """Generate cache key"""
-        if params:
-            # Add parameters to the URL
-            url_parts = urlparse(url)
-            query = urlencode(params, safe='')
-            if url_parts.query:
-                query = f"{url_parts.query}&{query}"
-            full_url = f"{url_parts.scheme}://{url_parts.netloc}{url_parts.path}?{query}"
-        else:
-            full_url = url
+        """Generate cache key from the canonical form of the URL and parameters"""
+        url_parts = urlparse(url)
+        merged: Dict[str, List[Any]] = {}
+        for key, value in parse_qsl(url_parts.query, keep_blank_values=True):
+            merged.setdefault(key, []).append(value)
+        for key, value in (params or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            merged.setdefault(key, []).extend(values)
+
+        query = urlencode(canonicalize_params(merged), safe='')
+        full_url = f"{url_parts.scheme}://{url_parts.netloc}{url_parts.path}"
+        if query:
+            full_url = f"{full_url}?{query}"
 
         # Use MD5 of the URL as the cache key
         return hashlib.md5(full_url.encode()).hexdigest()
@@ -133,15 +260,21 @@ class HTTPCache:
     async def get(
         self,
         url: str,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        allow_stale: bool = False,
     ) -> Optional[CacheEntry]:
-        """Get a cache entry"""
+        """Get a cache entry
+
+        With ``allow_stale``, an expired entry that is still inside the stale
+        grace window of its route is returned as well; use ``is_stale`` to
+        tell it apart from a fresh one.
+        """
         cache_key = self._get_cache_key(url, params)
 
         # Check in-memory cache
         if cache_key in self._memory_cache:
             entry = self._memory_cache[cache_key]
-            if not entry.is_expired(self.ttl):
+            if not self.is_stale(entry) or (allow_stale and self._is_retained(entry)):
                 # If it's a file cache, load the data
                 if entry.file_path and Path(entry.file_path).exists():
                     try:
@@ -150,15 +283,23 @@ class HTTPCache:
                             entry.data = json.loads(content)
                     except Exception as e:
                         logger.warning(f"Failed to load cached file {entry.file_path}: {e}")
+                        self._misses += 1
+                        self._stats_dirty = True
                         return None
 
+                self._hits += 1
+                self._stats_dirty = True
+                route = urlparse(entry.url).path
+                self._route_hits[route] = self._route_hits.get(route, 0) + 1
                 return entry
-            else:
+            elif not self._is_retained(entry):
                 # Clean up expired entry
                 del self._memory_cache[cache_key]
                 if entry.file_path and Path(entry.file_path).exists():
                     Path(entry.file_path).unlink()
 
+        self._misses += 1
+        self._stats_dirty = True
         return None
 
     async def set(
@@ -174,7 +315,8 @@ class HTTPCache:
         cache_key = self._get_cache_key(url, params)
 
         # Limit cache size
-        if len(self._memory_cache) >= self.max_size:
+        full = self.max_size is not None and len(self._memory_cache) >= self.max_size
+        if cache_key not in self._memory_cache and full:
             # Delete the oldest entry
             oldest_key = min(
                 self._memory_cache.keys(),
@@ -195,9 +337,11 @@ class HTTPCache:
             # Save to file
             file_path = self._get_file_path(cache_key)
             try:
+                content = json.dumps(data, ensure_ascii=False, indent=2)
                 async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(data, ensure_ascii=False, indent=2))
+                    await f.write(content)
                 entry.file_path = str(file_path)
+                entry.content_length = len(content.encode('utf-8'))
             except Exception as e:
                 logger.warning(f"Failed to save cache file: {e}")
                 entry.data = data
@@ -237,6 +381,99 @@ class HTTPCache:
         if self.index_file.exists():
             self.index_file.unlink()
 
+        self._hits = 0
+        self._misses = 0
+        self._route_hits = {}
+        self._stats_dirty = False
+        if self.stats_file.exists():
+            self.stats_file.unlink()
+
+    @staticmethod
+    def _entry_size(entry: CacheEntry) -> int:
+        """Size of an entry in bytes"""
+        if entry.file_path and Path(entry.file_path).exists():
+            return Path(entry.file_path).stat().st_size
+        if entry.content_length is not None:
+            return entry.content_length
+        if entry.data is not None:
+            return len(json.dumps(entry.data, ensure_ascii=False).encode('utf-8'))
+        return 0
+
+    def _remove_entry(self, cache_key: str) -> int:
+        """Remove an entry and its file, returning the bytes freed"""
+        entry = self._memory_cache.pop(cache_key)
+        size = self._entry_size(entry)
+        if entry.file_path and Path(entry.file_path).exists():
+            Path(entry.file_path).unlink()
+        return size
+
+    def prune(
+        self,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Evict expired entries, entries older than ``max_age`` seconds, and the
+        oldest entries until the cache fits in ``max_bytes``"""
+        removed = 0
+        freed_bytes = 0
+        now = time.time()
+
+        for cache_key, entry in list(self._memory_cache.items()):
+            too_old = max_age is not None and now - entry.timestamp > max_age
+            if too_old or not self._is_retained(entry):
+                freed_bytes += self._remove_entry(cache_key)
+                removed += 1
+
+        if max_bytes is not None:
+            by_age = sorted(self._memory_cache, key=lambda k: self._memory_cache[k].timestamp)
+            total_bytes = sum(self._entry_size(e) for e in self._memory_cache.values())
+            for cache_key in by_age:
+                if total_bytes <= max_bytes:
+                    break
+                size = self._remove_entry(cache_key)
+                total_bytes -= size
+                freed_bytes += size
+                removed += 1
+
+        self._save_cache_index()
+        return {
+            'removed': removed,
+            'freed_bytes': freed_bytes,
+            'remaining': len(self._memory_cache),
+        }
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Get size, entry count, hit ratio and the largest routes"""
+        routes: Dict[str, Dict[str, int]] = {}
+        total_bytes = 0
+        for entry in self._memory_cache.values():
+            size = self._entry_size(entry)
+            total_bytes += size
+            route = urlparse(entry.url).path
+            route_stats = routes.setdefault(route, {'entries': 0, 'bytes': 0})
+            route_stats['entries'] += 1
+            route_stats['bytes'] += size
+
+        top_routes = sorted(routes.items(), key=lambda item: item[1]['bytes'], reverse=True)[:top]
+        lookups = self._hits + self._misses
+        return {
+            'cache_dir': str(self.cache_dir),
+            'entries': len(self._memory_cache),
+            'size_bytes': total_bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_ratio': self._hits / lookups if lookups > 0 else 0,
+            'top_routes': [
+                {
+                    'route': route,
+                    'entries': route_stats['entries'],
+                    'bytes': route_stats['bytes'],
+                    'hits': self._route_hits.get(route, 0),
+                }
+                for route, route_stats in top_routes
+            ],
+        }
+
 
 class ResumableDownloader:
     """Resumable downloader"""
@@ -1,10 +1,12 @@
 """Core HTTP client - Async-first with connection pooling, retry, and rate limiting"""
 
 import asyncio
+import gzip
 import json
 import logging
 import time
-from typing import Any, Dict, List, Optional, Union
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
@@ -17,12 +19,13 @@ from pydhis2.core.errors import (
     DHIS2HTTPError,
     format_dhis2_error,
 )
+from pydhis2.core.planner import AdaptiveChunkSizer
 from pydhis2.core.rate_limit import GlobalRateLimiter
 from pydhis2.core.retry import RetryConfig, RetryManager
 from pydhis2.core.types import DHIS2Config
-from pydhis2.endpoints.analytics import AnalyticsEndpoint
+from pydhis2.endpoints.analytics import AnalyticsEndpoint, AnalyticsResultCache
 from pydhis2.endpoints.datavaluesets import DataValueSetsEndpoint
-from pydhis2.endpoints.metadata import MetadataEndpoint
+from pydhis2.endpoints.metadata import MetadataCache, MetadataEndpoint
 from pydhis2.endpoints.tracker import TrackerEndpoint
 
 logger = logging.getLogger(__name__)
@@ -41,6 +44,11 @@ class ClientMetrics:
         self.response_times: List[float] = []
         self.start_time = time.time()
 
+        # Request bodies encoded with request compression enabled
+        self.bodies_compressed = 0
+        self.body_bytes_raw = 0
+        self.body_bytes_sent = 0
+
     def record_request_start(self) -> None:
         """Record request start"""
         self.requests_total += 1
@@ -65,6 +73,12 @@ class ClientMetrics:
         self.retries_total += retries
         self.backoff_seconds_sum += backoff_time
 
+    def record_body(self, raw_size: int, sent_size: int, compressed: bool) -> None:
+        """Record an encoded request body"""
+        self.bodies_compressed += int(compressed)
+        self.body_bytes_raw += raw_size
+        self.body_bytes_sent += sent_size
+
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics"""
         uptime = time.time() - self.start_time
@@ -91,19 +105,24 @@ class ClientMetrics:
             'http_inflight': self.http_inflight,
             'avg_response_time': avg_response_time,
             'rps': self.requests_total / uptime if uptime > 0 else 0,
+            'bodies_compressed': self.bodies_compressed,
+            'body_bytes_raw': self.body_bytes_raw,
+            'body_bytes_sent': self.body_bytes_sent,
         }
 
 
 class AsyncDHIS2Client:
     """Async DHIS2 client"""
 
-    def __init__(self, config: DHIS2Config):
+    def __init__(self, config: DHIS2Config, cache: Optional[HTTPCache] = None):
+        """Create a client; ``cache`` replaces the HTTP cache built from the config"""
         self.config = config
         self.base_url = config.base_url
 
         # Internal state
         self._session: Optional[aiohttp.ClientSession] = None
         self._cached_session: Optional[CachedSession] = None
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
         self._closed = False
 
         # Component initialization
@@ -111,7 +130,7 @@ class AsyncDHIS2Client:
         self._init_auth()
         self._init_rate_limiter()
         self._init_retry_manager()
-        self._init_cache()
+        self._init_cache(cache)
 
         # Endpoints
         self.analytics: Optional[AnalyticsEndpoint] = None
@@ -155,13 +174,27 @@ class AsyncDHIS2Client:
         )
         self.retry_manager = RetryManager(config=retry_config)
 
-    def _init_cache(self) -> None:
+    def _init_cache(self, cache: Optional[HTTPCache] = None) -> None:
         """Initialize cache"""
-        if self.config.enable_cache:
-            self.cache = HTTPCache(ttl=self.config.cache_ttl)
+        if cache is not None:
+            self.cache = cache
+        elif self.config.enable_cache:
+            self.cache = HTTPCache(
+                cache_dir=self.config.cache_dir,
+                ttl=self.config.cache_ttl,
+                route_policies=self.config.cache_policies,
+            )
         else:
             self.cache = None
 
+        # Long-TTL tier for metadata, kept apart from the general cache
+        self.metadata_cache: Optional[MetadataCache] = None
+        if self.cache is not None and self.config.metadata_cache:
+            self.metadata_cache = MetadataCache(HTTPCache(
+                cache_dir=Path(self.config.cache_dir) / "metadata",
+                ttl=self.config.metadata_cache_ttl,
+            ))
+
     async def __aenter__(self):
         """Async context manager entry"""
         await self._create_session()
@@ -219,16 +252,48 @@ class AsyncDHIS2Client:
 
     def _init_endpoints(self) -> None:
         """Initialize endpoints"""
-        self.analytics = AnalyticsEndpoint(self)
-        self.datavaluesets = DataValueSetsEndpoint(self)
+        result_cache = None
+        if self.cache is not None and self.config.analytics_subquery_cache:
+            policy = self.cache._effective_policy(self._build_url('/api/analytics'))
+            result_cache = AnalyticsResultCache(ttl=policy.ttl)
+
+        chunk_sizer = None
+        if self.config.analytics_adaptive_chunking:
+            chunk_sizer = AdaptiveChunkSizer(target_latency=self.config.analytics_target_latency)
+
+        push_chunk_sizer = None
+        if self.config.push_adaptive_chunking:
+            push_chunk_sizer = AdaptiveChunkSizer(
+                initial_cells=5000,
+                min_cells=500,
+                max_cells=50_000,
+                target_latency=self.config.push_target_latency,
+                per_cell_tolerance=0.5
+            )
+
+        self.analytics = AnalyticsEndpoint(self, result_cache=result_cache, chunk_sizer=chunk_sizer)
+        self.datavaluesets = DataValueSetsEndpoint(self, chunk_sizer=push_chunk_sizer)
         self.tracker = TrackerEndpoint(self)
-        self.metadata = MetadataEndpoint(self)
+        self.metadata = MetadataEndpoint(self, metadata_cache=self.metadata_cache)
 
     async def close(self) -> None:
         """Close the client"""
         if self._closed:
             return
 
+        # Cancel background cache refreshes that are still in flight
+        refresh_tasks = list(self._refresh_tasks.values())
+        for task in refresh_tasks:
+            task.cancel()
+        if refresh_tasks:
+            await asyncio.gather(*refresh_tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
+
+        if self.cache is not None:
+            self.cache.save_stats()
+        if self.metadata_cache is not None:
+            self.metadata_cache.cache.save_stats()
+
         if self._session:
             await self._session.close()
             self._session = None
@@ -256,6 +321,24 @@ class AsyncDHIS2Client:
 
         return final_headers
 
+    def _encode_body(self, data: Union[Dict[str, Any], str]) -> Tuple[bytes, int, Dict[str, str]]:
+        """Serialize a request body, gzipping it from ``request_compression_min_bytes``
+
+        Returns the body, its uncompressed size and the content headers.
+        """
+        if isinstance(data, dict):
+            body = json.dumps(data).encode('utf-8')
+            headers = {'Content-Type': 'application/json'}
+        else:
+            body = data.encode('utf-8')
+            headers = {'Content-Type': 'text/plain; charset=utf-8'}
+
+        raw_size = len(body)
+        if raw_size >= self.config.request_compression_min_bytes:
+            body = gzip.compress(body, compresslevel=self.config.request_compression_level)
+            headers['Content-Encoding'] = 'gzip'
+        return body, raw_size, headers
+
     def _build_url(self, endpoint: str) -> str:
         """Build full URL"""
         if endpoint.startswith('http'):
@@ -307,6 +390,13 @@ class AsyncDHIS2Client:
                 message=f"Client error: {e}",
             ) from e
 
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Read a raw response body, raising on error statuses"""
+        if response.status >= 400:
+            # Raises the same errors as JSON requests
+            await self._handle_response(response)
+        return await response.read()
+
     async def _make_request(
         self,
         method: str,
@@ -314,9 +404,13 @@ class AsyncDHIS2Client:
         params: Optional[Dict[str, Any]] = None,
         data: Optional[Union[Dict[str, Any], str]] = None,
         headers: Optional[Dict[str, str]] = None,
+        raw_body: bool = False,
         **kwargs
-    ) -> Dict[str, Any]:
-        """Make an HTTP request (internal method with retry and rate limiting)"""
+    ) -> Union[Dict[str, Any], bytes]:
+        """Make an HTTP request (internal method with retry and rate limiting)
+
+        With ``raw_body`` the undecoded response body is returned.
+        """
         session = self._ensure_session()
         url = self._build_url(endpoint)
         parsed_url = urlparse(url)
@@ -328,6 +422,12 @@ class AsyncDHIS2Client:
 
         # Prepare request
         final_headers = await self._prepare_headers(headers)
+        body = None
+        if data is not None and self.config.request_compression:
+            # Serialized and compressed once, off the event loop, and reused by retries
+            body, raw_size, body_headers = await asyncio.to_thread(self._encode_body, data)
+            self.metrics.record_body(raw_size, len(body), 'Content-Encoding' in body_headers)
+            final_headers = {**body_headers, **final_headers}
 
         # Statistics
         self.metrics.record_request_start()
@@ -340,14 +440,16 @@ class AsyncDHIS2Client:
                     method=method,
                     url=url,
                     params=params,
-                    json=data if isinstance(data, dict) else None,
-                    data=data if isinstance(data, str) else None,
+                    json=data if isinstance(data, dict) and body is None else None,
+                    data=body if body is not None else (data if isinstance(data, str) else None),
                     headers=final_headers,
                     **kwargs
                 ) as response:
                     # Raise for status to trigger retry for specific error codes
                     if response.status in self.retry_manager.config.retry_on_status:
                         response.raise_for_status()
+                    if raw_body:
+                        return await self._read_body(response)
                     return await self._handle_response(response)
             except aiohttp.ClientError as e:
                 # Re-raise client errors so retry manager can catch them
@@ -385,11 +487,120 @@ class AsyncDHIS2Client:
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
+        use_cache: bool = True,
         **kwargs
     ) -> Dict[str, Any]:
-        """GET request"""
+        """GET request
+
+        Routes with a cache policy are answered from the HTTP cache. An entry
+        past its TTL but inside the stale grace window is returned immediately
+        while a single background request refreshes it.
+        """
+        if use_cache and self.cache is not None:
+            url = self._build_url(endpoint)
+            if self.cache.get_policy(url) is not None:
+                return await self._cached_get(url, params=params, headers=headers, **kwargs)
+
         return await self._make_request('GET', endpoint, params=params, headers=headers, **kwargs)
 
+    async def get_bytes(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> bytes:
+        """GET request returning the raw response body (e.g. CSV representations)"""
+        return await self._make_request(
+            'GET', endpoint, params=params, headers=headers, raw_body=True, **kwargs
+        )
+
+    async def _cached_get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """GET request served from the cache (stale-while-revalidate)"""
+        entry = await self.cache.get(url, params, allow_stale=True)
+        if entry is not None and entry.data is not None:
+            if self.cache.is_stale(entry):
+                self._schedule_refresh(url, params=params, headers=headers, **kwargs)
+            return entry.data
+
+        return await self._fetch_and_cache(url, params=params, headers=headers, **kwargs)
+
+    async def _fetch_and_cache(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Fetch from the server and store the response in the cache"""
+        data = await self._make_request('GET', url, params=params, headers=headers, **kwargs)
+        await self.cache.set(url, data, params=params)
+        return data
+
+    def _schedule_refresh(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> None:
+        """Start a background refresh for a stale entry, at most one per cache key"""
+        cache_key = self.cache._get_cache_key(url, params)
+        if cache_key in self._refresh_tasks:
+            return
+
+        async def _refresh():
+            try:
+                await self._fetch_and_cache(url, params=params, headers=headers, **kwargs)
+                logger.debug(f"Refreshed stale cache entry: {url}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {url}: {e}")
+
+        task = asyncio.create_task(_refresh())
+        self._refresh_tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(cache_key, None))
+
+    async def warm_cache(
+        self,
+        requests: List[Tuple[str, Optional[Dict[str, Any]]]],
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Pre-fetch (endpoint, params) pairs into the cache concurrently
+
+        Requests go through the normal rate-limited request path; failures are
+        collected instead of aborting the remaining requests.
+        """
+        if self.cache is None:
+            raise RuntimeError("Cache is disabled; enable_cache must be True to warm it")
+
+        semaphore = asyncio.Semaphore(concurrency or self.config.concurrency)
+        failures: List[Dict[str, Any]] = []
+
+        async def _warm(endpoint: str, params: Optional[Dict[str, Any]]) -> None:
+            async with semaphore:
+                try:
+                    await self._fetch_and_cache(self._build_url(endpoint), params=params)
+                except Exception as e:
+                    failures.append({'endpoint': endpoint, 'params': params, 'error': str(e)})
+
+        await asyncio.gather(*[_warm(endpoint, params) for endpoint, params in requests])
+        self.cache.save_stats()
+
+        return {
+            'requested': len(requests),
+            'warmed': len(requests) - len(failures),
+            'failed': len(failures),
+            'failures': failures,
+        }
+
     async def post(
         self,
         endpoint: str,
@@ -539,6 +750,20 @@ class AsyncDHIS2Client:
             'client': self.metrics.get_stats(),
             'rate_limiter': self.rate_limiter.get_comprehensive_stats(),
             'retry_manager': self.retry_manager.get_stats(),
+            'cache': self.cache.get_stats() if self.cache is not None else None,
+            'metadata_cache': (
+                self.metadata_cache.get_stats() if self.metadata_cache is not None else None
+            ),
+            'analytics_chunking': (
+                self.analytics.chunk_sizer.get_stats()
+                if self.analytics is not None and self.analytics.chunk_sizer is not None
+                else None
+            ),
+            'push_chunking': (
+                self.datavaluesets.chunk_sizer.get_stats()
+                if self.datavaluesets is not None and self.datavaluesets.chunk_sizer is not None
+                else None
+            ),
         }
 
 
@@ -208,6 +208,43 @@ class MetadataError(DHIS2Error):
         })
 
 
+class PartitionFetchError(DHIS2Error):
+    """Raised when partitions of a split request still fail after their retries"""
+
+    def __init__(
+        self,
+        failed_partitions: List[int],
+        total_partitions: int,
+        errors: Optional[List[str]] = None
+    ):
+        self.failed_partitions = failed_partitions
+        self.total_partitions = total_partitions
+        self.errors = errors or []
+
+        message = f"{len(failed_partitions)}/{total_partitions} partition(s) failed"
+        if self.errors:
+            message += f", first error: {self.errors[0]}"
+
+        super().__init__(message, {
+            'failed_partitions': failed_partitions,
+            'total_partitions': total_partitions,
+            'errors': self.errors
+        })
+
+
+class ImportJobError(DHIS2Error):
+    """Raised when a server-side import job cannot be followed to completion"""
+
+    def __init__(self, task_id: str, job_type: str, message: str):
+        self.task_id = task_id
+        self.job_type = job_type
+
+        super().__init__(f"Import job {job_type}/{task_id}: {message}", {
+            'task_id': task_id,
+            'job_type': job_type
+        })
+
+
 def format_dhis2_error(error_data: Dict[str, Any]) -> str:
     """Format DHIS2 server error message"""
     if not error_data:
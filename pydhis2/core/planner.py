@@ -0,0 +1,545 @@
+"""Analytics query planner - Split large queries into partitions under a cell budget"""
+
+import asyncio
+import math
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from pydhis2.core.errors import DHIS2HTTPError, RetryExhausted
+from pydhis2.core.errors import TimeoutError as DHIS2TimeoutError
+from pydhis2.core.types import AnalyticsQuery
+
+# Dimensions in the order they are partitioned by default
+DEFAULT_SPLIT_ORDER: Tuple[str, ...] = ('pe', 'ou', 'dx')
+
+# Relative periods without a separator in their name
+_RELATIVE_PERIOD_KEYWORDS = frozenset({'TODAY', 'YESTERDAY'})
+
+# Estimated cells from which the CSV transport is preferred over JSON
+CSV_TRANSPORT_MIN_CELLS = 100_000
+
+# Periods of each type in a year, for MONTHS_THIS_YEAR and the like
+_PERIODS_PER_YEAR = {
+    'DAYS': 365,
+    'WEEKS': 52,
+    'BIWEEKS': 26,
+    'MONTHS': 12,
+    'BIMONTHS': 6,
+    'QUARTERS': 4,
+    'SIXMONTHS': 2,
+}
+_LAST_N_PERIODS = re.compile(r'^LAST_(\d+)_[A-Z_]+$')
+_PERIODS_OF_YEAR = re.compile(r'^([A-Z]+)_(?:THIS|LAST)_(?:FINANCIAL_)?YEAR$')
+
+_USER_ORG_UNIT_DEPTHS = {
+    'USER_ORGUNIT': 0,
+    'USER_ORGUNIT_CHILDREN': 1,
+    'USER_ORGUNIT_GRANDCHILDREN': 2,
+}
+
+
+def query_dimension_items(query: AnalyticsQuery) -> Dict[str, Tuple[str, ...]]:
+    """Get the items requested for each dimension of a query"""
+    items = {}
+    for dim in ('dx', 'ou', 'pe', 'co', 'ao'):
+        value = getattr(query, dim)
+        if value is None:
+            continue
+        values = value if isinstance(value, list) else value.split(';')
+        items[dim] = tuple(v for v in values if v)
+    return items
+
+
+def is_literal_item(item: str) -> bool:
+    """Check whether a dimension item appears verbatim in result rows.
+
+    Keywords such as ``LEVEL-3``, ``USER_ORGUNIT``, ``DE_GROUP-abc`` or
+    ``LAST_12_MONTHS`` expand on the server and never do.
+    """
+    return '_' not in item and '-' not in item and item not in _RELATIVE_PERIOD_KEYWORDS
+
+
+def relative_period_count(item: str) -> Optional[int]:
+    """Number of periods a relative period keyword expands to, or None if unknown"""
+    if item in _RELATIVE_PERIOD_KEYWORDS:
+        return 1
+    match = _LAST_N_PERIODS.match(item)
+    if match:
+        return int(match.group(1))
+    match = _PERIODS_OF_YEAR.match(item)
+    if match:
+        return _PERIODS_PER_YEAR.get(match.group(1))
+    if item.startswith(('THIS_', 'LAST_')):
+        return 1
+    return None
+
+
+def _org_unit_selector(item: str) -> bool:
+    return item.startswith(('LEVEL-', 'OU_GROUP-'))
+
+
+def split_candidates(dim: str, items: Sequence[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Items of a dimension that may be split apart, and the items every chunk keeps.
+
+    ``LEVEL-`` and ``OU_GROUP-`` in ``ou`` select units under the boundary
+    units listed with them, so the two are never separated: the boundary
+    units are split with the selectors in every chunk or, around a single
+    boundary unit, the selectors are.
+    """
+    if dim != 'ou':
+        return tuple(items), ()
+    selectors = tuple(i for i in items if _org_unit_selector(i))
+    boundaries = tuple(i for i in items if not _org_unit_selector(i))
+    if not selectors or not boundaries:
+        return tuple(items), ()
+    if len(boundaries) > 1:
+        return boundaries, selectors
+    return selectors, boundaries
+
+
+class OrgUnitIndex:
+    """Organisation unit hierarchy used to count the units an ``ou`` dimension resolves to
+
+    Built from ``id``/``level``/``path`` of the organisation units, the
+    current user's organisation units and, optionally, the members of each
+    organisation unit group.
+    """
+
+    def __init__(
+        self,
+        org_units: Sequence[Dict[str, Any]],
+        user_org_units: Sequence[str] = (),
+        groups: Optional[Dict[str, Sequence[str]]] = None
+    ):
+        self.levels: Dict[str, int] = {}
+        self.ancestors: Dict[str, FrozenSet[str]] = {}
+        for unit in org_units:
+            path = [p for p in unit.get('path', '').split('/') if p]
+            self.levels[unit['id']] = unit.get('level') or len(path)
+            self.ancestors[unit['id']] = frozenset(path)
+        self.user_org_units = tuple(user_org_units)
+        self.groups = {gid: frozenset(members) for gid, members in (groups or {}).items()}
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def _descendants(self, roots: Set[str], depth: int) -> Set[str]:
+        """Units exactly ``depth`` levels below any of the roots"""
+        if depth == 0:
+            return set(roots)
+        return {
+            uid for uid, ancestors in self.ancestors.items()
+            if any(
+                root in ancestors and self.levels[uid] == self.levels.get(root, 0) + depth
+                for root in roots
+            )
+        }
+
+    def subtrees(self, roots: Sequence[str], level: int) -> Tuple[List[str], List[str]]:
+        """Split the hierarchy under ``roots`` into subtrees rooted at ``level``
+
+        Returns the subtree roots and the units above ``level`` that no
+        subtree covers (the roots themselves and the units between). Roots
+        at or below ``level``, or missing from the index, are subtree roots.
+        """
+        root_set = set(roots)
+        subtree_roots = {
+            root for root in root_set if self.levels.get(root, level) >= level
+        }
+        upper: Set[str] = set()
+        for uid, ancestors in self.ancestors.items():
+            if not root_set & ancestors or subtree_roots & ancestors:
+                continue
+            if self.levels[uid] == level:
+                subtree_roots.add(uid)
+            elif self.levels[uid] < level:
+                upper.add(uid)
+        return sorted(subtree_roots), sorted(upper)
+
+    def resolve(self, items: Sequence[str]) -> Tuple[int, List[str]]:
+        """Count the units an ``ou`` dimension returns.
+
+        ``LEVEL-n`` and ``OU_GROUP-x`` select units under the listed
+        boundary units (or under the user's units when none are listed).
+        Returns the count and the items that could not be resolved, each of
+        which is counted as one unit.
+        """
+        boundaries: Set[str] = set()
+        selected: Set[str] = set()
+        has_selector = False
+        unresolved: List[str] = []
+
+        for item in items:
+            if item.startswith('LEVEL-'):
+                level = item[len('LEVEL-'):]
+                if not level.isdigit():
+                    unresolved.append(item)
+                    continue
+                has_selector = True
+                selected.update(uid for uid, lvl in self.levels.items() if lvl == int(level))
+            elif item.startswith('OU_GROUP-'):
+                members = self.groups.get(item[len('OU_GROUP-'):])
+                if members is None:
+                    unresolved.append(item)
+                    continue
+                has_selector = True
+                selected.update(members)
+            elif item in _USER_ORG_UNIT_DEPTHS:
+                if not self.user_org_units:
+                    unresolved.append(item)
+                    continue
+                boundaries.update(
+                    self._descendants(set(self.user_org_units), _USER_ORG_UNIT_DEPTHS[item])
+                )
+            else:
+                boundaries.add(item)
+
+        if not has_selector:
+            return len(boundaries) + len(unresolved), unresolved
+
+        roots = boundaries or set(self.user_org_units)
+        if roots:
+            selected = {
+                uid for uid in selected
+                if roots & self.ancestors.get(uid, frozenset())
+            }
+        return len(selected) + len(unresolved), unresolved
+
+
+@dataclass
+class QueryPartition:
+    """A partition of an analytics query"""
+    index: int
+    query: AnalyticsQuery
+    cells: int
+
+
+class QueryPlanner:
+    """Analytics query planner
+
+    Estimates the number of result cells of a query as the product of its
+    dimension item counts and splits it along ``split_order`` until every
+    partition fits in ``max_cells``.
+    """
+
+    def __init__(
+        self,
+        max_cells: int = 50_000,
+        split_order: Sequence[str] = DEFAULT_SPLIT_ORDER,
+    ):
+        if max_cells <= 0:
+            raise ValueError("max_cells must be positive")
+        self.max_cells = max_cells
+        self.split_order = tuple(split_order)
+
+    @staticmethod
+    def estimate_cells(query: AnalyticsQuery) -> int:
+        """Estimate result cells from dimension item counts"""
+        return math.prod(max(len(items), 1) for items in query_dimension_items(query).values())
+
+    def partition(self, query: AnalyticsQuery) -> List[QueryPartition]:
+        """Split a query into partitions that each fit the cell budget"""
+        queries = self._split(query)
+        return [
+            QueryPartition(index=i, query=q, cells=self.estimate_cells(q))
+            for i, q in enumerate(queries)
+        ]
+
+    def split_first(
+        self,
+        query: AnalyticsQuery,
+        max_cells: Optional[int] = None
+    ) -> Tuple[AnalyticsQuery, Optional[AnalyticsQuery]]:
+        """Split off the leading chunk of a query along the first splittable dimension.
+
+        Returns the chunk and the remainder, or the query itself and None when
+        it fits the budget or cannot be split. The chunk may still exceed the
+        budget when other dimensions are large.
+        """
+        max_cells = max_cells or self.max_cells
+        cells = self.estimate_cells(query)
+        if cells <= max_cells:
+            return query, None
+
+        items = query_dimension_items(query)
+        candidates = {dim: split_candidates(dim, values) for dim, values in items.items()}
+        dim = next((d for d in self.split_order if len(candidates.get(d, ((), ()))[0]) > 1), None)
+        if dim is None:
+            # Nothing left to split; the query stays over budget
+            return query, None
+
+        splittable, kept = candidates[dim]
+        other_cells = cells // len(items[dim])
+        per_chunk = max(1, max_cells // other_cells - len(kept))
+        head = query.model_copy(update={dim: list(splittable[:per_chunk] + kept)})
+        rest = query.model_copy(update={dim: list(splittable[per_chunk:] + kept)})
+        return head, rest
+
+    def _split(self, query: AnalyticsQuery) -> List[AnalyticsQuery]:
+        """Recursively split until every query fits the budget"""
+        head, rest = self.split_first(query)
+        if rest is None:
+            return [head]
+        return self._split(head) + self._split(rest)
+
+    @staticmethod
+    def has_overlapping_items(partitions: List[QueryPartition]) -> bool:
+        """Whether partitions may return the same rows (keywords split apart)"""
+        if len(partitions) < 2:
+            return False
+        for partition in partitions:
+            for items in query_dimension_items(partition.query).values():
+                if not all(is_literal_item(i) for i in items):
+                    return True
+        return False
+
+
+@dataclass
+class QueryExplanation:
+    """Preflight estimate of an analytics query and the chosen fetch strategy"""
+    cells: int
+    dimension_counts: Dict[str, int]
+    max_cells: int
+    partitions: int
+    split_dimensions: List[str]
+    concurrency: int
+    transport: str
+    unresolved_items: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def needs_split(self) -> bool:
+        """Whether the query is estimated above the cell budget"""
+        return self.cells > self.max_cells
+
+    def fetch_options(self) -> Dict[str, Any]:
+        """Keyword arguments for ``to_pandas``/``to_arrow`` following this plan"""
+        return {
+            'max_cells': self.max_cells if self.partitions > 1 else None,
+            'concurrency': self.concurrency,
+            'transport': self.transport,
+        }
+
+    def __str__(self) -> str:
+        counts = ' x '.join(f"{dim}={count}" for dim, count in self.dimension_counts.items())
+        lines = [f"Estimated cells: {self.cells:,} ({counts})"]
+        if self.partitions > 1:
+            lines.append(
+                f"Split by {', '.join(self.split_dimensions)} into ~{self.partitions} partitions "
+                f"of <= {self.max_cells:,} cells, {self.concurrency} concurrent"
+            )
+        else:
+            lines.append("Single request")
+        lines.append(f"Transport: {self.transport}")
+        lines.extend(f"Warning: {warning}" for warning in self.warnings)
+        return '\n'.join(lines)
+
+
+class QueryCostEstimator:
+    """Analytics query cost estimator
+
+    Estimates result cells as the product of the dimension item counts after
+    expanding relative periods and, given an :class:`OrgUnitIndex`, the
+    ``LEVEL-``/``OU_GROUP-``/``USER_ORGUNIT`` keywords. From the estimate it
+    picks the split dimensions, the concurrency and the transport.
+    """
+
+    def __init__(
+        self,
+        org_units: Optional[OrgUnitIndex] = None,
+        max_cells: int = 50_000,
+        max_concurrency: int = 10,
+        csv_min_cells: int = CSV_TRANSPORT_MIN_CELLS,
+        split_order: Sequence[str] = DEFAULT_SPLIT_ORDER,
+    ):
+        if max_cells <= 0:
+            raise ValueError("max_cells must be positive")
+        self.org_units = org_units
+        self.max_cells = max_cells
+        self.max_concurrency = max_concurrency
+        self.csv_min_cells = csv_min_cells
+        self.split_order = tuple(split_order)
+
+    def dimension_counts(self, query: AnalyticsQuery) -> Tuple[Dict[str, int], List[str]]:
+        """Get the expanded item count of each dimension and the unresolved items"""
+        counts: Dict[str, int] = {}
+        unresolved: List[str] = []
+        for dim, items in query_dimension_items(query).items():
+            if dim == 'ou' and self.org_units is not None:
+                count, missing = self.org_units.resolve(items)
+                unresolved.extend(missing)
+            else:
+                count = 0
+                for item in items:
+                    expanded = relative_period_count(item) if dim == 'pe' else None
+                    if expanded is None and not is_literal_item(item):
+                        unresolved.append(item)
+                    count += expanded or 1
+            counts[dim] = max(count, 1)
+        return counts, unresolved
+
+    def explain(self, query: AnalyticsQuery, include_names: bool = False) -> QueryExplanation:
+        """Estimate a query and choose how to fetch it"""
+        counts, unresolved = self.dimension_counts(query)
+        cells = math.prod(counts.values())
+        warnings = []
+        if unresolved:
+            warnings.append(
+                f"Counted {', '.join(unresolved)} as one item each; the estimate may be low"
+            )
+
+        # The planner splits listed items, so keywords bound how far a query can be split
+        items = query_dimension_items(query)
+        partitions = 1
+        split_dimensions: List[str] = []
+        if cells > self.max_cells:
+            wanted = math.ceil(cells / self.max_cells)
+            for dim in self.split_order:
+                if len(items.get(dim, ())) < 2:
+                    continue
+                split_dimensions.append(dim)
+                partitions = min(wanted, partitions * len(items[dim]))
+                if partitions >= wanted:
+                    break
+            if partitions < wanted:
+                warnings.append(
+                    f"Only {partitions} partition(s) possible from the listed items; "
+                    f"each is estimated at ~{cells // partitions:,} cells"
+                )
+
+        transport = 'csv' if cells >= self.csv_min_cells and not include_names else 'json'
+        return QueryExplanation(
+            cells=cells,
+            dimension_counts=counts,
+            max_cells=self.max_cells,
+            partitions=partitions,
+            split_dimensions=split_dimensions,
+            concurrency=max(1, min(partitions, self.max_concurrency)),
+            transport=transport,
+            unresolved_items=unresolved,
+            warnings=warnings,
+        )
+
+
+class AdaptiveChunkSizer:
+    """Adaptive chunk sizer - learns a cells-per-request target from responses
+
+    Grows the target while requests finish under ``target_latency`` and
+    shrinks it after timeouts, 413 or 5xx responses. The smallest chunk that
+    failed is remembered as a ceiling until a chunk close to it succeeds
+    quickly again. With ``per_cell_tolerance``, growth also pauses while the
+    latency per cell is more than that fraction above the best seen, i.e.
+    once larger chunks stop paying off.
+    """
+
+    def __init__(
+        self,
+        initial_cells: int = 50_000,
+        min_cells: int = 1_000,
+        max_cells: int = 500_000,
+        target_latency: float = 10.0,
+        adaptation_factor: float = 0.25,
+        per_cell_tolerance: Optional[float] = None
+    ):
+        if not 0 < min_cells <= initial_cells <= max_cells:
+            raise ValueError("Expected 0 < min_cells <= initial_cells <= max_cells")
+        self.min_cells = min_cells
+        self.max_cells = max_cells
+        self.target_latency = target_latency
+        self.adaptation_factor = adaptation_factor
+        self.per_cell_tolerance = per_cell_tolerance
+        self.current_cells = initial_cells
+        self.learned_ceiling: Optional[int] = None
+        self.best_cell_latency: Optional[float] = None
+
+        # Response statistics
+        self._response_times: deque = deque(maxlen=100)
+        self._success_count = 0
+        self._error_count = 0
+
+    @staticmethod
+    def is_overload(status_code: int, timed_out: bool = False) -> bool:
+        """Whether a response means the chunk was too large for the server"""
+        return timed_out or status_code in (408, 413) or status_code >= 500
+
+    @staticmethod
+    def failure_status(error: Exception) -> Tuple[int, bool]:
+        """Get the status code and timeout flag of a failed request"""
+        if isinstance(error, RetryExhausted) and error.last_error is not None:
+            error = error.last_error
+        if isinstance(error, DHIS2HTTPError):
+            return error.status, isinstance(error, DHIS2TimeoutError)
+        if isinstance(error, asyncio.TimeoutError):
+            return 408, True
+        return 0, False
+
+    def record_response(
+        self,
+        cells: int,
+        response_time: float,
+        status_code: int = 200,
+        timed_out: bool = False
+    ) -> None:
+        """Record a chunk response to be used for adaptive adjustment"""
+        self._response_times.append(response_time)
+
+        if self.is_overload(status_code, timed_out):
+            self._error_count += 1
+            if self.learned_ceiling is None or cells < self.learned_ceiling:
+                self.learned_ceiling = cells
+            # Shrink below the failed chunk
+            self.current_cells = max(
+                self.min_cells,
+                int(min(self.current_cells, cells) * (1 - 2 * self.adaptation_factor))
+            )
+        elif 200 <= status_code < 300:
+            self._success_count += 1
+            if response_time > self.target_latency:
+                # Scale towards the size that would have met the target
+                self.current_cells = max(
+                    self.min_cells,
+                    int(cells * self.target_latency / response_time)
+                )
+                return
+
+            if (
+                self.learned_ceiling is not None
+                and cells >= self.learned_ceiling * 0.9
+                and response_time < self.target_latency / 2
+            ):
+                # The server copes with chunks near the ceiling again
+                self.learned_ceiling = None
+
+            # Short responses are dominated by fixed overhead, so only longer ones are compared
+            if self.per_cell_tolerance is not None and cells > 0 and response_time >= self.target_latency / 4:
+                cell_latency = response_time / cells
+                if self.best_cell_latency is None or cell_latency < self.best_cell_latency:
+                    self.best_cell_latency = cell_latency
+                elif cell_latency > self.best_cell_latency * (1 + self.per_cell_tolerance):
+                    return
+
+            limit = self.max_cells
+            if self.learned_ceiling is not None:
+                limit = min(limit, int(self.learned_ceiling * 0.9))
+            grown = int(self.current_cells * (1 + self.adaptation_factor))
+            self.current_cells = max(self.min_cells, min(limit, max(self.current_cells, grown)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get adaptive statistics"""
+        total_requests = self._success_count + self._error_count
+        return {
+            'current_cells': self.current_cells,
+            'min_cells': self.min_cells,
+            'max_cells': self.max_cells,
+            'learned_ceiling': self.learned_ceiling,
+            'target_latency': self.target_latency,
+            'best_cell_latency': self.best_cell_latency,
+            'avg_response_time': (
+                sum(self._response_times) / len(self._response_times) if self._response_times else 0
+            ),
+            'success_count': self._success_count,
+            'error_count': self._error_count,
+            'total_requests': total_requests,
+        }
@@ -1,10 +1,13 @@
 """Type definitions and configuration models"""
 
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, Field, validator
 
+if TYPE_CHECKING:
+    from pydhis2.core.planner import OrgUnitIndex, QueryExplanation
+
 
 class AuthMethod(str, Enum):
     """Authentication method enumeration"""
@@ -20,6 +23,15 @@ class RetryStrategy(str, Enum):
     FIXED = "fixed"
 
 
+class CachePolicy(BaseModel):
+    """Per-route cache policy"""
+
+    ttl: int = Field(..., description="Time in seconds an entry is served as fresh", gt=0)
+    stale_grace: int = Field(
+        0, description="Seconds after expiry an entry may still be served while it is refreshed", ge=0
+    )
+
+
 class DHIS2Config(BaseModel):
     """
     Configuration model for the DHIS2 client.
@@ -38,8 +50,39 @@ class DHIS2Config(BaseModel):
 
     # Compression and caching
     compression: bool = Field(True, description="Whether to enable gzip compression")
+    request_compression: bool = Field(
+        False, description="Gzip request bodies of at least request_compression_min_bytes"
+    )
+    request_compression_min_bytes: int = Field(
+        16 * 1024, description="Smallest request body in bytes that is gzipped", ge=0
+    )
+    request_compression_level: int = Field(6, description="Gzip level for request bodies", ge=1, le=9)
     enable_cache: bool = Field(True, description="Whether to enable caching")
     cache_ttl: int = Field(3600, description="Cache TTL in seconds", gt=0)
+    cache_dir: str = Field(".pydhis2_cache", description="Directory for the on-disk HTTP cache")
+    cache_policies: Dict[str, CachePolicy] = Field(
+        default_factory=dict,
+        description="Route prefix -> cache policy; GET requests to these routes are served from the cache"
+    )
+    metadata_cache: bool = Field(
+        False, description="Keep metadata responses in a long-TTL tier validated by a lastUpdated probe"
+    )
+    metadata_cache_ttl: int = Field(3 * 24 * 3600, description="Metadata cache tier TTL in seconds", gt=0)
+    analytics_subquery_cache: bool = Field(
+        False, description="Answer analytics sub-queries by slicing cached superset results"
+    )
+    analytics_adaptive_chunking: bool = Field(
+        False, description="Split analytics queries by a chunk size learned from server latency"
+    )
+    analytics_target_latency: float = Field(
+        10.0, description="Target latency in seconds per analytics chunk", gt=0
+    )
+    push_adaptive_chunking: bool = Field(
+        False, description="Size data value push chunks by server import latency instead of chunk_size"
+    )
+    push_target_latency: float = Field(
+        30.0, description="Target latency in seconds per data value push chunk", gt=0
+    )
 
     # Retry configuration - Increased defaults for more resilience
     max_retries: int = Field(5, description="Maximum retry attempts", ge=0)
@@ -144,6 +187,26 @@ class AnalyticsQuery(BaseModel):
 
         return params
 
+    def explain(
+        self,
+        org_units: Optional["OrgUnitIndex"] = None,
+        max_cells: int = 50_000,
+        max_concurrency: int = 10,
+        include_names: bool = False
+    ) -> "QueryExplanation":
+        """Estimate the result size and fetch strategy without calling the server.
+
+        ``LEVEL-``/``OU_GROUP-``/``USER_ORGUNIT`` items are only expanded when
+        an ``org_units`` index is given; ``client.analytics.explain`` builds
+        one from cached metadata.
+        """
+        from pydhis2.core.planner import QueryCostEstimator
+
+        estimator = QueryCostEstimator(
+            org_units=org_units, max_cells=max_cells, max_concurrency=max_concurrency
+        )
+        return estimator.explain(self, include_names=include_names)
+
 
 class ImportStrategy(str, Enum):
     """Import strategy enumeration"""
@@ -178,6 +241,9 @@ class ImportConfig(BaseModel):
     # Performance options
     async_import: bool = Field(False, description="Whether to perform async import")
     force: bool = Field(False, description="Force import")
+    max_concurrent_chunks: int = Field(
+        1, description="Chunks pushed concurrently when the import is not atomic", gt=0
+    )
 
 
 class DataFrameFormat(str, Enum):
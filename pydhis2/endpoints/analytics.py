@@ -1,23 +1,202 @@
 """Analytics endpoint - Analysis data queries and DataFrame conversion"""
 
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
 from collections.abc import AsyncIterator
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
+from pydhis2.core.cache import canonicalize_params
+from pydhis2.core.errors import PartitionFetchError
+from pydhis2.core.planner import (
+    AdaptiveChunkSizer,
+    OrgUnitIndex,
+    QueryExplanation,
+    QueryPartition,
+    QueryPlanner,
+    is_literal_item,
+    query_dimension_items,
+)
 from pydhis2.core.types import AnalyticsQuery, ExportFormat
 from pydhis2.io.arrow import ArrowConverter
-from pydhis2.io.to_pandas import AnalyticsDataFrameConverter
+from pydhis2.io.store import PartitionedParquetStore
+from pydhis2.io.to_pandas import AnalyticsDataFrameConverter, use_categorical
+
+logger = logging.getLogger(__name__)
+
+
+# Query dimension -> column name in the long-format DataFrame
+DIMENSION_COLUMNS = {
+    'dx': 'dx',
+    'pe': 'period',
+    'ou': 'orgUnit',
+    'co': 'categoryOptionCombo',
+    'ao': 'attributeOptionCombo',
+}
+
+
+@dataclass
+class _CachedAnalyticsResult:
+    """Cached long-format analytics result"""
+    items: Dict[str, FrozenSet[str]]
+    table: pa.Table
+    timestamp: float
+
+
+@dataclass
+class StoreRefreshResult:
+    """Outcome of an incremental analytics store refresh"""
+    path: str
+    periods: List[str]
+    fetched_periods: List[str] = field(default_factory=list)
+    dropped_periods: List[str] = field(default_factory=list)
+    rows_written: int = 0
+    analytics_generated: Optional[str] = None
+
+
+class AnalyticsResultCache:
+    """In-memory analytics result cache that answers sub-queries locally
+
+    A query whose dimension items are a subset of a cached query with the same
+    non-dimension parameters is answered by filtering the cached table.
+    """
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 32):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+        # Statistics
+        self.hits = 0
+        self.sliced_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(query: AnalyticsQuery) -> Tuple:
+        """Everything except the dimension items must match for reuse"""
+        params = query.to_params()
+        params.pop('dimension', None)
+        return tuple(sorted(query_dimension_items(query))), tuple(canonicalize_params(params))
+
+    def get_table(self, query: AnalyticsQuery) -> Optional[pa.Table]:
+        """Answer a query from a cached superset result as an Arrow table"""
+        signature = self._signature(query)
+        requested = query_dimension_items(query)
+        now = time.time()
+
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if now - entry.timestamp > self.ttl:
+                del self._entries[key]
+                continue
+            if key[0] != signature:
+                continue
+
+            filters = self._slice_filters(requested, entry)
+            if filters is None:
+                continue
+
+            self._entries.move_to_end(key)
+            table = entry.table
+            if filters:
+                mask = None
+                for column, values in filters.items():
+                    column_mask = pc.is_in(table[column], value_set=pa.array(values, pa.string()))
+                    mask = column_mask if mask is None else pc.and_(mask, column_mask)
+                table = table.filter(mask)
+                self.sliced_hits += 1
+            else:
+                self.hits += 1
+
+            return table
+
+        self.misses += 1
+        return None
+
+    @staticmethod
+    def _slice_filters(
+        requested: Dict[str, Tuple[str, ...]],
+        entry: _CachedAnalyticsResult
+    ) -> Optional[Dict[str, list]]:
+        """Column filters that turn a cached result into the requested one, or None
+
+        Only dimensions whose requested and cached items all appear verbatim in
+        the rows are sliced: ``ou:A;LEVEL-2`` returns the level-2 units under
+        ``A`` and not ``A`` itself, so it cannot answer ``ou:A``.
+        """
+        filters = {}
+        for dim, items in requested.items():
+            wanted = frozenset(items)
+            cached = entry.items.get(dim, frozenset())
+            if wanted == cached:
+                continue
+            if not wanted <= cached or not all(is_literal_item(i) for i in cached):
+                return None
+            column = DIMENSION_COLUMNS[dim]
+            if entry.table.num_rows and column not in entry.table.column_names:
+                return None
+            filters[column] = sorted(wanted)
+
+        if filters and entry.table.num_rows == 0:
+            # A subset of an empty result is empty as well
+            return {}
+        return filters
+
+    def put_table(self, query: AnalyticsQuery, table: pa.Table) -> None:
+        """Cache a long-format result held as an Arrow table"""
+        items = {dim: frozenset(values) for dim, values in query_dimension_items(query).items()}
+        key = (self._signature(query), tuple(sorted(items.items())))
+
+        self._entries[key] = _CachedAnalyticsResult(items=items, table=table, timestamp=time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Clear all cached results"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics"""
+        lookups = self.hits + self.sliced_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'sliced_hits': self.sliced_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.sliced_hits) / lookups if lookups > 0 else 0,
+        }
 
 
 class AnalyticsEndpoint:
     """Analytics API endpoint"""
 
-    def __init__(self, client):
+    def __init__(
+        self,
+        client,
+        result_cache: Optional[AnalyticsResultCache] = None,
+        chunk_sizer: Optional[AdaptiveChunkSizer] = None
+    ):
         self.client = client
         self.converter = AnalyticsDataFrameConverter()
+        self.table_converter = self.converter.table_converter
         self.arrow_converter = ArrowConverter()
+        self.result_cache = result_cache
+        self.chunk_sizer = chunk_sizer
+
+        # Retries of a single partition of a split query, on top of request retries
+        self.partition_retries = 2
+        self.partition_retry_delay = 1.0
 
     async def raw(
         self,
@@ -34,66 +213,364 @@ class AnalyticsEndpoint:
     async def to_pandas(
         self,
         query: AnalyticsQuery,
-        long_format: bool = True
+        long_format: bool = True,
+        max_cells: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        categorical: Optional[bool] = None,
+        include_names: bool = False,
+        transport: str = "json"
     ) -> pd.DataFrame:
-        """Convert to Pandas DataFrame"""
-        data = await self.raw(query)
-        return self.converter.to_dataframe(data, long_format=long_format)
+        """Convert to Pandas DataFrame
+
+        With ``max_cells``, a query estimated above that many cells is split
+        into partitions that run concurrently and are merged into one frame.
+        Without it, an endpoint with a chunk sizer splits by the learned size.
+        ``categorical`` keeps dimension columns categorical (default: large frames).
+        ``include_names`` adds ``dxName``/``peName``/``ouName``/``coName`` columns.
+        ``transport="csv"`` pulls ``/api/analytics.csv`` and parses it with Arrow.
+        """
+        table = await self._fetch_table(
+            query,
+            long_format,
+            max_cells,
+            concurrency,
+            include_names=include_names,
+            transport=transport
+        )
+        return self.table_converter.to_pandas(
+            table, categorical=use_categorical(categorical, table.num_rows)
+        )
 
     async def to_arrow(
         self,
         query: AnalyticsQuery,
-        long_format: bool = True
+        long_format: bool = True,
+        max_cells: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        include_names: bool = False,
+        transport: str = "json"
     ) -> pa.Table:
-        """Convert to Arrow Table"""
-        df = await self.to_pandas(query, long_format=long_format)
-        return self.arrow_converter.from_pandas(df)
+        """Convert to Arrow Table, built directly from the JSON rows or CSV body"""
+        return await self._fetch_table(
+            query,
+            long_format,
+            max_cells,
+            concurrency,
+            include_names=include_names,
+            transport=transport
+        )
+
+    async def _fetch_table(
+        self,
+        query: AnalyticsQuery,
+        long_format: bool = True,
+        max_cells: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        include_names: bool = False,
+        transport: str = "json"
+    ) -> pa.Table:
+        """Fetch a query as an Arrow table, through the result cache if enabled"""
+        if transport not in ('json', 'csv'):
+            raise ValueError(f"Unsupported analytics transport: {transport}")
+        if transport == 'csv' and include_names:
+            raise ValueError("include_names requires the JSON transport; CSV carries no metaData")
+        chunk_options = {
+            'long_format': long_format,
+            'include_names': include_names,
+            'transport': transport,
+        }
+
+        # Cached tables carry no names, so name lookups always go to the server
+        use_result_cache = long_format and not include_names and self.result_cache is not None
+        if use_result_cache:
+            cached = self.result_cache.get_table(query)
+            if cached is not None:
+                return cached
+
+        if max_cells is not None:
+            table = await self._fetch_partitioned(
+                query, QueryPlanner(max_cells=max_cells), concurrency, **chunk_options
+            )
+        elif self.chunk_sizer is not None:
+            table = await self._fetch_partitioned(
+                query,
+                QueryPlanner(max_cells=self.chunk_sizer.current_cells),
+                concurrency,
+                chunk_sizer=self.chunk_sizer,
+                **chunk_options
+            )
+        else:
+            table = await self._fetch_chunk(query, **chunk_options)
+
+        if use_result_cache:
+            self.result_cache.put_table(query, table)
+        return table
+
+    async def _fetch_chunk(
+        self,
+        query: AnalyticsQuery,
+        long_format: bool = True,
+        include_names: bool = False,
+        transport: str = "json"
+    ) -> pa.Table:
+        """Fetch a query with a single request as an Arrow table"""
+        if transport == 'csv':
+            body = await self.client.get_bytes('/api/analytics.csv', params=query.to_params())
+            return self.table_converter.from_csv(body, long_format=long_format)
+
+        data = await self.raw(query)
+        return self.table_converter.to_table(
+            data, long_format=long_format, include_names=include_names
+        )
+
+    async def _fetch_partitioned(
+        self,
+        query: AnalyticsQuery,
+        planner: QueryPlanner,
+        concurrency: Optional[int] = None,
+        chunk_sizer: Optional[AdaptiveChunkSizer] = None,
+        **chunk_options
+    ) -> pa.Table:
+        """Fetch a query as concurrent partitions and merge the results.
+
+        Chunks are split off the query as workers pick them up, so a
+        ``chunk_sizer`` can change the budget between requests. Results are
+        ordered by their position in the split, not by completion.
+        """
+        def _budget() -> int:
+            return chunk_sizer.current_cells if chunk_sizer is not None else planner.max_cells
+
+        # Keys are split paths: (0,) is the head of the root query, (1,) the rest
+        work: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        work.put_nowait(((), 0, query))
+        results: Dict[Tuple[int, ...], Tuple[AnalyticsQuery, Optional[pa.Table], str]] = {}
+
+        async def _process(key: Tuple[int, ...], attempt: int, chunk: AnalyticsQuery) -> None:
+            while True:
+                head, rest = planner.split_first(chunk, _budget())
+                if rest is None:
+                    break
+                work.put_nowait((key + (1,), 0, rest))
+                key, chunk, attempt = key + (0,), head, 0
+
+            cells = planner.estimate_cells(chunk)
+            start = time.time()
+            try:
+                table = await self._fetch_chunk(chunk, **chunk_options)
+            except Exception as e:
+                status, timed_out = AdaptiveChunkSizer.failure_status(e)
+                if chunk_sizer is not None:
+                    chunk_sizer.record_response(cells, time.time() - start, status, timed_out)
+                logger.warning(f"Analytics chunk of {cells} cells failed (attempt {attempt + 1}): {e}")
+
+                if planner.split_first(chunk, _budget())[1] is not None:
+                    # The budget shrank below this chunk; split it again
+                    work.put_nowait((key, attempt, chunk))
+                elif attempt < self.partition_retries:
+                    await asyncio.sleep(self.partition_retry_delay * (2 ** attempt))
+                    work.put_nowait((key, attempt + 1, chunk))
+                else:
+                    results[key] = (chunk, None, str(e))
+                return
+
+            if chunk_sizer is not None:
+                chunk_sizer.record_response(cells, time.time() - start)
+            results[key] = (chunk, table, '')
+
+        async def _worker() -> None:
+            while True:
+                key, attempt, chunk = await work.get()
+                try:
+                    await _process(key, attempt, chunk)
+                except Exception as e:
+                    results[key] = (chunk, None, str(e))
+                finally:
+                    work.task_done()
+
+        workers = [
+            asyncio.create_task(_worker())
+            for _ in range(concurrency or self.client.config.concurrency)
+        ]
+        try:
+            await work.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        ordered = [results[key] for key in sorted(results)]
+        partitions = [
+            QueryPartition(index=i, query=chunk, cells=planner.estimate_cells(chunk))
+            for i, (chunk, _, _) in enumerate(ordered)
+        ]
+        if len(partitions) > 1:
+            logger.info(f"Fetched analytics query in {len(partitions)} partitions")
+
+        failed = [i for i, (_, table, _) in enumerate(ordered) if table is None]
+        if failed:
+            raise PartitionFetchError(
+                failed_partitions=failed,
+                total_partitions=len(partitions),
+                errors=[ordered[i][2] for i in failed]
+            )
+
+        non_empty = [table for _, table, _ in ordered if table.num_rows > 0]
+        if not non_empty:
+            return pa.table({})
+
+        try:
+            merged = pa.concat_tables(non_empty)
+        except pa.ArrowInvalid:
+            # Partition schemas differ (e.g. a column that is all null in one)
+            merged = self.table_converter.from_pandas(pd.concat(
+                [self.table_converter.to_pandas(t) for t in non_empty], ignore_index=True
+            ))
+        if planner.has_overlapping_items(partitions):
+            df = self.table_converter.to_pandas(merged).drop_duplicates(ignore_index=True)
+            merged = self.table_converter.from_pandas(df)
+        return merged
 
     async def stream_paginated(
         self,
         query: AnalyticsQuery,
         page_size: int = 1000,
-        max_pages: Optional[int] = None
+        max_pages: Optional[int] = None,
+        prefetch: int = 2,
+        include_names: bool = False
     ) -> AsyncIterator[pd.DataFrame]:
-        """Stream paginated data"""
-        page = 1
+        """Stream paginated data
 
-        while True:
-            # Modify query parameters to add paging
-            page_params = query.to_params()
-            page_params.update({
+        Up to ``prefetch`` following pages are in flight while the current
+        page is converted and consumed. Pages after the first are requested
+        with ``skipMeta`` and reuse the first page's metaData.
+        """
+        async for response in self._stream_pages(query, page_size, max_pages, prefetch):
+            df = self.converter.to_dataframe(
+                response, long_format=True, include_names=include_names
+            )
+            if not df.empty:
+                yield df
+
+    async def _stream_pages(
+        self,
+        query: AnalyticsQuery,
+        page_size: int,
+        max_pages: Optional[int] = None,
+        prefetch: int = 2
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream raw page responses, each carrying the first page's metaData"""
+        def _page_params(page: int) -> Dict[str, Any]:
+            params = query.to_params()
+            params.update({
                 'page': page,
                 'pageSize': page_size,
                 'paging': 'true'
             })
+            if page > 1:
+                params['skipMeta'] = 'true'
+            return params
 
-            response = await self.client.get('/api/analytics', params=page_params)
+        async def _fetch(page: int) -> Dict[str, Any]:
+            return await self.client.get('/api/analytics', params=_page_params(page))
 
-            # Convert to DataFrame
-            df = self.converter.to_dataframe(response, long_format=True)
-            if not df.empty:
-                yield df
+        response = await _fetch(1)
+        metadata = response.get('metaData', {})
+
+        # Check pagination information
+        total_pages = response.get('pager', {}).get('pageCount', 1)
+        if max_pages:
+            total_pages = min(total_pages, max_pages)
+
+        pending: deque = deque()
+        next_page = 2
+        try:
+            while True:
+                # Keep the next pages in flight while this one is consumed
+                while next_page <= total_pages and len(pending) < prefetch:
+                    pending.append(asyncio.ensure_future(_fetch(next_page)))
+                    next_page += 1
+
+                yield {**response, 'metaData': metadata}
+
+                if pending:
+                    response = await pending.popleft()
+                elif next_page <= total_pages:
+                    response = await _fetch(next_page)
+                    next_page += 1
+                else:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def export_parquet_streaming(
+        self,
+        query: AnalyticsQuery,
+        file_path: str,
+        page_size: int = 10_000,
+        max_pages: Optional[int] = None,
+        prefetch: int = 2,
+        include_names: bool = False,
+        compression: str = 'snappy'
+    ) -> str:
+        """Export to Parquet page by page, one row group per page
 
-            # Check pagination information
-            pager = response.get('pager', {})
-            total_pages = pager.get('pageCount', 1)
+        The schema is fixed from the first page's headers. Data is written to
+        a temporary file next to ``file_path`` that replaces it only once the
+        export completes.
+        """
+        target = Path(file_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
 
-            if page >= total_pages:
-                break
+        writer: Optional[pq.ParquetWriter] = None
+        schema: Optional[pa.Schema] = None
+        rows = 0
+        try:
+            async for response in self._stream_pages(query, page_size, max_pages, prefetch):
+                if schema is None:
+                    schema = self.table_converter.schema(
+                        response.get('headers', []), include_names=include_names
+                    )
+                    writer = pq.ParquetWriter(str(temp_path), schema, compression=compression)
 
-            if max_pages and page >= max_pages:
-                break
+                table = self.table_converter.to_table(response, include_names=include_names)
+                if table.num_rows == 0:
+                    continue
+                writer.write_table(table.cast(schema))
+                rows += table.num_rows
 
-            page += 1
+            writer.close()
+            writer = None
+            os.replace(temp_path, target)
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        logger.info(f"Exported {rows} analytics rows to {target}")
+        return file_path
 
     async def export_to_file(
         self,
         query: AnalyticsQuery,
         file_path: str,
         format: ExportFormat = ExportFormat.PARQUET,
+        streaming: bool = False,
         **kwargs
     ) -> str:
-        """Export to file"""
+        """Export to file
+
+        With ``streaming`` (Parquet only), pages are written as they arrive
+        instead of loading the whole result; see ``export_parquet_streaming``.
+        """
+        if streaming:
+            if format != ExportFormat.PARQUET:
+                raise ValueError(f"Streaming export is only supported for Parquet, not {format}")
+            return await self.export_parquet_streaming(query, file_path, **kwargs)
+
         df = await self.to_pandas(query)
 
         if format == ExportFormat.PARQUET:
@@ -111,6 +588,100 @@ class AnalyticsEndpoint:
 
         return file_path
 
+    async def refresh_store(
+        self,
+        query: AnalyticsQuery,
+        store_dir: str,
+        open_periods: int = 3,
+        changed_periods: Optional[Sequence[str]] = None,
+        full: bool = False,
+        **fetch_options
+    ) -> StoreRefreshResult:
+        """Incrementally refresh a local Parquet store of a query, partitioned by period
+
+        The first run fetches every period. Later runs fetch periods missing
+        from the store, ``changed_periods``, and the last ``open_periods``
+        periods - the latter only when the server's analytics tables were
+        regenerated since the previous run. Periods that dropped out of the
+        query (e.g. a rolling ``LAST_36_MONTHS``) are removed. Extra keyword
+        arguments (``max_cells``, ``concurrency``, ``transport``) go to the
+        fetch.
+        """
+        store = PartitionedParquetStore(store_dir, partition_column='period')
+        signature = self._store_signature(query)
+        if store.exists and store.state.get('signature') != signature:
+            raise ValueError(
+                f"Store at {store_dir} holds a different query; use a separate directory"
+            )
+
+        periods = await self._expand_periods(query)
+        info = await self.client.get('/api/system/info', use_cache=False)
+        generated = info.get('lastAnalyticsTableGeneration')
+
+        to_fetch = set(changed_periods or ()) & set(periods)
+        if full or not store.exists:
+            to_fetch = set(periods)
+        else:
+            to_fetch.update(p for p in periods if store.partition_info(p) is None)
+            if open_periods > 0 and (generated is None or generated != store.state.get('analyticsGenerated')):
+                to_fetch.update(periods[-open_periods:])
+        fetched = [p for p in periods if p in to_fetch]
+
+        result = StoreRefreshResult(
+            path=str(store.path), periods=periods, fetched_periods=fetched,
+            analytics_generated=generated
+        )
+        if fetched:
+            table = await self._fetch_table(
+                query.model_copy(update={'pe': fetched}), **fetch_options
+            )
+            fetched_at = datetime.now(timezone.utc).isoformat()
+            period_values = (
+                pc.cast(table.column('period'), pa.string()) if table.num_rows else None
+            )
+            for period in fetched:
+                part = (
+                    table.filter(pc.equal(period_values, period))
+                    if period_values is not None else table.slice(0, 0)
+                )
+                store.write_partition(period, part, fetchedAt=fetched_at)
+                result.rows_written += part.num_rows
+
+        result.dropped_periods = store.retain(periods)
+        store.state.update({'signature': signature, 'analyticsGenerated': generated})
+        store.save()
+        logger.info(
+            f"Refreshed analytics store {store_dir}: {len(fetched)}/{len(periods)} periods fetched, "
+            f"{result.rows_written} rows written"
+        )
+        return result
+
+    def load_store(self, store_dir: str, periods: Optional[Sequence[str]] = None) -> pa.Table:
+        """Read an analytics store written by ``refresh_store``"""
+        store = PartitionedParquetStore(store_dir, partition_column='period')
+        if not store.exists:
+            raise FileNotFoundError(f"No analytics store at {store_dir}")
+        return store.read(periods)
+
+    @staticmethod
+    def _store_signature(query: AnalyticsQuery) -> str:
+        """Everything except the periods identifies the query a store holds"""
+        params = query.to_params()
+        params['dimension'] = [d for d in params.get('dimension', []) if not d.startswith('pe:')]
+        return '&'.join(f"{key}={value}" for key, value in canonicalize_params(params))
+
+    async def _expand_periods(self, query: AnalyticsQuery) -> List[str]:
+        """Get the periods of a query, asking the server to expand relative periods"""
+        periods = query_dimension_items(query).get('pe', ())
+        if all(is_literal_item(p) for p in periods):
+            return list(dict.fromkeys(periods))
+
+        response = await self.raw(query.model_copy(update={'skip_data': True, 'skip_meta': False}))
+        expanded = response.get('metaData', {}).get('dimensions', {}).get('pe')
+        if not expanded:
+            raise ValueError(f"Server did not expand the periods of {';'.join(periods)}")
+        return list(dict.fromkeys(expanded))
+
     async def get_dimensions(self) -> Dict[str, Any]:
         """Get available dimensions"""
         return await self.client.get('/api/analytics/dimensions')
@@ -119,6 +690,49 @@ class AnalyticsEndpoint:
         """Get items for a specific dimension"""
         return await self.client.get(f'/api/analytics/dimensions/{dimension}')
 
+    async def explain(
+        self,
+        query: AnalyticsQuery,
+        max_cells: int = 50_000,
+        include_names: bool = False
+    ) -> QueryExplanation:
+        """Estimate a query before running it, resolving org unit keywords from metadata.
+
+        Only metadata is requested (through the metadata cache tier when
+        enabled), and only when the ``ou`` dimension has keyword items.
+        """
+        ou_items = query_dimension_items(query).get('ou', ())
+        org_units = None
+        if not all(is_literal_item(item) for item in ou_items):
+            org_units = await self.get_org_unit_index(
+                groups=any(item.startswith('OU_GROUP-') for item in ou_items)
+            )
+        return query.explain(
+            org_units=org_units,
+            max_cells=max_cells,
+            max_concurrency=self.client.config.concurrency,
+            include_names=include_names
+        )
+
+    async def get_org_unit_index(self, groups: bool = False) -> OrgUnitIndex:
+        """Build the organisation unit hierarchy used to expand ``ou`` keywords"""
+        units = await self.client.metadata.get_organisation_units(fields='id,level,path')
+        me = await self.client.get('/api/me', params={'fields': 'organisationUnits[id]'})
+        group_members = None
+        if groups:
+            response = await self.client.metadata.get_organisation_unit_groups(
+                fields='id,organisationUnits[id]'
+            )
+            group_members = {
+                group['id']: [unit['id'] for unit in group.get('organisationUnits', [])]
+                for group in response.get('organisationUnitGroups', [])
+            }
+        return OrgUnitIndex(
+            units.get('organisationUnits', []),
+            user_org_units=[unit['id'] for unit in me.get('organisationUnits', [])],
+            groups=group_members
+        )
+
     async def validate_query(self, query: AnalyticsQuery) -> Dict[str, Any]:
         """Validate query (dry run)"""
         params = query.to_params()
@@ -1,16 +1,46 @@
 """DataValueSets endpoint - Data value set reading and import"""
 
+import asyncio
+import hashlib
 import json
+import logging
 import math
-from collections.abc import AsyncIterator
-from typing import Any, Dict, Optional, Union
+import os
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from pydhis2.core.errors import ImportConflictError
-from pydhis2.core.types import ExportFormat, ImportConfig
+from pydhis2.core.errors import ImportConflictError, ImportJobError, PartitionFetchError
+from pydhis2.core.planner import AdaptiveChunkSizer, OrgUnitIndex
+from pydhis2.core.types import ExportFormat, ImportConfig, ImportStrategy
 from pydhis2.io.arrow import ArrowConverter
-from pydhis2.io.to_pandas import DataValueSetsConverter
+from pydhis2.io.store import DataValueIndex, PartitionedParquetStore
+from pydhis2.io.to_pandas import (
+    CATEGORICAL_COLUMNS,
+    DataValueSetsConverter,
+    use_categorical,
+)
+
+logger = logging.getLogger(__name__)
+
+# Called with (chunk index, total chunks or None if unknown, chunk summary) after each chunk
+ProgressCallback = Callable[[int, Optional[int], "ImportSummary"], None]
+
+# Columns identifying a data value, and of a synced store; values are kept as the server sent them
+SYNC_KEY_COLUMNS = ['dataElement', 'period', 'orgUnit', 'categoryOptionCombo', 'attributeOptionCombo']
+SYNC_SCHEMA = pa.schema(
+    [(name, pa.string()) for name in SYNC_KEY_COLUMNS]
+    + [(name, pa.string()) for name in ('value', 'storedBy', 'created', 'lastUpdated', 'comment')]
+    + [('followup', pa.bool_())]
+)
 
 
 class ImportSummary:
@@ -19,11 +49,14 @@ class ImportSummary:
     def __init__(self, summary_data: Dict[str, Any]):
         self.raw_data = summary_data
         self.status = summary_data.get('status', 'UNKNOWN')
-        self.imported = summary_data.get('imported', 0)
-        self.updated = summary_data.get('updated', 0)
-        self.deleted = summary_data.get('deleted', 0)
-        self.ignored = summary_data.get('ignored', 0)
-        self.total = summary_data.get('total', 0)
+
+        # Task summaries nest the counts under importCount
+        counts = summary_data.get('importCount') or summary_data
+        self.imported = counts.get('imported', 0)
+        self.updated = counts.get('updated', 0)
+        self.deleted = counts.get('deleted', 0)
+        self.ignored = counts.get('ignored', 0)
+        self.total = summary_data.get('total', self.imported + self.updated + self.ignored + self.deleted)
 
         # Conflict information
         self.conflicts = summary_data.get('conflicts', [])
@@ -69,13 +102,276 @@ class ImportSummary:
         }
 
 
+@dataclass(frozen=True)
+class ImportJob:
+    """A server-side import job started with ``async=true``"""
+    task_id: str
+    job_type: str = 'DATAVALUE_IMPORT'
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> Optional['ImportJob']:
+        """Get the job from a job-accepted response, or None for an import summary"""
+        job = response.get('response', {})
+        if not isinstance(job, dict) or 'jobType' not in job or 'id' not in job:
+            return None
+        return cls(task_id=job['id'], job_type=job['jobType'])
+
+
+class ImportJobPoller:
+    """Follows many server-side import jobs with one polling loop
+
+    Each round reads ``/api/system/tasks/{jobType}`` once for all pending
+    jobs of that type and fetches the task summaries of completed jobs
+    concurrently. The interval starts at ``min_interval`` and grows by
+    ``backoff_factor`` up to ``max_interval`` while no job completes.
+    """
+
+    def __init__(
+        self,
+        client,
+        min_interval: float = 0.5,
+        max_interval: float = 15.0,
+        backoff_factor: float = 1.5,
+        job_timeout: Optional[float] = 3600.0
+    ):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.job_timeout = job_timeout
+        self._pending: Dict[ImportJob, Tuple[asyncio.Future, float]] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.polls = 0
+        self.completed = 0
+
+    async def wait(self, job: ImportJob) -> Dict[str, Any]:
+        """Wait for a job to complete and return its import summary"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job] = (future, time.monotonic())
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.ensure_future(self._poll_loop())
+        try:
+            return await future
+        finally:
+            self._pending.pop(job, None)
+
+    async def _poll_loop(self) -> None:
+        interval = self.min_interval
+        while self._pending:
+            await asyncio.sleep(interval)
+            try:
+                finished = await self._poll_once()
+            except Exception as e:
+                # Every waiter gets the error rather than hanging
+                for future, _ in list(self._pending.values()):
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            interval = self.min_interval if finished else min(interval * self.backoff_factor, self.max_interval)
+
+    async def _poll_once(self) -> int:
+        """Poll pending jobs once; returns the number that finished"""
+        done: List[ImportJob] = []
+        for job_type in {job.job_type for job in self._pending}:
+            notifications = await self.client.get(f'/api/system/tasks/{job_type}', use_cache=False)
+            self.polls += 1
+            for job in [job for job in self._pending if job.job_type == job_type]:
+                if any(n.get('completed') for n in notifications.get(job.task_id, [])):
+                    done.append(job)
+
+        summaries = await asyncio.gather(
+            *(
+                self.client.get(f'/api/system/taskSummaries/{job.job_type}/{job.task_id}', use_cache=False)
+                for job in done
+            ),
+            return_exceptions=True
+        )
+        now = time.monotonic()
+        for job, summary in zip(done, summaries):
+            future = self._pending[job][0]
+            if future.done():
+                continue
+            if isinstance(summary, BaseException):
+                future.set_exception(summary)
+            else:
+                future.set_result(summary)
+                self.completed += 1
+
+        if self.job_timeout is not None:
+            for job, (future, started) in list(self._pending.items()):
+                if not future.done() and now - started > self.job_timeout:
+                    future.set_exception(
+                        ImportJobError(job.task_id, job.job_type, f"not completed after {self.job_timeout}s")
+                    )
+        return len(done)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics"""
+        return {
+            'pending': len(self._pending),
+            'completed': self.completed,
+            'polls': self.polls,
+        }
+
+
+def _values_fingerprint(data_values: List[Dict[str, Any]]) -> str:
+    """Hash data values independently of key order"""
+    content = json.dumps(data_values, sort_keys=True, separators=(',', ':'), default=str)
+    return 'sha256:' + hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _file_fingerprint(file_path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """Hash a file's contents in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return 'sha256:' + digest.hexdigest()
+
+
+class PushJournal:
+    """On-disk record of a chunked push, used to resume it after a failure
+
+    The journal is a JSON-lines file. The first line describes the push
+    (payload fingerprint, chunk size and import parameters); each chunk the
+    server acknowledged appends its row range, status and summary, flushed
+    to disk before the chunk counts as done. Chunks with conflicts in a
+    non-atomic import are acknowledged too, since the server processed them.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.header: Optional[Dict[str, Any]] = None
+        self.chunks: Dict[int, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A record cut short by a crash; its chunk is pushed again
+                    continue
+                if 'fingerprint' in record:
+                    self.header = record
+                else:
+                    self.chunks[record['chunk']] = record
+
+    def _write(self, record: Dict[str, Any], mode: str = 'a') -> None:
+        with open(self.path, mode, encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(
+        self,
+        fingerprint: str,
+        chunk_size: int,
+        params: Dict[str, Any],
+        total_values: Optional[int] = None
+    ) -> None:
+        """Begin a push, or check that it is the push the journal was written for"""
+        header = {
+            'fingerprint': fingerprint,
+            'chunkSize': chunk_size,
+            'params': params,
+            'totalValues': total_values,
+        }
+        if self.header is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(header, mode='w')
+            self.header = header
+            self.chunks = {}
+            return
+
+        mismatched = [key for key in ('fingerprint', 'chunkSize', 'params') if self.header.get(key) != header[key]]
+        if mismatched:
+            raise ValueError(
+                f"Push journal {self.path} belongs to a different push "
+                f"({', '.join(mismatched)} differ); remove it to start over"
+            )
+
+    def is_acknowledged(self, chunk_idx: int) -> bool:
+        return chunk_idx in self.chunks
+
+    @property
+    def acknowledged_values(self) -> int:
+        """Number of data values in acknowledged chunks"""
+        return sum(record['end'] - record['start'] for record in self.chunks.values())
+
+    def record(self, chunk_idx: int, value_count: int, summary: 'ImportSummary') -> None:
+        """Mark a chunk as acknowledged by the server"""
+        if self.header is None:
+            raise ValueError("Push journal has not been started")
+        start = chunk_idx * self.header['chunkSize']
+        record = {
+            'chunk': chunk_idx,
+            'start': start,
+            'end': start + value_count,
+            'status': summary.status,
+            'summary': summary.raw_data,
+        }
+        self._write(record)
+        self.chunks[chunk_idx] = record
+
+    def summaries(self) -> Dict[int, 'ImportSummary']:
+        """Summaries of acknowledged chunks by chunk index"""
+        return {chunk_idx: ImportSummary(record['summary']) for chunk_idx, record in self.chunks.items()}
+
+    def clear(self) -> None:
+        """Delete the journal file"""
+        self.path.unlink(missing_ok=True)
+        self.header = None
+        self.chunks = {}
+
+
+@dataclass
+class DataValueSyncResult:
+    """Outcome of a data value store sync"""
+    path: str
+    watermark: str
+    previous_watermark: Optional[str] = None
+    values_fetched: int = 0
+    values_deleted: int = 0
+    periods_written: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class PullShard:
+    """One request of a sharded pull: organisation units and periods"""
+    index: int
+    org_units: Tuple[str, ...]
+    children: bool
+    periods: Optional[Tuple[str, ...]] = None
+
+    def to_params(self, base_params: Dict[str, Any]) -> Dict[str, Any]:
+        params = dict(base_params)
+        params['orgUnit'] = list(self.org_units)
+        params['children'] = str(self.children).lower()
+        if self.periods is not None:
+            params['period'] = list(self.periods)
+        return params
+
+
 class DataValueSetsEndpoint:
     """DataValueSets API endpoint"""
 
-    def __init__(self, client):
+    def __init__(self, client, chunk_sizer: Optional[AdaptiveChunkSizer] = None):
         self.client = client
         self.converter = DataValueSetsConverter()
         self.arrow_converter = ArrowConverter()
+        self.job_poller = ImportJobPoller(client)
+        # Learns push chunk sizes (in data values) from import latency
+        self.chunk_sizer = chunk_sizer
+
+        # Retries of a single shard of a sharded pull, on top of request retries
+        self.shard_retries = 2
+        self.shard_retry_delay = 1.0
 
     async def pull(
         self,
@@ -88,6 +384,7 @@ class DataValueSetsEndpoint:
         last_updated: Optional[str] = None,
         completed_only: bool = False,
         include_deleted: bool = False,
+        categorical: Optional[bool] = None,
         **kwargs
     ) -> pd.DataFrame:
         """Pull data value sets"""
@@ -116,12 +413,265 @@ class DataValueSetsEndpoint:
         params.update(kwargs)
 
         response = await self.client.get('/api/dataValueSets', params=params)
-        return self.converter.to_dataframe(response)
+        return self.converter.to_dataframe(response, categorical=categorical)
+
+    async def plan_shards(
+        self,
+        org_unit: Union[str, Sequence[str]],
+        periods: Optional[Sequence[str]] = None,
+        org_unit_level: Optional[int] = None,
+        periods_per_shard: int = 12,
+        org_units_per_shard: int = 1
+    ) -> List[PullShard]:
+        """Split a pull into organisation unit subtrees x period groups
+
+        Subtrees are rooted at ``org_unit_level`` (default: one level below
+        the shallowest root), read from the organisation unit hierarchy, which
+        goes through the metadata cache tier when it is enabled. Units above
+        that level are pulled without children in one extra shard per period
+        group.
+        """
+        roots = [org_unit] if isinstance(org_unit, str) else list(org_unit)
+        units = await self.client.metadata.get_organisation_units(fields='id,level,path')
+        index = OrgUnitIndex(units.get('organisationUnits', []))
+        if org_unit_level is None:
+            org_unit_level = min(index.levels.get(root, 0) for root in roots) + 1
+        subtree_roots, upper = index.subtrees(roots, org_unit_level)
+
+        org_unit_groups = [
+            (tuple(subtree_roots[i:i + org_units_per_shard]), True)
+            for i in range(0, len(subtree_roots), org_units_per_shard)
+        ]
+        if upper:
+            org_unit_groups.append((tuple(upper), False))
+
+        period_groups: List[Optional[Tuple[str, ...]]] = [None]
+        if periods is not None:
+            period_groups = [
+                tuple(periods[i:i + periods_per_shard]) for i in range(0, len(periods), periods_per_shard)
+            ]
+
+        shards: List[PullShard] = []
+        for period_group in period_groups:
+            for org_units, children in org_unit_groups:
+                shards.append(PullShard(len(shards), org_units, children, period_group))
+        return shards
+
+    async def stream_sharded(
+        self,
+        data_set: Union[str, Sequence[str]],
+        org_unit: Union[str, Sequence[str]],
+        periods: Optional[Sequence[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        org_unit_level: Optional[int] = None,
+        periods_per_shard: int = 12,
+        org_units_per_shard: int = 1,
+        concurrency: int = 4,
+        last_updated: Optional[str] = None,
+        include_deleted: bool = False,
+        **kwargs
+    ) -> AsyncIterator[Tuple[PullShard, pd.DataFrame]]:
+        """Pull shards concurrently, yielding each as it completes
+
+        Shards come from :meth:`plan_shards`. Give either ``periods`` (split
+        into groups of ``periods_per_shard``) or ``start_date``/``end_date``
+        (not split: a period crossing a split date would fall between shards).
+        A failing shard is retried on its own ``shard_retries`` times; shards
+        that still fail are reported by a ``PartitionFetchError`` after the
+        others have been yielded.
+        """
+        base_params: Dict[str, Any] = {'dataSet': data_set if isinstance(data_set, str) else list(data_set)}
+        if start_date:
+            base_params['startDate'] = start_date
+        if end_date:
+            base_params['endDate'] = end_date
+        if last_updated:
+            base_params['lastUpdated'] = last_updated
+        if include_deleted:
+            base_params['includeDeleted'] = 'true'
+        base_params.update(kwargs)
+
+        shards = await self.plan_shards(
+            org_unit, periods, org_unit_level, periods_per_shard, org_units_per_shard
+        )
+        async for shard, response in self._fetch_shards(shards, base_params, concurrency):
+            yield shard, self.converter.to_dataframe(response, categorical=False)
+
+    async def _fetch_shards(
+        self,
+        shards: List[PullShard],
+        base_params: Dict[str, Any],
+        concurrency: int,
+        use_cache: bool = True
+    ) -> AsyncIterator[Tuple[PullShard, Dict[str, Any]]]:
+        """Fetch shards concurrently, yielding responses as they complete"""
+        pending: asyncio.Queue = asyncio.Queue()
+        for shard in shards:
+            pending.put_nowait(shard)
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def _fetch(shard: PullShard) -> Dict[str, Any]:
+            for attempt in range(self.shard_retries + 1):
+                try:
+                    return await self.client.get(
+                        '/api/dataValueSets', params=shard.to_params(base_params), use_cache=use_cache
+                    )
+                except Exception as e:
+                    if attempt == self.shard_retries:
+                        raise
+                    logger.warning(f"Shard {shard.index + 1}/{len(shards)} failed (attempt {attempt + 1}): {e}")
+                    await asyncio.sleep(self.shard_retry_delay * (2 ** attempt))
+
+        async def _worker() -> None:
+            while not pending.empty():
+                shard = pending.get_nowait()
+                try:
+                    finished.put_nowait((shard, await _fetch(shard), None))
+                except Exception as e:
+                    finished.put_nowait((shard, None, e))
+
+        workers = [asyncio.ensure_future(_worker()) for _ in range(max(1, min(concurrency, len(shards))))]
+        errors: Dict[int, str] = {}
+        try:
+            for _ in range(len(shards)):
+                shard, response, error = await finished.get()
+                if error is not None:
+                    errors[shard.index] = str(error)
+                    continue
+                yield shard, response
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if errors:
+            failed = sorted(errors)
+            raise PartitionFetchError(failed, len(shards), [errors[shard_idx] for shard_idx in failed])
+
+    async def sync_to_store(
+        self,
+        store_dir: str,
+        data_set: str,
+        org_unit: str,
+        periods: Optional[Sequence[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        full: bool = False,
+        org_unit_level: Optional[int] = None,
+        periods_per_shard: int = 12,
+        concurrency: int = 4
+    ) -> DataValueSyncResult:
+        """Sync data values into a local Parquet store partitioned by period
+
+        The store keeps a ``lastUpdated`` watermark per data set and org unit
+        root. The first run (or ``full=True``) pulls everything in
+        ``periods`` or the date range; later runs pull only values changed
+        since the watermark, deleted ones included, and upsert them into the
+        period partitions. The new watermark is the server time taken before
+        the pull, and is only saved once every shard has been applied.
+        """
+        store = PartitionedParquetStore(store_dir, partition_column='period')
+        watermarks = store.state.setdefault('watermarks', {})
+        key = f"{data_set}/{org_unit}"
+        previous = None if full else watermarks.get(key)
+        if previous is None and periods is None and not (start_date and end_date):
+            raise ValueError("A full sync needs periods or a start and end date")
+
+        info = await self.client.get('/api/system/info', use_cache=False)
+        watermark = info.get('serverDate') or datetime.now(timezone.utc).isoformat()
+        result = DataValueSyncResult(path=str(store.path), watermark=watermark, previous_watermark=previous)
+
+        base_params: Dict[str, Any] = {'dataSet': data_set, 'includeDeleted': 'true'}
+        if start_date:
+            base_params['startDate'] = start_date
+        if end_date:
+            base_params['endDate'] = end_date
+        if previous is not None:
+            base_params['lastUpdated'] = previous
+
+        shards = await self.plan_shards(org_unit, periods, org_unit_level, periods_per_shard)
+        written = set()
+        try:
+            async for _, response in self._fetch_shards(shards, base_params, concurrency, use_cache=False):
+                values = response.get('dataValues', [])
+                result.values_fetched += len(values)
+                deleted, shard_periods = await asyncio.to_thread(self._upsert_values, store, values)
+                result.values_deleted += deleted
+                written.update(shard_periods)
+        finally:
+            # Partitions written so far stay listed; the watermark only moves on success
+            store.retain(sorted(store.partitions()))
+            store.save()
+            result.periods_written = sorted(written)
+
+        watermarks[key] = watermark
+        store.save()
+        logger.info(
+            f"Synced {key} into {store_dir}: {result.values_fetched} values fetched "
+            f"({result.values_deleted} deleted), {len(written)} periods written"
+        )
+        return result
+
+    @staticmethod
+    def _upsert_values(store: PartitionedParquetStore, data_values: List[Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """Merge data values into their period partitions; later values and tombstones win"""
+        if not data_values:
+            return 0, []
+        updates = pd.DataFrame(data_values).reindex(columns=SYNC_SCHEMA.names + ['deleted'])
+        updates['value'] = updates['value'].where(updates['value'].isna(), updates['value'].astype(str))
+        deleted = int(updates['deleted'].eq(True).sum())
+        synced_at = datetime.now(timezone.utc).isoformat()
+
+        for period, changes in updates.groupby('period', sort=False):
+            existing = store.read([period]).to_pandas() if store.partition_info(period) else None
+            merged = pd.concat([existing, changes], ignore_index=True) if existing is not None else changes
+            merged = merged.drop_duplicates(subset=SYNC_KEY_COLUMNS, keep='last')
+            merged = merged[~merged['deleted'].eq(True)]
+            store.write_partition(
+                period,
+                pa.Table.from_pandas(merged[SYNC_SCHEMA.names], schema=SYNC_SCHEMA, preserve_index=False),
+                syncedAt=synced_at
+            )
+        return deleted, list(updates['period'].unique())
+
+    def load_store(self, store_dir: str, periods: Optional[Sequence[str]] = None) -> pa.Table:
+        """Read a data value store written by ``sync_to_store``"""
+        store = PartitionedParquetStore(store_dir, partition_column='period')
+        if not store.exists:
+            raise FileNotFoundError(f"No data value store at {store_dir}")
+        return store.read(periods)
+
+    async def pull_sharded(
+        self,
+        data_set: Union[str, Sequence[str]],
+        org_unit: Union[str, Sequence[str]],
+        categorical: Optional[bool] = None,
+        **kwargs
+    ) -> pd.DataFrame:
+        """Pull data value sets as concurrent shards merged into one DataFrame
+
+        Takes the options of :meth:`stream_sharded`; rows are in shard order.
+        """
+        frames: Dict[int, pd.DataFrame] = {}
+        async for shard, frame in self.stream_sharded(data_set, org_unit, **kwargs):
+            if not frame.empty:
+                frames[shard.index] = frame
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat([frames[shard_idx] for shard_idx in sorted(frames)], ignore_index=True)
+        if use_categorical(categorical, len(df)):
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns:
+                    df[col] = df[col].astype('category')
+        return df
 
     async def pull_paginated(
         self,
         page_size: int = 5000,
         max_pages: Optional[int] = None,
+        categorical: Optional[bool] = None,
         **kwargs
     ) -> AsyncIterator[pd.DataFrame]:
         """Pull paginated data value sets"""
@@ -137,7 +687,7 @@ class DataValueSetsEndpoint:
 
             try:
                 response = await self.client.get('/api/dataValueSets', params=page_kwargs)
-                df = self.converter.to_dataframe(response)
+                df = self.converter.to_dataframe(response, categorical=categorical)
 
                 if not df.empty:
                     yield df
@@ -156,7 +706,7 @@ class DataValueSetsEndpoint:
                 # Some DHIS2 versions may not support paging
                 if page == 1:
                     # Fallback to non-paginated mode
-                    df = await self.pull(**kwargs)
+                    df = await self.pull(categorical=categorical, **kwargs)
                     if not df.empty:
                         yield df
                 break
@@ -168,9 +718,25 @@ class DataValueSetsEndpoint:
         data: Union[pd.DataFrame, Dict[str, Any], str],
         config: Optional[ImportConfig] = None,
         chunk_size: int = 5000,
-        resume_from_chunk: int = 0
+        resume_from_chunk: int = 0,
+        progress_callback: Optional[ProgressCallback] = None,
+        journal: Optional[Union[str, Path, PushJournal]] = None,
+        delta_index: Optional[Union[str, Path, DataValueIndex]] = None
     ) -> ImportSummary:
-        """Push (import) data value sets"""
+        """Push (import) data value sets
+
+        Data larger than ``chunk_size`` is pushed in chunks; with
+        ``config.atomic=False`` up to ``config.max_concurrent_chunks`` of them
+        are in flight at once. ``progress_callback`` is called after each chunk.
+        With ``self.chunk_sizer`` set, chunk sizes follow the server's import
+        latency instead of ``chunk_size``, except for journaled or resumed
+        pushes, which need fixed chunk boundaries.
+
+        With a ``journal`` path, acknowledged chunks are recorded on disk and
+        skipped when the same push is run again. With a ``delta_index`` path,
+        only values that are new or changed since the last successful push
+        through that index are sent.
+        """
         if config is None:
             config = ImportConfig()
 
@@ -182,20 +748,78 @@ class DataValueSetsEndpoint:
         else:
             data_dict = data
 
+        delta = None
+        unchanged = 0
+        if delta_index is not None:
+            if not isinstance(delta_index, DataValueIndex):
+                delta_index = await asyncio.to_thread(DataValueIndex, delta_index)
+            value_count = len(data_dict.get('dataValues', []))
+            data_dict, delta = await asyncio.to_thread(self._select_delta, data_dict, delta_index, config)
+            unchanged = value_count - len(data_dict['dataValues'])
+            logger.info(f"Delta push: {len(data_dict['dataValues'])} changed values, {unchanged} unchanged")
+            if not data_dict['dataValues']:
+                return ImportSummary({'status': 'SUCCESS', 'total': 0, 'unchanged': unchanged})
+
         # If data is large, process in chunks
         data_values = data_dict.get('dataValues', [])
-        if len(data_values) <= chunk_size:
-            return await self._push_single(data_dict, config)
+        adaptive = self.chunk_sizer is not None and journal is None and resume_from_chunk == 0
+        if adaptive:
+            summary = await self._push_adaptive_chunked(data_dict, config, progress_callback)
+        elif len(data_values) <= chunk_size and journal is None:
+            summary = await self._push_single(data_dict, config)
         else:
-            return await self._push_chunked(data_dict, config, chunk_size, resume_from_chunk)
+            summary = await self._push_chunked(
+                data_dict, config, chunk_size, resume_from_chunk, progress_callback, journal
+            )
 
-    async def _push_single(
-        self,
+        if delta is not None:
+            summary.raw_data['unchanged'] = unchanged
+            # Failed imports and ignored values have to be sent again next time
+            stored = summary.status in ('SUCCESS', 'WARNING') and summary.ignored == 0
+            if stored and not config.dry_run:
+                await asyncio.to_thread(self._update_delta_index, delta_index, delta, config)
+        return summary
+
+    @staticmethod
+    def _select_delta(
         data_dict: Dict[str, Any],
+        delta_index: DataValueIndex,
         config: ImportConfig
-    ) -> ImportSummary:
-        """Single push"""
-        params = {
+    ) -> Tuple[Dict[str, Any], Tuple[np.ndarray, np.ndarray]]:
+        """Keep the values not already in the index
+
+        Returns the payload to send and the key and content hashes of the sent
+        values. Deletions are always sent.
+        """
+        data_values = data_dict.get('dataValues', [])
+        key_hashes, value_hashes = delta_index.hash_values(data_values)
+        if config.strategy == ImportStrategy.DELETE:
+            changed = np.ones(len(data_values), dtype=bool)
+        else:
+            changed = delta_index.changed(key_hashes, value_hashes)
+
+        delta_dict = data_dict.copy()
+        delta_dict['dataValues'] = [data_values[i] for i in np.flatnonzero(changed)]
+        return delta_dict, (key_hashes[changed], value_hashes[changed])
+
+    @staticmethod
+    def _update_delta_index(
+        delta_index: DataValueIndex,
+        hashes: Tuple[np.ndarray, np.ndarray],
+        config: ImportConfig
+    ) -> None:
+        """Record a successful push in the index and save it"""
+        key_hashes, value_hashes = hashes
+        if config.strategy == ImportStrategy.DELETE:
+            delta_index.remove(key_hashes)
+        else:
+            delta_index.update(key_hashes, value_hashes)
+        delta_index.save()
+
+    @staticmethod
+    def _import_params(config: ImportConfig) -> Dict[str, str]:
+        """Query parameters of an import"""
+        return {
             'strategy': config.strategy.value,
             'dryRun': str(config.dry_run).lower(),
             'atomic': str(config.atomic).lower(),
@@ -204,6 +828,37 @@ class DataValueSetsEndpoint:
             'force': str(config.force).lower(),
         }
 
+    async def _start_journal(
+        self,
+        journal: Optional[Union[str, Path, PushJournal]],
+        fingerprint: Callable[[], str],
+        config: ImportConfig,
+        chunk_size: int,
+        total_values: Optional[int]
+    ) -> Optional[PushJournal]:
+        """Open a push journal and check it against this push"""
+        if journal is None:
+            return None
+        if not isinstance(journal, PushJournal):
+            journal = PushJournal(journal)
+        journal.start(
+            await asyncio.to_thread(fingerprint),
+            chunk_size,
+            self._import_params(config),
+            total_values
+        )
+        if journal.chunks:
+            logger.info(f"Resuming push from {journal.path}: {len(journal.chunks)} chunks already acknowledged")
+        return journal
+
+    async def _push_single(
+        self,
+        data_dict: Dict[str, Any],
+        config: ImportConfig
+    ) -> ImportSummary:
+        """Single push"""
+        params = self._import_params(config)
+
         if config.async_import:
             params['async'] = 'true'
 
@@ -213,6 +868,12 @@ class DataValueSetsEndpoint:
             params=params
         )
 
+        if config.async_import:
+            # The server queued a job; wait for its summary without holding a connection
+            job = ImportJob.from_response(response)
+            if job is not None:
+                response = await self.job_poller.wait(job)
+
         summary = ImportSummary(response)
 
         # Check for conflicts
@@ -224,63 +885,307 @@ class DataValueSetsEndpoint:
 
         return summary
 
+    async def push_file(
+        self,
+        file_path: Union[str, Path],
+        config: Optional[ImportConfig] = None,
+        chunk_size: int = 5000,
+        file_format: Optional[Union[str, ExportFormat]] = None,
+        resume_from_chunk: int = 0,
+        progress_callback: Optional[ProgressCallback] = None,
+        journal: Optional[Union[str, Path, PushJournal]] = None
+    ) -> ImportSummary:
+        """Push data values from a Parquet or CSV file without loading it whole
+
+        The file is read ``chunk_size`` rows at a time with pyarrow batch
+        readers and each batch is serialized and pushed as one chunk, so
+        memory stays bounded by the chunks in flight. Columns are those of
+        ``from_dataframe``; the format is taken from the file suffix unless
+        ``file_format`` is given. Chunks acknowledged in ``journal`` are
+        skipped without being serialized.
+        """
+        if config is None:
+            config = ImportConfig()
+        if file_format is not None:
+            file_format = ExportFormat(file_format).value
+        else:
+            file_format = self.arrow_converter.file_format(file_path)
+
+        # Parquet footers give the row count up front; CSV is only known once read
+        total_chunks = None
+        total_values = None
+        if file_format == 'parquet':
+            total_values = pq.ParquetFile(str(file_path)).metadata.num_rows
+            total_chunks = math.ceil(total_values / chunk_size)
+
+        journal = await self._start_journal(
+            journal, lambda: _file_fingerprint(file_path), config, chunk_size, total_values
+        )
+        skip = self._chunk_filter(resume_from_chunk, journal)
+
+        def _chunks() -> Iterator[Tuple[int, Dict[str, Any]]]:
+            batches = self.arrow_converter.iter_file_batches(file_path, chunk_size, file_format)
+            for chunk_idx, table in enumerate(batches):
+                if not skip(chunk_idx):
+                    # Integer columns with nulls stay integers instead of becoming floats ("5.0")
+                    frame = table.to_pandas(integer_object_nulls=True)
+                    yield chunk_idx, self.converter.from_dataframe(frame)
+
+        return await self._push_chunks(
+            _chunks(),
+            config,
+            pending_chunks=self._pending_count(total_chunks, skip),
+            total_chunks=total_chunks,
+            total_values=total_values,
+            progress_callback=progress_callback,
+            journal=journal
+        )
+
+    @staticmethod
+    def _chunk_filter(resume_from_chunk: int, journal: Optional[PushJournal]) -> Callable[[int], bool]:
+        """Predicate for chunks that are not pushed again"""
+        def skip(chunk_idx: int) -> bool:
+            if chunk_idx < resume_from_chunk:
+                return True
+            return journal is not None and journal.is_acknowledged(chunk_idx)
+        return skip
+
+    @staticmethod
+    def _pending_count(total_chunks: Optional[int], skip: Callable[[int], bool]) -> Optional[int]:
+        if total_chunks is None:
+            return None
+        return sum(1 for chunk_idx in range(total_chunks) if not skip(chunk_idx))
+
     async def _push_chunked(
         self,
         data_dict: Dict[str, Any],
         config: ImportConfig,
         chunk_size: int,
-        resume_from_chunk: int = 0
+        resume_from_chunk: int = 0,
+        progress_callback: Optional[ProgressCallback] = None,
+        journal: Optional[Union[str, Path, PushJournal]] = None
     ) -> ImportSummary:
         """Chunked push"""
         data_values = data_dict.get('dataValues', [])
         total_chunks = math.ceil(len(data_values) / chunk_size)
 
-        # Accumulate results
-        total_imported = 0
-        total_updated = 0
-        total_ignored = 0
-        total_conflicts = []
+        journal = await self._start_journal(
+            journal, lambda: _values_fingerprint(data_values), config, chunk_size, len(data_values)
+        )
+        skip = self._chunk_filter(resume_from_chunk, journal)
 
-        for chunk_idx in range(resume_from_chunk, total_chunks):
-            start_idx = chunk_idx * chunk_size
-            end_idx = min(start_idx + chunk_size, len(data_values))
+        def _chunks() -> Iterator[Tuple[int, Dict[str, Any]]]:
+            for chunk_idx in range(total_chunks):
+                if skip(chunk_idx):
+                    continue
+                start_idx = chunk_idx * chunk_size
+                chunk_data = data_dict.copy()
+                chunk_data['dataValues'] = data_values[start_idx:start_idx + chunk_size]
+                yield chunk_idx, chunk_data
 
-            chunk_data = data_dict.copy()
-            chunk_data['dataValues'] = data_values[start_idx:end_idx]
+        return await self._push_chunks(
+            _chunks(),
+            config,
+            pending_chunks=self._pending_count(total_chunks, skip),
+            total_chunks=total_chunks,
+            total_values=len(data_values),
+            progress_callback=progress_callback,
+            journal=journal
+        )
 
-            try:
-                chunk_summary = await self._push_single(chunk_data, config)
+    async def _push_adaptive_chunked(
+        self,
+        data_dict: Dict[str, Any],
+        config: ImportConfig,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> ImportSummary:
+        """Chunked push with chunk sizes taken from ``chunk_sizer`` as chunks are cut"""
+        data_values = data_dict.get('dataValues', [])
 
-                total_imported += chunk_summary.imported
-                total_updated += chunk_summary.updated
-                total_ignored += chunk_summary.ignored
-                total_conflicts.extend(chunk_summary.conflicts)
+        def _chunks() -> Iterator[Tuple[int, Dict[str, Any]]]:
+            start_idx = 0
+            chunk_idx = 0
+            while start_idx < len(data_values):
+                size = self.chunk_sizer.current_cells
+                chunk_data = data_dict.copy()
+                chunk_data['dataValues'] = data_values[start_idx:start_idx + size]
+                yield chunk_idx, chunk_data
+                start_idx += size
+                chunk_idx += 1
 
-                print(f"Chunk {chunk_idx + 1}/{total_chunks} completed: "
-                      f"imported={chunk_summary.imported}, "
-                      f"updated={chunk_summary.updated}, "
-                      f"conflicts={len(chunk_summary.conflicts)}")
+        return await self._push_chunks(
+            _chunks(),
+            config,
+            total_values=len(data_values),
+            progress_callback=progress_callback,
+            chunk_sizer=self.chunk_sizer
+        )
 
-            except ImportConflictError as e:
-                # Record conflicts but continue processing
-                total_conflicts.extend(e.conflicts)
-                print(f"Chunk {chunk_idx + 1}/{total_chunks} has conflicts: {len(e.conflicts)}")
+    async def _push_resized(
+        self,
+        chunk_data: Dict[str, Any],
+        config: ImportConfig,
+        chunk_sizer: AdaptiveChunkSizer,
+        chunk_sizes: List[int]
+    ) -> ImportSummary:
+        """Push a chunk, recording its latency and splitting it after overload responses
+
+        A chunk that times out or gets a 413 or 5xx response is pushed again
+        in pieces of the shrunken size. The sizes of the pushes that got an
+        answer are appended to ``chunk_sizes``.
+        """
+        values = chunk_data.get('dataValues', [])
+        start = time.time()
+        try:
+            summary = await self._push_single(chunk_data, config)
+        except ImportConflictError:
+            chunk_sizer.record_response(len(values), time.time() - start)
+            chunk_sizes.append(len(values))
+            raise
+        except Exception as e:
+            status, timed_out = chunk_sizer.failure_status(e)
+            chunk_sizer.record_response(len(values), time.time() - start, status, timed_out)
+            if not chunk_sizer.is_overload(status, timed_out) or len(values) <= chunk_sizer.min_cells:
+                raise
+
+            size = chunk_sizer.current_cells
+            logger.warning(f"Chunk of {len(values)} values failed ({e}); pushing it again in chunks of {size}")
+            summaries = []
+            for start_idx in range(0, len(values), size):
+                piece = chunk_data.copy()
+                piece['dataValues'] = values[start_idx:start_idx + size]
+                try:
+                    summaries.append(await self._push_resized(piece, config, chunk_sizer, chunk_sizes))
+                except ImportConflictError as conflict:
+                    if config.atomic:
+                        raise
+                    summaries.append(ImportSummary({**conflict.import_summary, 'conflicts': conflict.conflicts}))
+            return self._merge_summaries(summaries, len(values))
+
+        chunk_sizer.record_response(len(values), time.time() - start)
+        chunk_sizes.append(len(values))
+        return summary
+
+    @staticmethod
+    def _merge_summaries(summaries: List[ImportSummary], total: int) -> ImportSummary:
+        """Combine chunk summaries, keeping conflicts in chunk order"""
+        conflicts = [conflict for s in summaries for conflict in s.conflicts]
+        statuses = {s.status for s in summaries}
+        if 'ERROR' in statuses:
+            status = 'ERROR'
+        elif conflicts or 'WARNING' in statuses:
+            status = 'WARNING'
+        else:
+            status = 'SUCCESS'
+        return ImportSummary({
+            'status': status,
+            'imported': sum(s.imported for s in summaries),
+            'updated': sum(s.updated for s in summaries),
+            'ignored': sum(s.ignored for s in summaries),
+            'total': total,
+            'conflicts': conflicts,
+        })
 
+    async def _push_chunks(
+        self,
+        chunks: Iterator[Tuple[int, Dict[str, Any]]],
+        config: ImportConfig,
+        pending_chunks: Optional[int] = None,
+        total_chunks: Optional[int] = None,
+        total_values: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        journal: Optional[PushJournal] = None,
+        chunk_sizer: Optional[AdaptiveChunkSizer] = None
+    ) -> ImportSummary:
+        """Push chunk payloads and merge their summaries
+
+        Atomic imports push one chunk at a time and stop at the first chunk
+        with conflicts. Non-atomic imports keep up to
+        ``config.max_concurrent_chunks`` chunks in flight, still subject to the
+        client's rate limiter; chunk summaries are merged in chunk order.
+        Chunks are taken from ``chunks`` as ``(index, payload)`` pairs on a
+        worker thread only when a slot frees up, so at most one chunk per slot
+        is held in memory. Chunks already in ``journal`` count towards the
+        merged summary. With a ``chunk_sizer``, chunks are resized after
+        overload responses and the sizes pushed are listed under
+        ``chunkSizes`` in the summary.
+        """
+        results: Dict[int, ImportSummary] = journal.summaries() if journal is not None else {}
+        pushed_values = journal.acknowledged_values if journal is not None else 0
+        chunk_sizes: Dict[int, List[int]] = {}
+        chunk_lock = asyncio.Lock()
+        exhausted = False
+        total_label = total_chunks if total_chunks is not None else '?'
+
+        async def _take_chunk() -> Optional[Tuple[int, Dict[str, Any]]]:
+            nonlocal exhausted
+            async with chunk_lock:
+                if exhausted:
+                    return None
+                taken = await asyncio.to_thread(next, chunks, None)
+                if taken is None:
+                    exhausted = True
+                return taken
+
+        async def _push_chunk(chunk_idx: int, chunk_data: Dict[str, Any]) -> None:
+            nonlocal pushed_values
+            value_count = len(chunk_data.get('dataValues', []))
+            pushed_values += value_count
+            try:
+                if chunk_sizer is not None:
+                    sizes = chunk_sizes.setdefault(chunk_idx, [])
+                    chunk_summary = await self._push_resized(chunk_data, config, chunk_sizer, sizes)
+                else:
+                    chunk_summary = await self._push_single(chunk_data, config)
+                logger.info(
+                    f"Chunk {chunk_idx + 1}/{total_label} completed: "
+                    f"imported={chunk_summary.imported}, "
+                    f"updated={chunk_summary.updated}, "
+                    f"conflicts={len(chunk_summary.conflicts)}"
+                )
+            except ImportConflictError as e:
+                logger.warning(f"Chunk {chunk_idx + 1}/{total_label} has conflicts: {len(e.conflicts)}")
                 if config.atomic:
                     # Stop on conflict in atomic mode
                     raise
+                # Record conflicts but continue processing
+                chunk_summary = ImportSummary({**e.import_summary, 'conflicts': e.conflicts})
 
-        # Construct overall summary
-        total_summary_data = {
-            'status': 'SUCCESS' if not total_conflicts else 'WARNING',
-            'imported': total_imported,
-            'updated': total_updated,
-            'ignored': total_ignored,
-            'total': len(data_values),
-            'conflicts': total_conflicts,
-        }
+            results[chunk_idx] = chunk_summary
+            if journal is not None:
+                journal.record(chunk_idx, value_count, chunk_summary)
+            if progress_callback is not None:
+                progress_callback(chunk_idx, total_chunks, chunk_summary)
+
+        async def _worker() -> None:
+            while True:
+                taken = await _take_chunk()
+                if taken is None:
+                    return
+                await _push_chunk(*taken)
 
-        summary = ImportSummary(total_summary_data)
+        concurrency = 1 if config.atomic else config.max_concurrent_chunks
+        if pending_chunks is not None:
+            concurrency = max(1, min(concurrency, pending_chunks))
+        workers = [asyncio.ensure_future(_worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            # Don't leave other chunks running after a failure
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+
+        # Construct overall summary, in chunk order
+        summary = self._merge_summaries(
+            [results[chunk_idx] for chunk_idx in sorted(results)],
+            total_values if total_values is not None else pushed_values
+        )
+        if chunk_sizer is not None:
+            summary.raw_data['chunkSizes'] = [
+                size for chunk_idx in sorted(chunk_sizes) for size in chunk_sizes[chunk_idx]
+            ]
 
         if summary.has_conflicts and not config.dry_run:
             raise ImportConflictError(
@@ -294,6 +1199,11 @@ class DataValueSetsEndpoint:
         """Get async import status"""
         return await self.client.get(f'/api/system/tasks/dataValueImport/{task_id}')
 
+    async def get_import_summary(self, task_id: str, job_type: str = 'DATAVALUE_IMPORT') -> ImportSummary:
+        """Get the import summary of a completed async import job"""
+        response = await self.client.get(f'/api/system/taskSummaries/{job_type}/{task_id}', use_cache=False)
+        return ImportSummary(response)
+
     async def export_to_file(
         self,
         file_path: str,
@@ -1,13 +1,18 @@
 """Metadata endpoint - Metadata import, export, and management"""
 
 import json
-from typing import Any, Dict, Optional, Union
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple, Union
 
 import pandas as pd
 
+from pydhis2.core.cache import HTTPCache
 from pydhis2.core.errors import ImportConflictError
 from pydhis2.core.types import ExportFormat
 
+logger = logging.getLogger(__name__)
+
 
 class MetadataImportSummary:
     """Metadata import summary"""
@@ -75,11 +80,110 @@ class MetadataImportSummary:
         return pd.DataFrame(conflicts)
 
 
+class MetadataCache:
+    """Long-TTL metadata cache tier with lastUpdated invalidation
+
+    Cached responses are kept for days. Before one is reused, a cheap probe
+    (``fields=lastUpdated&order=lastUpdated:desc&pageSize=1``) reads the most
+    recent ``lastUpdated`` and the object count for the object type; the
+    cached response is only reused while both are unchanged.
+    """
+
+    def __init__(self, cache: HTTPCache, probe_interval: float = 60.0):
+        self.cache = cache
+        self.probe_interval = probe_interval  # Seconds a probe result is trusted
+        self._probes: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.probes = 0
+
+    async def probe(self, client, endpoint: str) -> Dict[str, Any]:
+        """Get the change signature of an object type"""
+        now = time.time()
+        probed = self._probes.get(endpoint)
+        if probed and now - probed[0] < self.probe_interval:
+            return probed[1]
+
+        response = await client.get(
+            endpoint,
+            params={
+                'fields': 'lastUpdated',
+                'order': 'lastUpdated:desc',
+                'pageSize': 1,
+                'paging': 'true',
+            },
+            use_cache=False,
+        )
+        self.probes += 1
+
+        items = next(
+            (value for key, value in response.items() if key != 'pager' and isinstance(value, list)),
+            []
+        )
+        signature = {
+            'lastUpdated': items[0].get('lastUpdated') if items else None,
+            'total': response.get('pager', {}).get('total'),
+        }
+        self._probes[endpoint] = (now, signature)
+        return signature
+
+    async def get_or_fetch(
+        self,
+        client,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Return the cached response if the object type is unchanged, otherwise re-fetch"""
+        # Probe first so that changes made during the fetch invalidate next time
+        signature = await self.probe(client, endpoint)
+        url = client._build_url(endpoint)
+
+        entry = await self.cache.get(url, params)
+        if entry is not None and entry.data is not None:
+            if entry.data.get('signature') == signature:
+                self.hits += 1
+                return entry.data['response']
+            self.invalidations += 1
+            logger.debug(f"Metadata changed, re-fetching {endpoint}")
+        else:
+            self.misses += 1
+
+        response = await client.get(endpoint, params=params, use_cache=False)
+        await self.cache.set(url, {'signature': signature, 'response': response}, params=params)
+        return response
+
+    def invalidate(self, endpoint: Optional[str] = None) -> None:
+        """Forget probe results so the next call checks the server again"""
+        if endpoint is None:
+            self._probes.clear()
+        else:
+            self._probes.pop(endpoint, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'probes': self.probes,
+        }
+
+
 class MetadataEndpoint:
     """Metadata API endpoint"""
 
-    def __init__(self, client):
+    def __init__(self, client, metadata_cache: Optional[MetadataCache] = None):
         self.client = client
+        self.metadata_cache = metadata_cache
+
+    async def _get_metadata(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET an object type, through the metadata cache tier when enabled"""
+        if self.metadata_cache is not None:
+            return await self.metadata_cache.get_or_fetch(self.client, endpoint, params)
+        return await self.client.get(endpoint, params=params)
 
     async def export(
         self,
@@ -146,6 +250,9 @@ class MetadataEndpoint:
 
         summary = MetadataImportSummary(response)
 
+        if self.metadata_cache is not None and not dry_run:
+            self.metadata_cache.invalidate()
+
         # Check for errors
         if summary.has_errors and not dry_run:
             conflicts_df = summary.get_conflicts_df()
@@ -185,7 +292,7 @@ class MetadataEndpoint:
 
         params.update(kwargs)
 
-        return await self.client.get('/api/dataElements', params=params)
+        return await self._get_metadata('/api/dataElements', params)
 
     async def get_indicators(
         self,
@@ -206,7 +313,7 @@ class MetadataEndpoint:
 
         params.update(kwargs)
 
-        return await self.client.get('/api/indicators', params=params)
+        return await self._get_metadata('/api/indicators', params)
 
     async def get_organisation_units(
         self,
@@ -227,7 +334,22 @@ class MetadataEndpoint:
 
         params.update(kwargs)
 
-        return await self.client.get('/api/organisationUnits', params=params)
+        return await self._get_metadata('/api/organisationUnits', params)
+
+    async def get_organisation_unit_groups(
+        self,
+        fields: str = "id,name,organisationUnits[id]",
+        paging: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Get organisation unit groups"""
+        params = {
+            'fields': fields,
+            'paging': str(paging).lower(),
+        }
+        params.update(kwargs)
+
+        return await self._get_metadata('/api/organisationUnitGroups', params)
 
     async def get_option_sets(
         self,
@@ -248,7 +370,7 @@ class MetadataEndpoint:
 
         params.update(kwargs)
 
-        return await self.client.get('/api/optionSets', params=params)
+        return await self._get_metadata('/api/optionSets', params)
 
     async def validate_metadata(
         self,
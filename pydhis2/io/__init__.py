@@ -1,7 +1,8 @@
 """I/O module - Data format conversion and serialization"""
 
-from pydhis2.io.arrow import ArrowConverter
+from pydhis2.io.arrow import AnalyticsArrowConverter, ArrowConverter
 from pydhis2.io.schema import SchemaManager
+from pydhis2.io.store import DataValueIndex, PartitionedParquetStore
 from pydhis2.io.to_pandas import (
     AnalyticsDataFrameConverter,
     DataValueSetsConverter,
@@ -13,5 +14,8 @@ __all__ = [
     "DataValueSetsConverter",
     "TrackerConverter",
     "ArrowConverter",
+    "AnalyticsArrowConverter",
     "SchemaManager",
+    "PartitionedParquetStore",
+    "DataValueIndex",
 ]
@@ -1,12 +1,49 @@
 """Arrow format converter"""
 
+import csv
+import io
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 import pyarrow.parquet as pq
 
+# Analytics header name -> column name in long format
+ANALYTICS_LONG_COLUMNS = {
+    'dx': 'dx',
+    'pe': 'period',
+    'ou': 'orgUnit',
+    'co': 'categoryOptionCombo',
+    'ao': 'attributeOptionCombo',
+    'value': 'value',
+}
+
+# Long-format columns that are dictionary encoded
+ANALYTICS_DIMENSION_COLUMNS = frozenset({
+    'dx', 'period', 'orgUnit', 'categoryOptionCombo', 'attributeOptionCombo'
+})
+
+# Analytics CSV column titles -> header names
+ANALYTICS_CSV_TITLES = {
+    'Data': 'dx',
+    'Period': 'pe',
+    'Organisation unit': 'ou',
+    'Category option combo': 'co',
+    'Attribute option combo': 'ao',
+    'Value': 'value',
+}
+
+# Long-format column -> column holding its metaData name
+ANALYTICS_NAME_COLUMNS = {
+    'dx': 'dxName',
+    'period': 'peName',
+    'orgUnit': 'ouName',
+    'categoryOptionCombo': 'coName',
+}
+
 
 class ArrowConverter:
     """Arrow format converter"""
@@ -89,6 +126,59 @@ class ArrowConverter:
         df = pd.read_feather(str(file_path))
         return self.from_pandas(df)
 
+    @staticmethod
+    def file_format(file_path: Union[str, Path]) -> Optional[str]:
+        """Batch-readable format of a file from its suffix: 'parquet', 'csv' or None"""
+        return {'.parquet': 'parquet', '.pq': 'parquet', '.csv': 'csv'}.get(Path(file_path).suffix.lower())
+
+    def iter_file_batches(
+        self,
+        file_path: Union[str, Path],
+        batch_size: int,
+        file_format: Optional[str] = None
+    ) -> Iterator[pa.Table]:
+        """Read a Parquet or CSV file as tables of ``batch_size`` rows (the last may be shorter)
+
+        The file is read incrementally, so only about one batch is held in
+        memory. CSV columns are read as strings, with empty cells as null.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        file_path = Path(file_path)
+        file_format = file_format or self.file_format(file_path)
+
+        if file_format == 'parquet':
+            reader = pq.ParquetFile(str(file_path)).iter_batches(batch_size=batch_size)
+        elif file_format == 'csv':
+            with open(file_path, newline='', encoding='utf-8-sig') as f:
+                titles = next(csv.reader(f), [])
+            reader = pa_csv.open_csv(
+                str(file_path),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={title: pa.string() for title in titles},
+                    strings_can_be_null=True
+                )
+            )
+        else:
+            raise ValueError(f"Unsupported file format for batch reading: {file_format or file_path.suffix}")
+
+        # Re-slice reader batches (row groups, CSV blocks) to exactly batch_size rows
+        pending: List[pa.RecordBatch] = []
+        pending_rows = 0
+        for batch in reader:
+            if batch.num_rows == 0:
+                continue
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            while pending_rows >= batch_size:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, batch_size)
+                rest = table.slice(batch_size)
+                pending = rest.to_batches()
+                pending_rows = rest.num_rows
+        if pending_rows:
+            yield pa.Table.from_batches(pending)
+
     def get_schema_info(self, table: pa.Table) -> Dict[str, Any]:
         """Get Schema information"""
         schema = table.schema
@@ -226,3 +316,207 @@ class ArrowConverter:
             'num_rows': len(table),
             'num_columns': table.num_columns,
         }
+
+
+class AnalyticsArrowConverter:
+    """Analytics JSON to Arrow converter - builds columns straight from rows
+
+    In long format the dimension columns are dictionary encoded and ``value``
+    is parsed to float64 in bulk, without an intermediate DataFrame.
+    """
+
+    def to_table(
+        self,
+        data: Dict[str, Any],
+        long_format: bool = True,
+        include_names: bool = False
+    ) -> pa.Table:
+        """Convert Analytics JSON to an Arrow table
+
+        With ``include_names`` (long format only), ``dxName``/``peName``/
+        ``ouName``/``coName`` columns are resolved from ``metaData.items``.
+        """
+        rows = data.get('rows')
+        headers = data.get('headers', [])
+        if not rows or not headers:
+            return pa.table({})
+
+        names = [h.get('name', f'col_{i}') for i, h in enumerate(headers)]
+        columns = list(zip(*rows))
+
+        arrays = []
+        column_names = []
+        for name, values in zip(names, columns):
+            if long_format:
+                name = ANALYTICS_LONG_COLUMNS.get(name, name)
+                if name in ANALYTICS_DIMENSION_COLUMNS:
+                    arrays.append(self._to_strings(values).dictionary_encode())
+                elif name == 'value':
+                    arrays.append(self._to_float64(values))
+                else:
+                    arrays.append(self._infer(values))
+            else:
+                arrays.append(self._infer(values))
+            column_names.append(name)
+
+        table = pa.Table.from_arrays(arrays, names=column_names)
+        if long_format and include_names:
+            table = self._attach_names(table, data.get('metaData', {}).get('items', {}))
+        return table
+
+    def from_csv(self, body: bytes, long_format: bool = True) -> pa.Table:
+        """Parse an ``/api/analytics.csv`` body into an Arrow table
+
+        The body is parsed by the multi-threaded Arrow CSV reader with every
+        column read as a string, then converted like ``to_table``. Column
+        titles (``Data``, ``Period``, ...) are mapped back to header names.
+        """
+        if not body.strip():
+            return pa.table({})
+
+        first_line = body.split(b'\n', 1)[0].decode('utf-8-sig').rstrip('\r')
+        titles = next(csv.reader([first_line]))
+        raw = pa_csv.read_csv(
+            io.BytesIO(body),
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={title: pa.string() for title in titles},
+                strings_can_be_null=True
+            )
+        )
+        if raw.num_rows == 0:
+            return pa.table({})
+
+        arrays = []
+        column_names = []
+        for title, column in zip(raw.column_names, raw.columns):
+            name = ANALYTICS_CSV_TITLES.get(title, title)
+            if long_format:
+                name = ANALYTICS_LONG_COLUMNS.get(name, name)
+                if name in ANALYTICS_DIMENSION_COLUMNS:
+                    column = column.dictionary_encode()
+                elif name == 'value':
+                    column = self._parse_float64(column)
+            arrays.append(column)
+            column_names.append(name)
+
+        return pa.Table.from_arrays(arrays, names=column_names).unify_dictionaries()
+
+    @staticmethod
+    def _parse_float64(column: pa.ChunkedArray) -> pa.ChunkedArray:
+        """Parse a string column to float64; unparseable items become null"""
+        try:
+            return pc.cast(column, pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            numeric = pd.to_numeric(column.to_pandas(), errors='coerce')
+            return pa.chunked_array([pa.array(numeric, type=pa.float64(), from_pandas=True)])
+
+    @staticmethod
+    def _attach_names(table: pa.Table, items: Dict[str, Any]) -> pa.Table:
+        """Add name columns that reuse the indices of the dimension columns"""
+        for column_name, name_column in ANALYTICS_NAME_COLUMNS.items():
+            if column_name not in table.column_names:
+                continue
+            column = table.column(column_name).combine_chunks()
+
+            # Resolve each distinct UID once, then map rows through the indices
+            names = [
+                (items.get(uid) or {}).get('name') for uid in column.dictionary.to_pylist()
+            ]
+            encoded_names = pa.array(names, type=pa.string()).dictionary_encode()
+            indices = pc.take(encoded_names.indices, column.indices)
+            table = table.append_column(
+                name_column,
+                pa.DictionaryArray.from_arrays(indices, encoded_names.dictionary)
+            )
+        return table
+
+    def schema(
+        self,
+        headers: List[Dict[str, Any]],
+        long_format: bool = True,
+        include_names: bool = False
+    ) -> pa.Schema:
+        """Schema of the tables built from responses with these headers
+
+        Columns other than dimensions and ``value`` are typed as strings.
+        """
+        dictionary = pa.dictionary(pa.int32(), pa.string())
+        fields = []
+        for i, header in enumerate(headers):
+            name = header.get('name', f'col_{i}')
+            if long_format:
+                name = ANALYTICS_LONG_COLUMNS.get(name, name)
+                if name in ANALYTICS_DIMENSION_COLUMNS:
+                    fields.append(pa.field(name, dictionary))
+                    continue
+                if name == 'value':
+                    fields.append(pa.field(name, pa.float64()))
+                    continue
+            fields.append(pa.field(name, pa.string()))
+
+        if long_format and include_names:
+            names = [f.name for f in fields]
+            fields.extend(
+                pa.field(name_column, dictionary)
+                for column_name, name_column in ANALYTICS_NAME_COLUMNS.items()
+                if column_name in names
+            )
+        return pa.schema(fields)
+
+    def to_pandas(self, table: pa.Table, categorical: bool = False) -> pd.DataFrame:
+        """View an analytics table as a DataFrame
+
+        Dictionary columns become pandas categoricals with ``categorical``,
+        plain string columns otherwise.
+        """
+        if table.num_columns == 0:
+            return pd.DataFrame()
+        if categorical:
+            return table.to_pandas()
+
+        columns = [
+            pc.cast(column, column.type.value_type) if pa.types.is_dictionary(column.type) else column
+            for column in table.columns
+        ]
+        return pa.Table.from_arrays(columns, names=table.column_names).to_pandas()
+
+    def from_pandas(self, df: pd.DataFrame) -> pa.Table:
+        """Convert a long-format DataFrame back to an encoded analytics table"""
+        if df.empty:
+            return pa.table({})
+
+        encoded = ANALYTICS_DIMENSION_COLUMNS | set(ANALYTICS_NAME_COLUMNS.values())
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, name in enumerate(table.column_names):
+            column = table.column(i)
+            if name in encoded and pa.types.is_string(column.type):
+                table = table.set_column(i, name, column.dictionary_encode())
+        return table
+
+    @staticmethod
+    def _to_strings(values: tuple) -> pa.Array:
+        """Build a string array, stringifying non-string items if needed"""
+        try:
+            return pa.array(values, type=pa.string())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+    @staticmethod
+    def _to_float64(values: tuple) -> pa.Array:
+        """Parse values to float64; unparseable items become null"""
+        try:
+            array = pa.array(values)
+            if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+                return pc.cast(array, pa.float64())
+            return array.cast(pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+            return pa.array(numeric, type=pa.float64(), from_pandas=True)
+
+    def _infer(self, values: tuple) -> pa.Array:
+        """Build an array of the inferred type, falling back to strings"""
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return self._to_strings(values)
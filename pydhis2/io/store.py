@@ -0,0 +1,209 @@
+"""Local stores - Partitioned Parquet tables and the delta push index"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MANIFEST_NAME = '_manifest.json'
+
+
+def _data_value_key(dv: Dict[str, Any]) -> str:
+    return (
+        f"{dv.get('dataElement')}\x1f{dv.get('period')}\x1f{dv.get('orgUnit')}"
+        f"\x1f{dv.get('categoryOptionCombo')}\x1f{dv.get('attributeOptionCombo')}"
+    )
+
+
+def _data_value_content(dv: Dict[str, Any]) -> str:
+    return f"{dv.get('value')}\x1f{dv.get('comment')}\x1f{dv.get('followup')}\x1f{dv.get('storedBy')}"
+
+
+def _replace_atomically(target: Path, write) -> None:
+    """Write through a temporary file next to ``target`` and move it into place"""
+    temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        write(temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+class PartitionedParquetStore:
+    """Directory of Parquet partitions with a JSON manifest
+
+    Each partition value of ``partition_column`` lives in
+    ``<path>/<partition_column>=<value>/part.parquet`` and is replaced as a
+    whole. The manifest keeps the partitions in order, per-partition info
+    and free-form ``state`` such as sync watermarks. Files are written to a
+    temporary name first, so an interrupted write leaves the previous
+    partition in place.
+    """
+
+    def __init__(self, path: str, partition_column: str, compression: str = 'snappy'):
+        self.path = Path(path)
+        self.partition_column = partition_column
+        self.compression = compression
+        self.manifest = self._load_manifest()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / MANIFEST_NAME
+
+    @property
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """Free-form state saved with the manifest"""
+        return self.manifest['state']
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if not self.manifest_path.exists():
+            return {'partitionColumn': self.partition_column, 'partitions': {}, 'state': {}}
+
+        manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        if manifest.get('partitionColumn') != self.partition_column:
+            raise ValueError(
+                f"Store at {self.path} is partitioned by {manifest.get('partitionColumn')}, "
+                f"not {self.partition_column}"
+            )
+        manifest.setdefault('state', {})
+        return manifest
+
+    def partitions(self) -> List[str]:
+        """Partition values in store order"""
+        return list(self.manifest['partitions'])
+
+    def partition_info(self, value: str) -> Optional[Dict[str, Any]]:
+        return self.manifest['partitions'].get(value)
+
+    def _partition_file(self, value: str) -> Path:
+        return self.path / f"{self.partition_column}={quote(value, safe='')}" / 'part.parquet'
+
+    def write_partition(self, value: str, table: pa.Table, **info) -> None:
+        """Replace one partition; an empty table keeps the partition without a file"""
+        file_path = self._partition_file(value)
+        if table.num_rows == 0:
+            file_path.unlink(missing_ok=True)
+        else:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            _replace_atomically(
+                file_path,
+                lambda temp: pq.write_table(table, str(temp), compression=self.compression)
+            )
+        self.manifest['partitions'][value] = {'rows': table.num_rows, **info}
+
+    def drop_partition(self, value: str) -> None:
+        """Remove a partition and its file"""
+        file_path = self._partition_file(value)
+        file_path.unlink(missing_ok=True)
+        if file_path.parent.exists() and not any(file_path.parent.iterdir()):
+            file_path.parent.rmdir()
+        self.manifest['partitions'].pop(value, None)
+
+    def retain(self, values: Sequence[str]) -> List[str]:
+        """Keep only the given partitions, in the given order; returns the dropped values"""
+        dropped = [value for value in self.manifest['partitions'] if value not in values]
+        for value in dropped:
+            self.drop_partition(value)
+        partitions = self.manifest['partitions']
+        self.manifest['partitions'] = {value: partitions[value] for value in values if value in partitions}
+        return dropped
+
+    def save(self) -> None:
+        """Write the manifest"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(self.manifest, indent=2, ensure_ascii=False)
+        _replace_atomically(
+            self.manifest_path,
+            lambda temp: temp.write_text(content, encoding='utf-8')
+        )
+
+    def read(self, partitions: Optional[Sequence[str]] = None) -> pa.Table:
+        """Read partitions (default: all) into one table, in store order"""
+        values = self.partitions() if partitions is None else list(partitions)
+        tables = [
+            pq.read_table(str(self._partition_file(value)), partitioning=None)
+            for value in values
+            if self._partition_file(value).exists()
+        ]
+        if not tables:
+            return pa.table({})
+        return pa.concat_tables(tables).unify_dictionaries()
+
+
+class DataValueIndex:
+    """Compact on-disk index of data values already on the server
+
+    Maps the 64-bit hash of each data value key (dataElement, period,
+    orgUnit, categoryOptionCombo, attributeOptionCombo) to a 64-bit hash of
+    its content (value, comment, followup, storedBy). Both are kept as
+    sorted ``uint64`` arrays, 16 bytes per value, in a Parquet file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        if self.path.exists():
+            table = pq.read_table(str(self.path))
+            self.keys = table.column('key').to_numpy()
+            self.hashes = table.column('hash').to_numpy()
+        else:
+            self.keys = np.empty(0, dtype=np.uint64)
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def hash_values(data_values: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Key hashes and content hashes of data values"""
+        keys = np.array(list(map(_data_value_key, data_values)), dtype=object)
+        contents = np.array(list(map(_data_value_content, data_values)), dtype=object)
+        # Mostly distinct strings: hashing them directly beats factorizing first
+        return pd.util.hash_array(keys, categorize=False), pd.util.hash_array(contents, categorize=False)
+
+    def _lookup(self, key_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.searchsorted(self.keys, key_hashes)
+        positions = np.minimum(positions, max(len(self.keys) - 1, 0))
+        if len(self.keys) == 0:
+            return positions, np.zeros(len(key_hashes), dtype=bool)
+        return positions, self.keys[positions] == key_hashes
+
+    def changed(self, key_hashes: np.ndarray, value_hashes: np.ndarray) -> np.ndarray:
+        """Mask of values that are new or differ from the indexed ones"""
+        positions, found = self._lookup(key_hashes)
+        if len(self.keys) == 0:
+            return ~found
+        return ~found | (self.hashes[positions] != value_hashes)
+
+    def update(self, key_hashes: np.ndarray, value_hashes: np.ndarray) -> None:
+        """Record values as stored on the server; later duplicates of a key win"""
+        keys = np.concatenate([self.keys, key_hashes])
+        hashes = np.concatenate([self.hashes, value_hashes])
+        order = np.argsort(keys, kind='stable')
+        keys, hashes = keys[order], hashes[order]
+        last = np.append(keys[1:] != keys[:-1], True)
+        self.keys, self.hashes = keys[last], hashes[last]
+
+    def remove(self, key_hashes: np.ndarray) -> None:
+        """Forget values deleted on the server"""
+        keep = ~np.isin(self.keys, key_hashes)
+        self.keys, self.hashes = self.keys[keep], self.hashes[keep]
+
+    def save(self) -> None:
+        """Write the index"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.table({
+            'key': pa.array(self.keys, type=pa.uint64()),
+            'hash': pa.array(self.hashes, type=pa.uint64()),
+        })
+        _replace_atomically(self.path, lambda temp: pq.write_table(table, str(temp)))
@@ -1,73 +1,93 @@
 """Pandas DataFrame converters"""
 
 import json
-from typing import Any, Dict, List
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from pydhis2.io.arrow import AnalyticsArrowConverter
 
-class AnalyticsDataFrameConverter:
-    """Analytics data converter"""
+# Frames with at least this many rows get categorical identifier columns by default
+CATEGORICAL_MIN_ROWS = 100_000
 
-    def to_dataframe(
-        self,
-        data: Dict[str, Any],
-        long_format: bool = True
-    ) -> pd.DataFrame:
-        """Convert Analytics JSON to DataFrame"""
-        if 'rows' not in data:
-            return pd.DataFrame()
+# Low-cardinality identifier columns emitted as categoricals
+CATEGORICAL_COLUMNS = (
+    'dx',
+    'period',
+    'orgUnit',
+    'dataElement',
+    'categoryOptionCombo',
+    'attributeOptionCombo',
+)
 
-        rows = data['rows']
-        headers = data.get('headers', [])
 
-        if not rows or not headers:
-            return pd.DataFrame()
+# Columns written by DataValueSetsConverter.from_dataframe, in output order
+DATA_VALUE_REQUIRED_COLUMNS = ('dataElement', 'period', 'orgUnit', 'value')
+DATA_VALUE_OPTIONAL_COLUMNS = (
+    'categoryOptionCombo',
+    'attributeOptionCombo',
+    'comment',
+    'storedBy',
+    'followup',
+)
 
-        # Create column name mapping
-        column_names = [h.get('name', f'col_{i}') for i, h in enumerate(headers)]
 
-        # Convert to DataFrame
-        df = pd.DataFrame(rows, columns=column_names)
+def use_categorical(categorical: Optional[bool], num_rows: int) -> bool:
+    """Resolve the categorical option; None enables it for large frames"""
+    if categorical is None:
+        return num_rows >= CATEGORICAL_MIN_ROWS
+    return categorical
 
-        if long_format:
-            return self._to_long_format(df, data)
-        else:
-            return df
 
-    def _to_long_format(self, df: pd.DataFrame, metadata: Dict[str, Any]) -> pd.DataFrame:
-        """Convert to long format (standardized)"""
-        if df.empty:
-            return df
-
-        # Standard column name mapping
-        standard_columns = {
-            'dx': 'dx',
-            'pe': 'period',
-            'ou': 'orgUnit',
-            'co': 'categoryOptionCombo',
-            'ao': 'attributeOptionCombo',
-            'value': 'value'
-        }
+def _followup_flag(value: Any) -> bool:
+    """Read a followup flag; strings, such as CSV fields, are ``true``/``false``"""
+    if isinstance(value, str):
+        return value.strip().lower() == 'true'
+    return bool(value)
 
-        # Rename columns
-        df_renamed = df.copy()
-        for old_name, new_name in standard_columns.items():
-            if old_name in df.columns:
-                df_renamed = df_renamed.rename(columns={old_name: new_name})
 
-        # Convert data types
-        if 'value' in df_renamed.columns:
-            df_renamed['value'] = pd.to_numeric(df_renamed['value'], errors='coerce')
+class AnalyticsDataFrameConverter:
+    """Analytics data converter"""
+
+    def __init__(self):
+        self.table_converter = AnalyticsArrowConverter()
+
+    def to_dataframe(
+        self,
+        data: Dict[str, Any],
+        long_format: bool = True,
+        categorical: Optional[bool] = None,
+        include_names: bool = False
+    ) -> pd.DataFrame:
+        """Convert Analytics JSON to DataFrame
 
-        return df_renamed
+        With ``categorical`` the dimension columns are pandas categoricals;
+        the default enables it from ``CATEGORICAL_MIN_ROWS`` rows.
+        ``include_names`` adds name columns resolved from ``metaData``.
+        """
+        table = self.table_converter.to_table(
+            data, long_format=long_format, include_names=include_names
+        )
+        return self.table_converter.to_pandas(
+            table, categorical=use_categorical(categorical, table.num_rows)
+        )
 
 
 class DataValueSetsConverter:
     """DataValueSets data converter"""
 
-    def to_dataframe(self, data: Dict[str, Any]) -> pd.DataFrame:
-        """Convert DataValueSets JSON to DataFrame"""
+    def to_dataframe(
+        self,
+        data: Dict[str, Any],
+        categorical: Optional[bool] = None
+    ) -> pd.DataFrame:
+        """Convert DataValueSets JSON to DataFrame
+
+        With ``categorical`` the identifier columns are pandas categoricals;
+        the default enables it from ``CATEGORICAL_MIN_ROWS`` rows.
+        """
         if 'dataValues' not in data:
             return pd.DataFrame()
 
@@ -113,46 +133,65 @@ class DataValueSetsConverter:
         if 'followup' in df.columns:
             df['followup'] = df['followup'].astype(bool, errors='ignore')
 
+        if use_categorical(categorical, len(df)):
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns:
+                    df[col] = df[col].astype('category')
+
         return df
 
     def from_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Convert DataFrame to DataValueSets JSON format"""
+        """Convert DataFrame to DataValueSets JSON format
+
+        Columns are converted in bulk, once per distinct value, and missing
+        values are left out of each data value, as the server expects.
+        """
         if df.empty:
             return {'dataValues': []}
 
-        # Ensure required columns exist
-        required_columns = ['dataElement', 'period', 'orgUnit', 'value']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        columns = self._payload_columns(df)
+        data_values = np.empty(len(df), dtype=object)
+        for rows, present in self._row_groups(columns):
+            keys = [columns[i][0] for i in present]
+            values = [columns[i][2][columns[i][1][rows]].tolist() for i in present]
+            data_values[rows] = list(map(dict, map(zip, repeat(keys), zip(*values))))
 
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {missing_columns}")
+        return {'dataValues': data_values.tolist()}
 
-        # Convert to list of dictionaries
-        data_values = []
-        for _, row in df.iterrows():
-            data_value = {}
-
-            # Required fields
-            for col in required_columns:
-                if pd.notna(row[col]):
-                    data_value[col] = str(row[col])
+    def _payload_columns(self, df: pd.DataFrame) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """Get (key, codes, converted distinct values) for each payload column.
 
-            # Optional fields
-            optional_fields = [
-                'categoryOptionCombo', 'attributeOptionCombo',
-                'comment', 'storedBy', 'followup'
-            ]
-
-            for field in optional_fields:
-                if field in df.columns and pd.notna(row[field]):
-                    if field == 'followup':
-                        data_value[field] = bool(row[field])
-                    else:
-                        data_value[field] = str(row[field])
+        Missing values get code -1, which selects the trailing ``None``.
+        """
+        missing_columns = [col for col in DATA_VALUE_REQUIRED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {missing_columns}")
 
-            data_values.append(data_value)
+        columns = []
+        for col in DATA_VALUE_REQUIRED_COLUMNS + DATA_VALUE_OPTIONAL_COLUMNS:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            if col == 'followup':
+                converted = [_followup_flag(value) for value in uniques]
+            else:
+                converted = pd.Index(uniques).astype(str).tolist()
+            columns.append((col, codes, np.array(converted + [None], dtype=object)))
+        return columns
 
-        return {'dataValues': data_values}
+    @staticmethod
+    def _row_groups(columns: List[Tuple[str, np.ndarray, np.ndarray]]):
+        """Yield (row positions, present column indices) for rows missing the same columns"""
+        masks = np.column_stack([codes >= 0 for _, codes, _ in columns])
+        if masks.all():
+            yield np.arange(len(masks)), list(range(len(columns)))
+            return
+
+        patterns = np.packbits(masks, axis=1, bitorder='little')
+        _, first_rows, inverse = np.unique(patterns, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        for group, first_row in enumerate(first_rows):
+            yield np.flatnonzero(inverse == group), np.flatnonzero(masks[first_row]).tolist()
 
 
 class TrackerConverter:
@@ -1,13 +1,20 @@
 """Benchmark utilities for performance testing"""
 
 import asyncio
+import json
 import logging
+import random
 import statistics
 import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List
 
+import pandas as pd
+
+from pydhis2.io.arrow import AnalyticsArrowConverter
+from pydhis2.io.to_pandas import DataValueSetsConverter
+
 logger = logging.getLogger(__name__)
 
 
@@ -270,3 +277,129 @@ class PerformanceProfiler:
         """Reset all collected data"""
         self.timings.clear()
         self.counters.clear()
+
+
+def generate_datavaluesets_payload(
+    rows: int,
+    org_unit_count: int = 1000,
+    data_element_count: int = 50,
+    period_count: int = 12,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """Generate a dataValueSets response with low-cardinality identifiers"""
+    rng = random.Random(seed)
+    org_units = [f"OU{i:09d}" for i in range(org_unit_count)]
+    data_elements = [f"DE{i:09d}" for i in range(data_element_count)]
+    periods = [f"2023{m % 12 + 1:02d}" for m in range(period_count)]
+    combos = ["HllvX50cXC0", "rQLFnNXXIL0", "dUWJmSV2GbS"]
+
+    return {
+        'dataValues': [
+            {
+                'dataElement': rng.choice(data_elements),
+                'period': rng.choice(periods),
+                'orgUnit': rng.choice(org_units),
+                'categoryOptionCombo': rng.choice(combos),
+                'attributeOptionCombo': combos[0],
+                'value': str(rng.randint(0, 1000)),
+            }
+            for _ in range(rows)
+        ]
+    }
+
+
+def benchmark_categorical_memory(rows: int = 1_000_000, **payload_kwargs) -> Dict[str, Any]:
+    """Compare DataFrame memory and conversion time with object vs categorical identifiers"""
+    payload = generate_datavaluesets_payload(rows, **payload_kwargs)
+    converter = DataValueSetsConverter()
+    result: Dict[str, Any] = {'rows': rows}
+
+    for label, categorical in (('object', False), ('categorical', True)):
+        start = time.perf_counter()
+        df = converter.to_dataframe(payload, categorical=categorical)
+        result[f'{label}_seconds'] = time.perf_counter() - start
+        result[f'{label}_bytes'] = int(df.memory_usage(deep=True).sum())
+
+    result['memory_ratio'] = result['categorical_bytes'] / result['object_bytes']
+    return result
+
+
+def _row_by_row_from_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
+    """The former iterrows-based DataFrame serializer, kept as a baseline"""
+    optional_fields = ['categoryOptionCombo', 'attributeOptionCombo', 'comment', 'storedBy', 'followup']
+    data_values = []
+    for _, row in df.iterrows():
+        data_value = {}
+        for col in ['dataElement', 'period', 'orgUnit', 'value']:
+            if pd.notna(row[col]):
+                data_value[col] = str(row[col])
+        for field_name in optional_fields:
+            if field_name in df.columns and pd.notna(row[field_name]):
+                if field_name == 'followup':
+                    data_value[field_name] = bool(row[field_name])
+                else:
+                    data_value[field_name] = str(row[field_name])
+        data_values.append(data_value)
+    return {'dataValues': data_values}
+
+
+def benchmark_datavalue_serialization(
+    rows: int = 1_000_000,
+    baseline_rows: int = 50_000,
+    **payload_kwargs
+) -> Dict[str, Any]:
+    """Compare DataFrame -> dataValues serialization against the row-by-row baseline
+
+    The baseline is timed on the first ``baseline_rows`` rows and scaled
+    linearly, since running it on a million rows takes about a minute.
+    """
+    df = pd.DataFrame(generate_datavaluesets_payload(rows, **payload_kwargs)['dataValues'])
+    converter = DataValueSetsConverter()
+    result: Dict[str, Any] = {'rows': rows, 'baseline_rows': min(baseline_rows, rows)}
+
+    start = time.perf_counter()
+    _row_by_row_from_dataframe(df.head(baseline_rows))
+    result['baseline_seconds'] = (time.perf_counter() - start) * rows / result['baseline_rows']
+
+    start = time.perf_counter()
+    converter.from_dataframe(df)
+    result['columnar_seconds'] = time.perf_counter() - start
+
+    result['speedup'] = result['baseline_seconds'] / result['columnar_seconds']
+    return result
+
+
+def benchmark_analytics_transports(rows: int = 1_000_000, seed: int = 42) -> Dict[str, Any]:
+    """Compare parsing an analytics result from JSON and from CSV into Arrow"""
+    rng = random.Random(seed)
+    data_rows = [
+        [f"DE{rng.randrange(50):09d}", f"2023{rng.randrange(12) + 1:02d}",
+         f"OU{rng.randrange(1000):09d}", str(rng.randint(0, 1000))]
+        for _ in range(rows)
+    ]
+    json_body = json.dumps({
+        'headers': [{'name': name} for name in ('dx', 'pe', 'ou', 'value')],
+        'rows': data_rows,
+        'metaData': {'items': {}, 'dimensions': {}},
+    }).encode()
+    csv_body = "\n".join(
+        ["Data,Period,Organisation unit,Value"] + [",".join(row) for row in data_rows]
+    ).encode()
+
+    converter = AnalyticsArrowConverter()
+    result: Dict[str, Any] = {
+        'rows': rows,
+        'json_bytes': len(json_body),
+        'csv_bytes': len(csv_body),
+    }
+
+    start = time.perf_counter()
+    converter.to_table(json.loads(json_body)).to_pandas()
+    result['json_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter.from_csv(csv_body).to_pandas()
+    result['csv_seconds'] = time.perf_counter() - start
+
+    result['speedup'] = result['json_seconds'] / result['csv_seconds']
+    return result
@@ -19,6 +19,7 @@ class MockResponse:
     headers: Optional[Dict[str, str]] = None
     delay: float = 0.0  # Simulated response delay in seconds
     fail_count: int = 0  # Number of times to fail before succeeding
+    body: Optional[str] = None  # Raw body sent instead of JSON-encoded data
 
 
 class MockDHIS2Server:
@@ -50,12 +51,25 @@ class MockDHIS2Server:
         method = request.method
         full_path = f"/{method.lower()}/api/{path}"
 
+        # aiohttp decodes gzip/deflate request bodies (Content-Encoding) transparently
+        body = None
+        body_size = 0
+        if request.can_read_body:
+            raw = await request.read()
+            body_size = len(raw)
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                body = raw.decode('utf-8', errors='replace')
+
         # Log the request
         self.request_log.append({
             'method': method,
             'path': f"/api/{path}",
             'query': dict(request.query),
             'headers': dict(request.headers),
+            'body': body,
+            'body_size': body_size,
             'timestamp': asyncio.get_event_loop().time()
         })
 
@@ -82,6 +96,13 @@ class MockDHIS2Server:
             )
 
         # Return configured response
+        if mock_response.body is not None:
+            return web.Response(
+                status=mock_response.status,
+                text=mock_response.body,
+                headers=mock_response.headers or {'Content-Type': 'text/plain'}
+            )
+
         headers = mock_response.headers or {'Content-Type': 'application/json'}
         response_data = mock_response.data or {}
 
@@ -162,6 +183,20 @@ class MockDHIS2Server:
             delay=delay
         )
 
+    def configure_analytics_csv_response(
+        self,
+        columns: List[str],
+        rows: List[List[str]],
+        delay: float = 0.0
+    ) -> None:
+        """Configure the Analytics CSV representation (/api/analytics.csv)"""
+        lines = [",".join(columns)] + [",".join(row) for row in rows]
+        self.responses["/get/api/analytics.csv"] = MockResponse(
+            body="\n".join(lines) + "\n",
+            headers={'Content-Type': 'application/csv'},
+            delay=delay
+        )
+
     def configure_datavaluesets_response(
         self,
         data_values: List[Dict[str, str]],
@@ -9,7 +9,14 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import aiohttp
 
-from pydhis2.core.cache import CacheEntry, HTTPCache, ResumableDownloader, CachedSession
+from pydhis2.core.cache import (
+    CacheEntry,
+    CachedSession,
+    HTTPCache,
+    ResumableDownloader,
+    canonicalize_params,
+)
+from pydhis2.core.types import AnalyticsQuery, CachePolicy
 
 
 class TestCacheEntry:
@@ -141,6 +148,35 @@ class TestHTTPCache:
         assert isinstance(key, str)
         assert len(key) == 32
     
+    def test_get_cache_key_dimension_item_order(self):
+        """Test that dimension item order does not change the cache key"""
+        url = "http://example.com/api/analytics"
+        key1 = self.cache._get_cache_key(url, {"dimension": ["dx:A;B", "pe:2023Q1;2023Q2"]})
+        key2 = self.cache._get_cache_key(url, {"dimension": ["pe:2023Q2;2023Q1", "dx:B;A"]})
+        assert key1 == key2
+
+    def test_get_cache_key_ignores_noop_defaults(self):
+        """Test that server-default parameters do not change the cache key"""
+        url = "http://example.com/api/analytics"
+        query = AnalyticsQuery(dx=["B", "A"], ou="OU1", pe="2023")
+        key1 = self.cache._get_cache_key(url, query.to_params())
+        key2 = self.cache._get_cache_key(url, {"dimension": ["ou:OU1", "dx:A;B", "pe:2023"]})
+        assert key1 == key2
+
+    def test_get_cache_key_distinguishes_queries(self):
+        """Test that different queries still get different cache keys"""
+        url = "http://example.com/api/analytics"
+        key1 = self.cache._get_cache_key(url, {"dimension": ["dx:A"], "skipMeta": "true"})
+        key2 = self.cache._get_cache_key(url, {"dimension": ["dx:A"]})
+        key3 = self.cache._get_cache_key(url, {"dimension": ["dx:B"]})
+        assert len({key1, key2, key3}) == 3
+
+    def test_get_cache_key_merges_url_query(self):
+        """Test that parameters in the URL and in params are treated alike"""
+        key1 = self.cache._get_cache_key("http://example.com/api/test?b=2", {"a": "1"})
+        key2 = self.cache._get_cache_key("http://example.com/api/test", {"a": "1", "b": 2})
+        assert key1 == key2
+
     def test_get_file_path(self):
         """Test file path generation"""
         cache_key = "abc123"
@@ -223,6 +259,45 @@ class TestHTTPCache:
         result = await self.cache.get("http://example.com/0")
         assert result is None
     
+    def test_get_policy_longest_prefix(self):
+        """Test that the most specific route policy wins"""
+        self.cache.configure_route_policy("/api", CachePolicy(ttl=10))
+        self.cache.configure_route_policy("/api/analytics", CachePolicy(ttl=20, stale_grace=5))
+        
+        assert self.cache.get_policy("http://example.com/api/analytics/events").ttl == 20
+        assert self.cache.get_policy("http://example.com/api/dataElements").ttl == 10
+        assert self.cache.get_policy("http://example.com/other") is None
+    
+    async def test_stale_entry_within_grace(self):
+        """Test that an expired entry is only returned on request inside the grace window"""
+        self.cache.configure_route_policy("/api", CachePolicy(ttl=60, stale_grace=60))
+        url = "http://example.com/api/analytics"
+        await self.cache.set(url, {"test": "data"}, use_file_cache=False)
+        
+        entry = self.cache._memory_cache[self.cache._get_cache_key(url)]
+        entry.timestamp = time.time() - 90
+        
+        assert await self.cache.get(url) is None
+        stale = await self.cache.get(url, allow_stale=True)
+        assert stale is not None
+        assert stale.data == {"test": "data"}
+        assert self.cache.is_stale(stale)
+        
+        # Past the grace window the entry is gone for good
+        entry.timestamp = time.time() - 130
+        assert await self.cache.get(url, allow_stale=True) is None
+        assert len(self.cache._memory_cache) == 0
+    
+    async def test_set_existing_key_does_not_evict(self):
+        """Test that refreshing an existing entry in a full cache keeps other entries"""
+        for i in range(self.cache.max_size):
+            await self.cache.set(f"http://example.com/{i}", {"index": i}, use_file_cache=False)
+        
+        await self.cache.set("http://example.com/0", {"index": 0}, use_file_cache=False)
+        
+        assert len(self.cache._memory_cache) == self.cache.max_size
+        assert await self.cache.get("http://example.com/1") is not None
+    
     def test_get_conditional_headers_no_cache(self):
         """Test conditional headers with no cached entry"""
         headers = self.cache.get_conditional_headers("http://example.com")
@@ -303,6 +378,41 @@ class TestHTTPCache:
         assert "Failed to save cache index" in mock_logger.warning.call_args[0][0]
 
 
+class TestCanonicalizeParams:
+    """Test canonicalize_params function"""
+
+    def test_empty(self):
+        """Test canonicalization of missing parameters"""
+        assert canonicalize_params(None) == []
+        assert canonicalize_params({}) == []
+
+    def test_sorts_multi_valued_params(self):
+        """Test that list values are flattened and sorted"""
+        result = canonicalize_params({"fields": ["name", "id"], "paging": False})
+        assert result == [("fields", "id"), ("fields", "name"), ("paging", "false")]
+
+    def test_sorts_dimension_items(self):
+        """Test that UIDs inside dimension expressions are sorted"""
+        result = canonicalize_params({"dimension": "dx:C;A;B", "filter": "ou:Y;X"})
+        assert result == [("dimension", "dx:A;B;C"), ("filter", "ou:X;Y")]
+
+    def test_leaves_metadata_filters_untouched(self):
+        """Test that metadata filter expressions are not rewritten"""
+        result = canonicalize_params({"filter": "name:eq:b;a"})
+        assert result == [("filter", "name:eq:b;a")]
+
+    def test_drops_noop_defaults(self):
+        """Test that server-default values and None are dropped"""
+        result = canonicalize_params({
+            "skipMeta": "false",
+            "skipData": False,
+            "outputIdScheme": "UID",
+            "displayProperty": "SHORTNAME",
+            "page": None,
+        })
+        assert result == [("displayProperty", "SHORTNAME")]
+
+
 class TestResumableDownloader:
     """Test ResumableDownloader class"""
     
@@ -201,3 +201,157 @@ class TestMetadataCommands:
         # Exit code 2 means missing required arguments or command not found
         assert result.exit_code in [0, 2]
 
+
+
+class TestCacheCommands:
+    """Test cache commands"""
+    
+    def _populate(self, cache_dir):
+        """Create a cache with three entries on two routes"""
+        import asyncio
+        from pydhis2.core.cache import HTTPCache
+        
+        async def _fill():
+            cache = HTTPCache(cache_dir=cache_dir)
+            await cache.set("http://x/api/analytics", {"rows": [1] * 100}, params={"a": 1})
+            await cache.set("http://x/api/analytics", {"rows": [2]}, params={"a": 2})
+            await cache.set("http://x/api/dataElements", {"dataElements": []})
+            await cache.get("http://x/api/analytics", params={"a": 1})
+            await cache.get("http://x/api/missing")
+            cache.save_stats()
+        
+        asyncio.run(_fill())
+    
+    def test_cache_stats(self, tmp_path):
+        """Test cache stats command"""
+        self._populate(str(tmp_path))
+        result = runner.invoke(app, ["cache", "stats", "--cache-dir", str(tmp_path)])
+        assert result.exit_code == 0
+        assert "Entries: 3" in result.stdout
+        assert "Hit ratio: 50.0%" in result.stdout
+        assert "/api/analytics: 2 entries" in result.stdout
+    
+    def test_cache_prune_by_bytes(self, tmp_path):
+        """Test cache prune command evicts oldest entries first"""
+        from pydhis2.core.cache import HTTPCache
+        
+        self._populate(str(tmp_path))
+        result = runner.invoke(
+            app, ["cache", "prune", "--cache-dir", str(tmp_path), "--max-bytes", "100"]
+        )
+        assert result.exit_code == 0
+        assert "Removed" in result.stdout
+        
+        cache = HTTPCache(cache_dir=str(tmp_path))
+        assert cache.get_stats()["size_bytes"] <= 100
+        assert len(cache._memory_cache) >= 1
+    
+    def test_cache_prune_by_age(self, tmp_path):
+        """Test cache prune command with max age"""
+        self._populate(str(tmp_path))
+        result = runner.invoke(
+            app, ["cache", "prune", "--cache-dir", str(tmp_path), "--max-age", "0"]
+        )
+        assert result.exit_code == 0
+        assert "Removed 3 entries" in result.stdout
+    
+    def test_cache_clear(self, tmp_path):
+        """Test cache clear command"""
+        self._populate(str(tmp_path))
+        result = runner.invoke(app, ["cache", "clear", "--cache-dir", str(tmp_path), "--yes"])
+        assert result.exit_code == 0
+        assert "Cleared 3 cache entries" in result.stdout
+        assert list(tmp_path.glob("*.json")) == []
+    
+    def test_cache_commands_keep_entries_past_default_ttl(self, tmp_path):
+        """Test that entries cached under a long route policy survive stats and prune"""
+        import json
+        from pathlib import Path
+        
+        self._populate(str(tmp_path))
+        index_file = tmp_path / "cache_index.json"
+        index = json.loads(index_file.read_text())
+        for entry in index.values():
+            entry["timestamp"] -= 2 * 3600
+        index_file.write_text(json.dumps(index))
+        files = [Path(entry["file_path"]) for entry in index.values() if entry.get("file_path")]
+        
+        result = runner.invoke(app, ["cache", "stats", "--cache-dir", str(tmp_path)])
+        assert "Entries: 3" in result.stdout
+        result = runner.invoke(
+            app, ["cache", "prune", "--cache-dir", str(tmp_path), "--max-bytes", "1000000"]
+        )
+        assert "Removed 0 entries" in result.stdout
+        assert len(json.loads(index_file.read_text())) == 3
+        assert all(path.exists() for path in files)
+    
+    def test_cache_warm(self, tmp_path):
+        """Test cache warm command"""
+        from unittest.mock import AsyncMock, MagicMock
+        
+        queries_file = tmp_path / "warm.yml"
+        queries_file.write_text(
+            "queries:\n"
+            "  - endpoint: /api/dataElements\n"
+            "    params: {fields: 'id,name'}\n"
+            "  - analytics: {dx: [DE1], ou: OU1, pe: LAST_12_MONTHS}\n"
+        )
+        
+        client = MagicMock()
+        client.warm_cache = AsyncMock(return_value={
+            'requested': 2, 'warmed': 2, 'failed': 0, 'failures': []
+        })
+        client_cls = MagicMock()
+        client_cls.return_value.__aenter__ = AsyncMock(return_value=client)
+        client_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+        
+        with patch('pydhis2.core.client.AsyncDHIS2Client', client_cls):
+            result = runner.invoke(app, [
+                "cache", "warm",
+                "--queries", str(queries_file),
+                "--url", "https://test.dhis2.org",
+                "--cache-dir", str(tmp_path / "cache"),
+            ])
+        
+        assert result.exit_code == 0
+        assert "Warmed 2/2 queries" in result.stdout
+        requests = client.warm_cache.call_args[0][0]
+        assert requests[0] == ("/api/dataElements", {"fields": "id,name"})
+        assert requests[1][0] == "/api/analytics"
+        assert "dx:DE1" in requests[1][1]["dimension"]
+    
+    def test_cache_warm_keeps_existing_entries(self, tmp_path):
+        """Test that warming neither expires aged entries nor evicts beyond 100 entries"""
+        import json
+        from pathlib import Path
+        from unittest.mock import AsyncMock
+        
+        self._populate(str(tmp_path))
+        index_file = tmp_path / "cache_index.json"
+        index = json.loads(index_file.read_text())
+        for entry in index.values():
+            entry["timestamp"] -= 2 * 3600
+        index_file.write_text(json.dumps(index))
+        files = [Path(entry["file_path"]) for entry in index.values() if entry.get("file_path")]
+        
+        queries_file = tmp_path / "warm.yml"
+        queries_file.write_text("queries:\n" + "".join(
+            f"  - endpoint: /api/dataElements/DE{i}\n" for i in range(150)
+        ))
+        
+        with patch(
+            'pydhis2.core.client.AsyncDHIS2Client._make_request',
+            AsyncMock(return_value={"id": "DE"})
+        ):
+            result = runner.invoke(app, [
+                "cache", "warm",
+                "--queries", str(queries_file),
+                "--url", "https://test.dhis2.org",
+                "--cache-dir", str(tmp_path),
+                "--rps", "1000",
+            ])
+        
+        assert result.exit_code == 0
+        assert "Warmed 150/150 queries" in result.stdout
+        assert all(path.exists() for path in files)
+        assert len(json.loads(index_file.read_text())) == 153
@@ -387,6 +387,162 @@ class TestClientIntegration:
         assert first_session is second_session
         await client.close()
     
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, tmp_path):
+        """Test that a stale entry is served while one background refresh runs"""
+        from pydhis2.testing import MockDHIS2Server
+        
+        mock_server = MockDHIS2Server(port=8093)
+        mock_server.configure_response(
+            "GET", "/api/analytics",
+            data={"version": 1}
+        )
+        
+        async with mock_server as base_url:
+            config = DHIS2Config(
+                base_url=base_url,
+                auth=("test", "test"),
+                cache_dir=str(tmp_path),
+                cache_policies={"/api/analytics": {"ttl": 1, "stale_grace": 60}}
+            )
+            
+            async with AsyncDHIS2Client(config) as client:
+                assert (await client.get("/api/analytics"))["version"] == 1
+                assert (await client.get("/api/analytics"))["version"] == 1
+                assert mock_server.get_request_count("GET", "/api/analytics") == 1
+                
+                mock_server.configure_response(
+                    "GET", "/api/analytics",
+                    data={"version": 2},
+                    delay=0.2
+                )
+                await asyncio.sleep(1.1)
+                
+                # Expired entries inside the grace window come back immediately
+                responses = await asyncio.gather(
+                    *[client.get("/api/analytics") for _ in range(3)]
+                )
+                assert all(r["version"] == 1 for r in responses)
+                assert len(client._refresh_tasks) == 1
+                
+                await asyncio.gather(*client._refresh_tasks.values())
+                assert mock_server.get_request_count("GET", "/api/analytics") == 2
+                assert (await client.get("/api/analytics"))["version"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_bypasses_cache_without_policy(self, tmp_path):
+        """Test that routes without a cache policy always hit the server"""
+        from pydhis2.testing import MockDHIS2Server
+        
+        mock_server = MockDHIS2Server(port=8094)
+        mock_server.configure_response("GET", "/api/test", data={"ok": True})
+        
+        async with mock_server as base_url:
+            config = DHIS2Config(
+                base_url=base_url,
+                auth=("test", "test"),
+                cache_dir=str(tmp_path),
+                cache_policies={"/api/analytics": {"ttl": 60}}
+            )
+            
+            async with AsyncDHIS2Client(config) as client:
+                await client.get("/api/test")
+                await client.get("/api/test")
+                assert mock_server.get_request_count("GET", "/api/test") == 2
+    
+    @pytest.mark.asyncio
+    async def test_warm_cache(self, tmp_path):
+        """Test pre-fetching queries into the cache"""
+        from pydhis2.testing import MockDHIS2Server
+        
+        mock_server = MockDHIS2Server(port=8095)
+        mock_server.configure_response("GET", "/api/dataElements", data={"dataElements": []})
+        mock_server.configure_response("GET", "/api/broken", status=404, data={"message": "nope"})
+        
+        async with mock_server as base_url:
+            config = DHIS2Config(
+                base_url=base_url,
+                auth=("test", "test"),
+                cache_dir=str(tmp_path),
+                cache_policies={"/api/dataElements": {"ttl": 60}}
+            )
+            
+            async with AsyncDHIS2Client(config) as client:
+                result = await client.warm_cache([
+                    ("/api/dataElements", {"fields": "id"}),
+                    ("/api/dataElements", {"fields": "name"}),
+                    ("/api/broken", None),
+                ])
+                assert result["warmed"] == 2
+                assert result["failed"] == 1
+                
+                # Warmed entries are served without another request
+                await client.get("/api/dataElements", params={"fields": "id"})
+                assert mock_server.get_request_count("GET", "/api/dataElements") == 2
+                assert client.get_stats()["cache"]["entries"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_analytics_csv_transport(self):
+        """Test pulling analytics through the CSV representation"""
+        from pydhis2.core.types import AnalyticsQuery
+        from pydhis2.testing import MockDHIS2Server
+        
+        mock_server = MockDHIS2Server(port=8096)
+        mock_server.configure_analytics_csv_response(
+            ["Data", "Period", "Organisation unit", "Value"],
+            [["DE1", "202301", "OU1", "12"], ["DE1", "202302", "OU1", "7.5"]]
+        )
+        
+        async with mock_server as base_url:
+            config = DHIS2Config(base_url=base_url, auth=("test", "test"), enable_cache=False)
+            async with AsyncDHIS2Client(config) as client:
+                query = AnalyticsQuery(dx="DE1", ou="OU1", pe="202301;202302")
+                table = await client.analytics.to_arrow(query, transport="csv")
+                
+                assert table.column("value").to_pylist() == [12.0, 7.5]
+                assert table.column("period").to_pylist() == ["202301", "202302"]
+                
+                body = await client.get_bytes("/api/analytics.csv")
+                assert body.startswith(b"Data,Period")
+    
+    @pytest.mark.asyncio
+    async def test_request_body_compression(self):
+        """Test gzipping request bodies above the size threshold"""
+        from pydhis2.testing import MockDHIS2Server
+        
+        mock_server = MockDHIS2Server(port=8097)
+        payload = {"dataValues": [
+            {"dataElement": "DE1", "period": "202301", "orgUnit": f"OU{i}", "value": str(i)}
+            for i in range(500)
+        ]}
+        
+        async with mock_server as base_url:
+            config = DHIS2Config(
+                base_url=base_url, auth=("test", "test"), enable_cache=False,
+                request_compression=True, request_compression_min_bytes=1024
+            )
+            async with AsyncDHIS2Client(config) as client:
+                await client.post("/api/dataValueSets", data=payload)
+                await client.post("/api/dataValueSets", data={"dataValues": []})
+                
+                large, small = mock_server.request_log
+                assert large["headers"]["Content-Encoding"] == "gzip"
+                assert large["body"] == payload
+                assert int(large["headers"]["Content-Length"]) < large["body_size"] / 5
+                assert "Content-Encoding" not in small["headers"]
+                assert small["body"] == {"dataValues": []}
+                
+                stats = client.get_stats()["client"]
+                assert stats["bodies_compressed"] == 1
+                assert stats["body_bytes_sent"] < stats["body_bytes_raw"]
+            
+            # Off by default
+            config = DHIS2Config(base_url=base_url, auth=("test", "test"), enable_cache=False)
+            async with AsyncDHIS2Client(config) as client:
+                await client.post("/api/dataValueSets", data=payload)
+                assert "Content-Encoding" not in mock_server.request_log[-1]["headers"]
+                assert mock_server.request_log[-1]["body"] == payload
+    
     @pytest.mark.asyncio
     async def test_cache_disabled(self):
         """Test client with cache disabled"""
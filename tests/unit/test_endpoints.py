@@ -1,13 +1,16 @@
 """Unit tests for DHIS2 API endpoints"""
 
+import asyncio
 import pytest
 import pandas as pd
 from unittest.mock import AsyncMock, patch
 from pydhis2.core.types import AnalyticsQuery, ImportConfig, ImportStrategy, ExportFormat
-from pydhis2.endpoints.analytics import AnalyticsEndpoint
-from pydhis2.endpoints.datavaluesets import DataValueSetsEndpoint, ImportSummary
+from pydhis2.endpoints.analytics import AnalyticsEndpoint, AnalyticsResultCache
+from pydhis2.endpoints.datavaluesets import DataValueSetsEndpoint, ImportJobPoller, ImportSummary, PushJournal
 from pydhis2.endpoints.tracker import TrackerEndpoint
-from pydhis2.core.errors import ImportConflictError
+from pydhis2.io.store import DataValueIndex, PartitionedParquetStore
+from pydhis2.core.errors import DHIS2HTTPError, ImportConflictError, ImportJobError, PartitionFetchError
+from pydhis2.core.planner import AdaptiveChunkSizer
 
 
 class TestAnalyticsEndpoint:
@@ -148,15 +151,64 @@ class TestAnalyticsEndpoint:
         
         query = AnalyticsQuery(dx="DE123", ou="OU456", pe="202301")
         
-        # Mock the arrow converter
         import pyarrow as pa
-        mock_table = pa.table({'dx': ['DE123'], 'value': [100]})
         
-        with patch.object(analytics_endpoint.arrow_converter, 'from_pandas', return_value=mock_table) as mock_from_pandas:
+        # The table is built from the JSON rows without going through pandas
+        with patch.object(analytics_endpoint.arrow_converter, 'from_pandas') as mock_from_pandas:
             result = await analytics_endpoint.to_arrow(query)
         
         assert isinstance(result, pa.Table)
-        mock_from_pandas.assert_called_once()
+        mock_from_pandas.assert_not_called()
+        assert result.column_names == ['dx', 'period', 'orgUnit', 'value']
+        assert pa.types.is_dictionary(result.schema.field('dx').type)
+        assert result.schema.field('value').type == pa.float64()
+        assert result.column('value').to_pylist() == [100.0, 150.0, 200.0]
+    
+    @pytest.mark.asyncio
+    async def test_to_pandas_include_names(self, analytics_endpoint, sample_analytics_response):
+        """Test name columns resolved from the response metaData"""
+        sample_analytics_response["metaData"]["items"] = {
+            "DE123": {"name": "Malaria cases"},
+            "DE789": {"name": "Measles cases"},
+            "OU456": {"name": "Sierra Leone"},
+        }
+        analytics_endpoint.client.get.return_value = sample_analytics_response
+        
+        query = AnalyticsQuery(dx=["DE123", "DE789"], ou="OU456", pe=["202301", "202302"])
+        df = await analytics_endpoint.to_pandas(query, include_names=True)
+        
+        assert df["dxName"].tolist() == ["Malaria cases", "Malaria cases", "Measles cases"]
+        assert df["ouName"].tolist() == ["Sierra Leone"] * 3
+        assert df["peName"].isna().all()
+    
+    @pytest.mark.asyncio
+    async def test_csv_transport(self, analytics_endpoint, sample_analytics_response):
+        """Test that the CSV transport matches the JSON result"""
+        analytics_endpoint.client.get.return_value = sample_analytics_response
+        analytics_endpoint.client.get_bytes.return_value = (
+            b"Data,Period,Organisation unit,Value\n"
+            b"DE123,202301,OU456,100\n"
+            b"DE123,202302,OU456,150\n"
+            b"DE789,202301,OU456,200\n"
+        )
+        query = AnalyticsQuery(dx=["DE123", "DE789"], ou="OU456", pe=["202301", "202302"])
+        
+        from_json = await analytics_endpoint.to_pandas(query)
+        from_csv = await analytics_endpoint.to_pandas(query, transport="csv")
+        
+        pd.testing.assert_frame_equal(from_csv, from_json)
+        analytics_endpoint.client.get_bytes.assert_called_once_with(
+            '/api/analytics.csv', params=query.to_params()
+        )
+    
+    @pytest.mark.asyncio
+    async def test_csv_transport_rejects_names(self, analytics_endpoint):
+        """Test that CSV cannot resolve names and unknown transports fail"""
+        query = AnalyticsQuery(dx="DE123", ou="OU456", pe="202301")
+        with pytest.raises(ValueError):
+            await analytics_endpoint.to_arrow(query, transport="csv", include_names=True)
+        with pytest.raises(ValueError):
+            await analytics_endpoint.to_arrow(query, transport="xml")
     
     @pytest.mark.asyncio
     async def test_stream_paginated(self, analytics_endpoint):
@@ -210,6 +262,122 @@ class TestAnalyticsEndpoint:
         assert len(results) == 2
         assert analytics_endpoint.client.get.call_count == 2
     
+    @pytest.fixture
+    def paged_client(self, analytics_endpoint):
+        """Fake analytics server with six one-row pages that tracks requests in flight"""
+        state = {"in_flight": 0, "max_in_flight": 0, "params": []}
+        
+        async def fake_get(endpoint, params=None, **kwargs):
+            state["params"].append(params)
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            response = {
+                "headers": [
+                    {"name": "dx", "column": "Data", "type": "TEXT"},
+                    {"name": "value", "column": "Value", "type": "NUMBER"}
+                ],
+                "rows": [["DE1", str(params["page"])]],
+                "pager": {"page": params["page"], "pageCount": 6}
+            }
+            if params["page"] == 1:
+                response["metaData"] = {"items": {"DE1": {"name": "Malaria cases"}}}
+            return response
+        
+        analytics_endpoint.client.get.side_effect = fake_get
+        return state
+    
+    @pytest.mark.asyncio
+    async def test_stream_paginated_prefetch(self, analytics_endpoint, paged_client):
+        """Test that following pages are fetched while a page is consumed"""
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        
+        values = []
+        async for df in analytics_endpoint.stream_paginated(query, prefetch=3, include_names=True):
+            await asyncio.sleep(0.02)
+            values.extend(df["value"].tolist())
+            assert df["dxName"].tolist() == ["Malaria cases"]
+        
+        assert values == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        assert paged_client["max_in_flight"] == 3
+        assert paged_client["params"][0].get("skipMeta") != "true"
+        assert all(p["skipMeta"] == "true" for p in paged_client["params"][1:])
+    
+    @pytest.mark.asyncio
+    async def test_stream_paginated_without_prefetch(self, analytics_endpoint, paged_client):
+        """Test that prefetch=0 fetches one page at a time"""
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        
+        pages = [df async for df in analytics_endpoint.stream_paginated(query, prefetch=0)]
+        
+        assert len(pages) == 6
+        assert paged_client["max_in_flight"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_paginated_early_exit(self, analytics_endpoint, paged_client):
+        """Test that prefetched pages are cancelled when the consumer stops"""
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        
+        stream = analytics_endpoint.stream_paginated(query, prefetch=2)
+        async for _ in stream:
+            break
+        await stream.aclose()
+        
+        assert len(paged_client["params"]) <= 3
+        assert paged_client["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_export_parquet_streaming(self, analytics_endpoint, paged_client, tmp_path):
+        """Test that each page is written as a row group with a fixed schema"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        file_path = tmp_path / "out" / "analytics.parquet"
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        
+        result = await analytics_endpoint.export_to_file(
+            query, str(file_path), format=ExportFormat.PARQUET, streaming=True, page_size=1
+        )
+        
+        assert result == str(file_path)
+        parquet_file = pq.ParquetFile(str(file_path))
+        assert parquet_file.metadata.num_row_groups == 6
+        table = parquet_file.read()
+        assert table.column("value").to_pylist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        assert pa.types.is_dictionary(table.schema.field("dx").type)
+        assert list(file_path.parent.iterdir()) == [file_path]
+    
+    @pytest.mark.asyncio
+    async def test_export_parquet_streaming_failure(self, analytics_endpoint, paged_client, tmp_path):
+        """Test that a failed export leaves the previous file in place"""
+        file_path = tmp_path / "analytics.parquet"
+        file_path.write_bytes(b"previous export")
+        fake_get = analytics_endpoint.client.get.side_effect
+        
+        async def failing_get(endpoint, params=None, **kwargs):
+            if params["page"] == 4:
+                raise ConnectionError("connection reset")
+            return await fake_get(endpoint, params=params, **kwargs)
+        
+        analytics_endpoint.client.get.side_effect = failing_get
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        
+        with pytest.raises(ConnectionError):
+            await analytics_endpoint.export_parquet_streaming(query, str(file_path), page_size=1)
+        
+        assert file_path.read_bytes() == b"previous export"
+        assert list(tmp_path.iterdir()) == [file_path]
+    
+    @pytest.mark.asyncio
+    async def test_export_streaming_requires_parquet(self, analytics_endpoint, tmp_path):
+        """Test that streaming export rejects other formats"""
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        with pytest.raises(ValueError):
+            await analytics_endpoint.export_to_file(
+                query, str(tmp_path / "a.csv"), format=ExportFormat.CSV, streaming=True
+            )
+    
     @pytest.mark.asyncio
     async def test_stream_paginated_empty_page(self, analytics_endpoint):
         """Test streaming with empty page"""
@@ -351,6 +519,197 @@ class TestAnalyticsEndpoint:
                 )
 
 
+class TestAnalyticsResultCache:
+    """Tests for sub-query reuse in the analytics result cache"""
+    
+    @pytest.fixture
+    def analytics_endpoint(self):
+        """Analytics endpoint with a result cache"""
+        return AnalyticsEndpoint(AsyncMock(), result_cache=AnalyticsResultCache(ttl=60))
+    
+    @pytest.fixture
+    def quarterly_response(self):
+        """Analytics response covering four quarters and two org units"""
+        rows = []
+        for i, pe in enumerate(["2023Q1", "2023Q2", "2023Q3", "2023Q4"]):
+            for ou in ["OU1", "OU2"]:
+                rows.append(["DE1", pe, ou, str(10 * i + len(ou))])
+        return {
+            "headers": [
+                {"name": "dx", "column": "Data", "type": "TEXT"},
+                {"name": "pe", "column": "Period", "type": "TEXT"},
+                {"name": "ou", "column": "Organisation unit", "type": "TEXT"},
+                {"name": "value", "column": "Value", "type": "NUMBER"}
+            ],
+            "rows": rows,
+            "metaData": {"items": {}, "dimensions": {}},
+        }
+    
+    @pytest.mark.asyncio
+    async def test_subset_answered_locally(self, analytics_endpoint, quarterly_response):
+        """Test that a subset query is sliced from the cached superset"""
+        analytics_endpoint.client.get.return_value = quarterly_response
+        superset = AnalyticsQuery(
+            dx="DE1", ou=["OU1", "OU2"], pe="2023Q1;2023Q2;2023Q3;2023Q4"
+        )
+        await analytics_endpoint.to_pandas(superset)
+        
+        subset = AnalyticsQuery(dx="DE1", ou=["OU2", "OU1"], pe="2023Q2")
+        df = await analytics_endpoint.to_pandas(subset)
+        
+        assert analytics_endpoint.client.get.call_count == 1
+        expected = analytics_endpoint.converter.to_dataframe(quarterly_response)
+        expected = expected[expected["period"] == "2023Q2"].reset_index(drop=True)
+        pd.testing.assert_frame_equal(df, expected)
+        assert analytics_endpoint.result_cache.get_stats()["sliced_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_identical_query_hit(self, analytics_endpoint, quarterly_response):
+        """Test that repeating a query returns the cached result"""
+        analytics_endpoint.client.get.return_value = quarterly_response
+        query = AnalyticsQuery(dx="DE1", ou=["OU1", "OU2"], pe=["2023Q1", "2023Q2"])
+        
+        first = await analytics_endpoint.to_pandas(query)
+        second = await analytics_endpoint.to_pandas(query)
+        
+        assert analytics_endpoint.client.get.call_count == 1
+        pd.testing.assert_frame_equal(first, second)
+    
+    @pytest.mark.asyncio
+    async def test_non_subset_goes_to_server(self, analytics_endpoint, quarterly_response):
+        """Test that items outside the cached result are fetched"""
+        analytics_endpoint.client.get.return_value = quarterly_response
+        await analytics_endpoint.to_pandas(AnalyticsQuery(dx="DE1", ou="OU1", pe="2023Q1"))
+        await analytics_endpoint.to_pandas(AnalyticsQuery(dx="DE1", ou="OU1", pe="2023Q2"))
+        await analytics_endpoint.to_pandas(
+            AnalyticsQuery(dx="DE1", ou="OU1", pe="2023Q1", skip_rounding=True)
+        )
+        
+        assert analytics_endpoint.client.get.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_keyword_items_not_sliced(self, analytics_endpoint, quarterly_response):
+        """Test that server-expanded keywords are never answered by slicing"""
+        analytics_endpoint.client.get.return_value = quarterly_response
+        await analytics_endpoint.to_pandas(
+            AnalyticsQuery(dx="DE1", ou=["OU1", "LEVEL-2"], pe="2023Q1")
+        )
+        await analytics_endpoint.to_pandas(AnalyticsQuery(dx="DE1", ou="LEVEL-2", pe="2023Q1"))
+        
+        assert analytics_endpoint.client.get.call_count == 2
+    
+    def test_cached_keyword_items_not_sliced(self):
+        """Test that a result cached for keyword items does not answer literal sub-queries"""
+        import pyarrow as pa
+        
+        cache = AnalyticsResultCache()
+        # ou:A;LEVEL-2 returns the level-2 units under A, not A itself
+        table = pa.table({"dx": ["DE1"], "period": ["2023"], "orgUnit": ["B"], "value": [1.0]})
+        cache.put_table(AnalyticsQuery(dx="DE1", ou="A;LEVEL-2", pe="2023"), table)
+        
+        assert cache.get_table(AnalyticsQuery(dx="DE1", ou="A", pe="2023")) is None
+        assert cache.get_table(AnalyticsQuery(dx="DE1", ou="B", pe="2023")) is None
+        assert cache.get_table(AnalyticsQuery(dx="DE1", ou="A;LEVEL-2", pe="2023")) is table
+        
+        # Keywords in a dimension that is not sliced are fine
+        cache.put_table(AnalyticsQuery(dx="DE1", ou="A;B", pe="LAST_12_MONTHS"), table)
+        sliced = cache.get_table(AnalyticsQuery(dx="DE1", ou="B", pe="LAST_12_MONTHS"))
+        assert sliced.column("orgUnit").to_pylist() == ["B"]
+    
+    @pytest.mark.asyncio
+    async def test_expired_entries_ignored(self, quarterly_response):
+        """Test that results older than the TTL are not reused"""
+        endpoint = AnalyticsEndpoint(AsyncMock(), result_cache=AnalyticsResultCache(ttl=60))
+        endpoint.client.get.return_value = quarterly_response
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023Q1")
+        
+        await endpoint.to_pandas(query)
+        for entry in endpoint.result_cache._entries.values():
+            entry.timestamp -= 120
+        await endpoint.to_pandas(query)
+        
+        assert endpoint.client.get.call_count == 2
+    
+    def test_max_entries(self):
+        """Test that the least recently used result is evicted"""
+        import pyarrow as pa
+        
+        cache = AnalyticsResultCache(max_entries=2)
+        table = pa.table({"dx": ["DE1"], "period": ["2023"], "orgUnit": ["OU1"], "value": [1.0]})
+        for pe in ["2021", "2022", "2023"]:
+            cache.put_table(AnalyticsQuery(dx="DE1", ou="OU1", pe=pe), table)
+        
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get_table(AnalyticsQuery(dx="DE1", ou="OU1", pe="2021")) is None
+        assert cache.get_table(AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")) is table
+
+
+class TestAnalyticsStore:
+    """Tests for the incremental period-partitioned analytics store"""
+    
+    @pytest.fixture
+    def store_client(self):
+        """Mock client serving analytics rows and a settable analytics generation time"""
+        client = AsyncMock()
+        client.state = {"generated": "2024-01-01T02:00:00", "value": 1, "calls": []}
+        
+        async def fake_get(endpoint, params=None, **kwargs):
+            if endpoint == "/api/system/info":
+                return {"lastAnalyticsTableGeneration": client.state["generated"]}
+            items = dict(d.split(":", 1) for d in params["dimension"])
+            periods = items["pe"].split(";")
+            if params["skipData"] == "true":
+                return {"metaData": {"dimensions": {"pe": [f"2023{m:02d}" for m in range(7, 13)]}}}
+            client.state["calls"].append(periods)
+            return {
+                "headers": [{"name": "dx"}, {"name": "pe"}, {"name": "ou"}, {"name": "value"}],
+                "rows": [["DE1", pe, "OU1", str(client.state["value"])] for pe in periods],
+            }
+        
+        client.get.side_effect = fake_get
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_incremental_refresh(self, store_client, tmp_path):
+        """Test that later runs only re-pull the open window after an analytics run"""
+        endpoint = AnalyticsEndpoint(store_client)
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="LAST_6_MONTHS")
+        
+        first = await endpoint.refresh_store(query, str(tmp_path), open_periods=2)
+        assert first.fetched_periods == first.periods
+        assert first.rows_written == 6
+        
+        # Analytics tables not regenerated: nothing to fetch
+        second = await endpoint.refresh_store(query, str(tmp_path), open_periods=2)
+        assert second.fetched_periods == []
+        
+        store_client.state.update(generated="2024-01-02T02:00:00", value=5)
+        third = await endpoint.refresh_store(query, str(tmp_path), open_periods=2, changed_periods=["202307"])
+        assert third.fetched_periods == ["202307", "202311", "202312"]
+        assert store_client.state["calls"][-1] == ["202307", "202311", "202312"]
+        
+        table = endpoint.load_store(str(tmp_path))
+        assert table.column("period").to_pylist() == [f"2023{m:02d}" for m in range(7, 13)]
+        assert table.column("value").to_pylist() == [5.0, 1.0, 1.0, 1.0, 5.0, 5.0]
+    
+    @pytest.mark.asyncio
+    async def test_rolling_window_and_signature(self, store_client, tmp_path):
+        """Test that periods leaving the query are dropped and other queries are refused"""
+        endpoint = AnalyticsEndpoint(store_client)
+        await endpoint.refresh_store(AnalyticsQuery(dx="DE1", ou="OU1", pe="202305;202306;202307"), str(tmp_path))
+        
+        result = await endpoint.refresh_store(
+            AnalyticsQuery(dx="DE1", ou="OU1", pe="202306;202307;202308"), str(tmp_path)
+        )
+        assert result.dropped_periods == ["202305"]
+        assert endpoint.load_store(str(tmp_path)).column("period").to_pylist() == ["202306", "202307", "202308"]
+        
+        with pytest.raises(ValueError):
+            await endpoint.refresh_store(AnalyticsQuery(dx="DE2", ou="OU1", pe="202306"), str(tmp_path))
+        with pytest.raises(FileNotFoundError):
+            endpoint.load_store(str(tmp_path / "missing"))
+
+
 class TestImportSummary:
     """Tests for the ImportSummary class"""
     
@@ -869,6 +1228,575 @@ class TestDataValueSetsEndpoint:
         # Should only make 1 API call (starting from chunk 1, which is the second chunk)
         assert datavaluesets_endpoint.client.post.call_count == 1
     
+    @pytest.mark.asyncio
+    async def test_push_chunked_concurrent(self, datavaluesets_endpoint):
+        """Test that non-atomic pushes keep several chunks in flight and merge in order"""
+        data = {'dataValues': [
+            {'dataElement': 'DE1', 'period': '202301', 'orgUnit': f'OU{i}', 'value': str(i)}
+            for i in range(10)
+        ]}
+        in_flight = {'now': 0, 'max': 0}
+        
+        async def fake_post(endpoint, data=None, params=None):
+            first = int(data['dataValues'][0]['value'])
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            # Earlier chunks finish last
+            await asyncio.sleep(0.01 * (10 - first))
+            in_flight['now'] -= 1
+            if first == 4:
+                raise ImportConflictError(
+                    conflicts=[{'object': 'OU4', 'message': 'locked'}],
+                    import_summary={'status': 'WARNING', 'ignored': 2}
+                )
+            conflicts = [{'object': f'OU{first}', 'message': 'dry'}] if first in (0, 8) else []
+            return {'status': 'SUCCESS', 'imported': 2, 'conflicts': conflicts}
+        
+        datavaluesets_endpoint.client.post.side_effect = fake_post
+        progress = []
+        config = ImportConfig(atomic=False, dry_run=True, max_concurrent_chunks=3)
+        
+        summary = await datavaluesets_endpoint.push(
+            data, config=config, chunk_size=2,
+            progress_callback=lambda idx, total, s: progress.append((idx, total))
+        )
+        
+        assert in_flight['max'] == 3
+        assert summary.imported == 8
+        assert summary.ignored == 2
+        assert [c['object'] for c in summary.conflicts] == ['OU0', 'OU4', 'OU8']
+        assert sorted(progress) == [(i, 5) for i in range(5)]
+    
+    @pytest.fixture
+    def values_frame(self):
+        """Data values for file pushes"""
+        return pd.DataFrame({
+            'dataElement': [f'DE{i % 7}' for i in range(1000)],
+            'period': ['202301'] * 1000,
+            'orgUnit': [f'OU{i}' for i in range(1000)],
+            'value': [f'{i:04d}' for i in range(1000)],
+        })
+    
+    @pytest.mark.asyncio
+    async def test_push_file_parquet_bounded(self, datavaluesets_endpoint, values_frame, tmp_path):
+        """Test that a Parquet push serializes chunks only as slots free up"""
+        path = tmp_path / "values.parquet"
+        values_frame.to_parquet(path, row_group_size=300)
+        
+        endpoint = datavaluesets_endpoint
+        serialized = {'chunks': 0, 'done': 0, 'ahead': 0}
+        from_dataframe = endpoint.converter.from_dataframe
+        
+        def counting_from_dataframe(df):
+            serialized['chunks'] += 1
+            return from_dataframe(df)
+        
+        async def fake_post(endpoint_path, data=None, params=None):
+            serialized['ahead'] = max(serialized['ahead'], serialized['chunks'] - serialized['done'])
+            await asyncio.sleep(0.01)
+            serialized['done'] += 1
+            return {'status': 'SUCCESS', 'imported': len(data['dataValues'])}
+        
+        endpoint.converter.from_dataframe = counting_from_dataframe
+        endpoint.client.post.side_effect = fake_post
+        progress = []
+        
+        summary = await endpoint.push_file(
+            path, config=ImportConfig(atomic=False, max_concurrent_chunks=2), chunk_size=100,
+            progress_callback=lambda idx, total, s: progress.append(total)
+        )
+        
+        assert summary.imported == 1000
+        assert summary.total == 1000
+        assert endpoint.client.post.call_count == 10
+        assert serialized['ahead'] <= 3
+        assert progress == [10] * 10
+    
+    @pytest.mark.asyncio
+    async def test_push_file_csv_resume(self, datavaluesets_endpoint, values_frame, tmp_path):
+        """Test pushing a CSV file from a chunk, keeping values as written"""
+        path = tmp_path / "values.csv"
+        values_frame['followup'] = ['false', 'TRUE'] * (len(values_frame) // 2)
+        values_frame.to_csv(path, index=False)
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 400}
+        
+        summary = await datavaluesets_endpoint.push_file(path, chunk_size=400, resume_from_chunk=1)
+        
+        posted = [c.kwargs['data']['dataValues'] for c in datavaluesets_endpoint.client.post.call_args_list]
+        assert [len(values) for values in posted] == [400, 200]
+        assert posted[0][0] == {
+            'dataElement': 'DE1', 'period': '202301', 'orgUnit': 'OU400', 'value': '0400', 'followup': False
+        }
+        assert posted[0][1]['followup'] is True
+        assert summary.total == 600
+    
+    @pytest.mark.asyncio
+    async def test_push_file_parquet_nullable_integers(self, datavaluesets_endpoint, tmp_path):
+        """Test that integer values keep their spelling in chunks with missing values"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        path = tmp_path / "values.parquet"
+        pq.write_table(pa.table({
+            'dataElement': ['DE1'] * 4,
+            'period': ['202301'] * 4,
+            'orgUnit': ['OU1', 'OU2', 'OU3', 'OU4'],
+            'value': pa.array([5, None, 7, 8], type=pa.int64()),
+        }), str(path))
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 2}
+        
+        await datavaluesets_endpoint.push_file(path, chunk_size=2)
+        
+        posted = [c.kwargs['data']['dataValues'] for c in datavaluesets_endpoint.client.post.call_args_list]
+        assert [dv.get('value') for values in posted for dv in values] == ['5', None, '7', '8']
+    
+    @pytest.mark.asyncio
+    async def test_push_journal_resumes_after_failure(self, datavaluesets_endpoint, tmp_path):
+        """Test that a journaled push skips acknowledged chunks when run again"""
+        data = {'dataValues': [{'dataElement': 'DE1', 'orgUnit': f'OU{i}', 'value': str(i)} for i in range(10)]}
+        journal_path = tmp_path / "push.journal"
+        config = ImportConfig(atomic=False, max_concurrent_chunks=2)
+        
+        async def failing_post(endpoint, data=None, params=None):
+            if data['dataValues'][0]['value'] == '4':
+                raise ConnectionError("connection reset")
+            await asyncio.sleep(0.01)
+            return {'status': 'SUCCESS', 'imported': len(data['dataValues'])}
+        
+        datavaluesets_endpoint.client.post.side_effect = failing_post
+        with pytest.raises(ConnectionError):
+            await datavaluesets_endpoint.push(data, config=config, chunk_size=2, journal=journal_path)
+        
+        acknowledged = set(PushJournal(journal_path).chunks)
+        assert 2 not in acknowledged
+        assert 0 in acknowledged
+        
+        datavaluesets_endpoint.client.post.reset_mock()
+        datavaluesets_endpoint.client.post.side_effect = None
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 2}
+        summary = await datavaluesets_endpoint.push(data, config=config, chunk_size=2, journal=journal_path)
+        
+        posted = [c.kwargs['data']['dataValues'][0]['value'] for c in datavaluesets_endpoint.client.post.call_args_list]
+        assert '4' in posted
+        assert not {str(chunk_idx * 2) for chunk_idx in acknowledged} & set(posted)
+        assert summary.imported == 10
+        assert summary.total == 10
+        
+        journal = PushJournal(journal_path)
+        assert sorted(journal.chunks) == [0, 1, 2, 3, 4]
+        assert (journal.chunks[2]['start'], journal.chunks[2]['end']) == (4, 6)
+    
+    @pytest.mark.asyncio
+    async def test_push_journal_rejects_other_push(self, datavaluesets_endpoint, tmp_path):
+        """Test that a journal is not reused for different data or chunking"""
+        data = {'dataValues': [{'dataElement': 'DE1', 'value': str(i)} for i in range(4)]}
+        journal_path = tmp_path / "push.journal"
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 2}
+        await datavaluesets_endpoint.push(data, chunk_size=2, journal=journal_path)
+        
+        changed = {'dataValues': data['dataValues'][:3] + [{'dataElement': 'DE1', 'value': '99'}]}
+        with pytest.raises(ValueError, match="fingerprint"):
+            await datavaluesets_endpoint.push(changed, chunk_size=2, journal=journal_path)
+        with pytest.raises(ValueError, match="chunkSize"):
+            await datavaluesets_endpoint.push(data, chunk_size=3, journal=journal_path)
+        
+        # Key order does not change the fingerprint; a finished push is not repeated
+        reordered = {'dataValues': [dict(reversed(list(v.items()))) for v in data['dataValues']]}
+        summary = await datavaluesets_endpoint.push(reordered, chunk_size=2, journal=journal_path)
+        assert datavaluesets_endpoint.client.post.call_count == 2
+        assert summary.imported == 4
+    
+    @pytest.mark.asyncio
+    async def test_push_file_journal_skips_serialization(self, datavaluesets_endpoint, values_frame, tmp_path):
+        """Test that file pushes skip acknowledged chunks before serializing them"""
+        path = tmp_path / "values.parquet"
+        values_frame.to_parquet(path)
+        journal_path = tmp_path / "push.journal"
+        endpoint = datavaluesets_endpoint
+        endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 250}
+        
+        journal = PushJournal(journal_path)
+        await endpoint.push_file(path, chunk_size=250, journal=journal)
+        # Forget the last two chunks, as if the push had stopped there
+        lines = journal_path.read_text().splitlines()
+        journal_path.write_text('\n'.join(lines[:3]) + '\n{"chunk": 3, "sta')
+        
+        serialized = []
+        from_dataframe = endpoint.converter.from_dataframe
+        endpoint.converter.from_dataframe = lambda df: serialized.append(len(df)) or from_dataframe(df)
+        endpoint.client.post.reset_mock()
+        
+        summary = await endpoint.push_file(path, chunk_size=250, journal=journal_path)
+        
+        assert len(serialized) == 2
+        assert endpoint.client.post.call_count == 2
+        assert summary.imported == 1000
+    
+    @pytest.fixture
+    def shard_client(self):
+        """Mock client with a two-district hierarchy that returns one value per unit and period"""
+        client = AsyncMock()
+        client.metadata.get_organisation_units.return_value = {'organisationUnits': [
+            {'id': 'ROOT', 'level': 1, 'path': '/ROOT'},
+            {'id': 'D1', 'level': 2, 'path': '/ROOT/D1'},
+            {'id': 'D2', 'level': 2, 'path': '/ROOT/D2'},
+            {'id': 'F1', 'level': 3, 'path': '/ROOT/D1/F1'},
+        ]}
+        client.requests = []
+        client.failures = {}
+        
+        async def fake_get(endpoint, params=None, **kwargs):
+            key = (tuple(params['orgUnit']), tuple(params['period']))
+            client.requests.append(key)
+            if client.failures.get(key, 0) > 0:
+                client.failures[key] -= 1
+                raise DHIS2HTTPError(504, endpoint)
+            await asyncio.sleep(0.001 * len(client.requests))
+            return {'dataValues': [
+                {'dataElement': 'DE1', 'period': pe, 'orgUnit': ou, 'value': '1'}
+                for pe in params['period'] for ou in params['orgUnit']
+            ]}
+        
+        client.get.side_effect = fake_get
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_pull_sharded(self, shard_client):
+        """Test that a sharded pull splits by subtree and period and retries a shard on its own"""
+        endpoint = DataValueSetsEndpoint(shard_client)
+        endpoint.shard_retry_delay = 0
+        shard_client.failures[(('D2',), ('202403', '202404'))] = 1
+        periods = ['202401', '202402', '202403', '202404']
+        
+        df = await endpoint.pull_sharded('DS1', 'ROOT', periods=periods, periods_per_shard=2, concurrency=3)
+        
+        assert len(df) == 12
+        assert list(df['period'][:3]) == ['202401', '202402', '202401']
+        assert set(shard_client.requests) == {
+            (ous, pes) for pes in [('202401', '202402'), ('202403', '202404')]
+            for ous in [('D1',), ('D2',), ('ROOT',)]
+        }
+        assert len(shard_client.requests) == 7
+        _, params = shard_client.get.call_args
+        assert params['params']['dataSet'] == 'DS1'
+        assert params['params']['children'] in ('true', 'false')
+    
+    @pytest.mark.asyncio
+    async def test_stream_sharded_partial_failure(self, shard_client):
+        """Test that shards that keep failing are reported after the others are yielded"""
+        endpoint = DataValueSetsEndpoint(shard_client)
+        endpoint.shard_retry_delay = 0
+        shard_client.failures[(('F1',), ('202401',))] = 10
+        
+        received = []
+        with pytest.raises(PartitionFetchError) as exc_info:
+            async for shard, frame in endpoint.stream_sharded('DS1', 'ROOT', periods=['202401'], org_unit_level=3):
+                received.append((shard.org_units, shard.children, len(frame)))
+        
+        # Level 3 subtrees: F1, plus the units above it pulled without children
+        assert received == [(('D1', 'D2', 'ROOT'), False, 3)]
+        assert shard_client.requests.count((('F1',), ('202401',))) == 3
+        assert exc_info.value.failed_partitions == [0]
+        assert exc_info.value.total_partitions == 2
+    
+    @pytest.fixture
+    def sync_client(self):
+        """Mock client serving a single-unit hierarchy and queued dataValueSets responses"""
+        client = AsyncMock()
+        client.metadata.get_organisation_units.return_value = {'organisationUnits': [
+            {'id': 'OU1', 'level': 1, 'path': '/OU1'},
+        ]}
+        client.server_date = '2024-03-01T00:00:00.000'
+        client.responses = []
+        client.value_params = []
+        
+        async def fake_get(endpoint, params=None, **kwargs):
+            if endpoint == '/api/system/info':
+                return {'serverDate': client.server_date}
+            assert kwargs.get('use_cache') is False
+            client.value_params.append(params)
+            response = client.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return {'dataValues': response}
+        
+        client.get.side_effect = fake_get
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_sync_to_store_incremental(self, sync_client, tmp_path):
+        """Test that later syncs pull changes since the watermark and upsert them"""
+        endpoint = DataValueSetsEndpoint(sync_client)
+        store_dir = str(tmp_path / "store")
+        
+        def dv(de, pe, value, **extra):
+            return {'dataElement': de, 'period': pe, 'orgUnit': 'OU1', 'categoryOptionCombo': 'COC',
+                    'attributeOptionCombo': 'AOC', 'value': value, **extra}
+        
+        sync_client.responses.append([dv('DE1', '202401', '1'), dv('DE2', '202401', '2'), dv('DE1', '202402', '3')])
+        result = await endpoint.sync_to_store(store_dir, 'DS1', 'OU1', periods=['202401', '202402'])
+        
+        assert result.previous_watermark is None
+        assert result.values_fetched == 3
+        assert result.periods_written == ['202401', '202402']
+        assert 'lastUpdated' not in sync_client.value_params[0]
+        assert sync_client.value_params[0]['includeDeleted'] == 'true'
+        
+        sync_client.server_date = '2024-03-02T00:00:00.000'
+        sync_client.responses.append([
+            dv('DE1', '202401', '10', followup=True),
+            dv('DE2', '202401', '2', deleted=True),
+            dv('DE1', '202403', '4'),
+        ])
+        result = await endpoint.sync_to_store(store_dir, 'DS1', 'OU1', periods=['202401', '202402'])
+        
+        assert sync_client.value_params[1]['lastUpdated'] == '2024-03-01T00:00:00.000'
+        assert result.values_deleted == 1
+        assert result.periods_written == ['202401', '202403']
+        
+        table = endpoint.load_store(store_dir)
+        rows = {(r['dataElement'], r['period']): (r['value'], r['followup']) for r in table.to_pylist()}
+        assert rows == {
+            ('DE1', '202401'): ('10', True),
+            ('DE1', '202402'): ('3', None),
+            ('DE1', '202403'): ('4', None),
+        }
+        assert PartitionedParquetStore(store_dir, 'period').state['watermarks'] == {
+            'DS1/OU1': '2024-03-02T00:00:00.000'
+        }
+    
+    @pytest.mark.asyncio
+    async def test_sync_to_store_failure_keeps_watermark(self, sync_client, tmp_path):
+        """Test that a failed sync does not move the watermark"""
+        endpoint = DataValueSetsEndpoint(sync_client)
+        endpoint.shard_retries = 0
+        store_dir = str(tmp_path / "store")
+        
+        with pytest.raises(ValueError):
+            await endpoint.sync_to_store(store_dir, 'DS1', 'OU1')
+        
+        sync_client.responses.append(DHIS2HTTPError(504, '/api/dataValueSets'))
+        with pytest.raises(PartitionFetchError):
+            await endpoint.sync_to_store(store_dir, 'DS1', 'OU1', start_date='2024-01-01', end_date='2024-12-31')
+        
+        assert PartitionedParquetStore(store_dir, 'period').state['watermarks'] == {}
+    
+    @pytest.mark.asyncio
+    async def test_push_adaptive_chunk_size(self, datavaluesets_endpoint):
+        """Test that push chunks shrink after 413 responses and the sizes are reported"""
+        endpoint = datavaluesets_endpoint
+        endpoint.chunk_sizer = AdaptiveChunkSizer(initial_cells=40, min_cells=5, max_cells=100)
+        data = {'dataValues': [{'dataElement': 'DE1', 'orgUnit': f'OU{i}', 'value': str(i)} for i in range(200)]}
+        posted = []
+        
+        async def fake_post(endpoint_path, data=None, params=None):
+            values = data['dataValues']
+            if len(values) > 45:
+                raise DHIS2HTTPError(413, endpoint_path, "Payload Too Large")
+            posted.extend(v['value'] for v in values)
+            return {'status': 'SUCCESS', 'imported': len(values)}
+        
+        endpoint.client.post.side_effect = fake_post
+        summary = await endpoint.push(data, config=ImportConfig(atomic=False), chunk_size=10)
+        
+        sizes = summary.raw_data['chunkSizes']
+        assert summary.imported == 200
+        assert sum(sizes) == 200
+        assert sorted(posted, key=int) == [str(i) for i in range(200)]
+        # The second chunk grew to 50, was rejected and pushed again as two halves
+        assert sizes[:3] == [40, 25, 25]
+        assert max(sizes) <= 45
+        assert endpoint.chunk_sizer.get_stats()['error_count'] == 1
+        
+        # Other errors are not retried
+        endpoint.client.post.side_effect = DHIS2HTTPError(403, '/api/dataValueSets')
+        with pytest.raises(DHIS2HTTPError):
+            await endpoint.push(data, config=ImportConfig(atomic=False))
+    
+    @pytest.mark.asyncio
+    async def test_push_delta_sends_changed_values(self, datavaluesets_endpoint, tmp_path):
+        """Test that delta pushes skip values unchanged since the last successful push"""
+        index_path = tmp_path / "index.parquet"
+        endpoint = datavaluesets_endpoint
+        values = [{'dataElement': 'DE1', 'period': '202401', 'orgUnit': f'OU{i}', 'value': str(i)} for i in range(10)]
+        
+        async def fake_post(endpoint_path, data=None, params=None):
+            return {'status': 'SUCCESS', 'imported': len(data['dataValues'])}
+        
+        endpoint.client.post.side_effect = fake_post
+        summary = await endpoint.push({'dataValues': values}, chunk_size=4, delta_index=index_path)
+        assert summary.imported == 10
+        assert summary.raw_data['unchanged'] == 0
+        
+        # A dry run does not touch the index
+        await endpoint.push({'dataValues': values + [{'dataElement': 'DE2', 'value': '1'}]},
+                            config=ImportConfig(dry_run=True), delta_index=index_path)
+        
+        endpoint.client.post.reset_mock()
+        edited = [dict(v) for v in values]
+        edited[3]['value'] = '30'
+        edited.append({'dataElement': 'DE2', 'period': '202401', 'orgUnit': 'OU1', 'value': '1'})
+        summary = await endpoint.push({'dataValues': edited}, chunk_size=4, delta_index=index_path)
+        
+        sent = endpoint.client.post.call_args.kwargs['data']['dataValues']
+        assert endpoint.client.post.call_count == 1
+        assert [v['orgUnit'] for v in sent] == ['OU3', 'OU1']
+        assert summary.raw_data['unchanged'] == 9
+        
+        endpoint.client.post.reset_mock()
+        summary = await endpoint.push({'dataValues': edited}, delta_index=index_path)
+        endpoint.client.post.assert_not_called()
+        assert summary.total == 0
+        assert summary.raw_data['unchanged'] == 11
+    
+    @pytest.mark.asyncio
+    async def test_push_delta_index_not_updated_on_conflict(self, datavaluesets_endpoint, tmp_path):
+        """Test that values from a push with conflicts are sent again next time"""
+        index_path = tmp_path / "index.parquet"
+        values = [{'dataElement': 'DE1', 'period': '202401', 'orgUnit': 'OU1', 'value': '1'}]
+        datavaluesets_endpoint.client.post.return_value = {
+            'status': 'WARNING', 'conflicts': [{'object': 'OU1', 'value': 'Period locked'}]
+        }
+        
+        with pytest.raises(ImportConflictError):
+            await datavaluesets_endpoint.push({'dataValues': values}, delta_index=index_path)
+        assert not index_path.exists()
+        
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 1}
+        summary = await datavaluesets_endpoint.push({'dataValues': values}, delta_index=index_path)
+        assert summary.imported == 1
+        
+        # Deletions are always sent and leave the index
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'deleted': 1}
+        await datavaluesets_endpoint.push(
+            {'dataValues': values}, config=ImportConfig(strategy=ImportStrategy.DELETE), delta_index=index_path
+        )
+        assert datavaluesets_endpoint.client.post.call_count == 3
+        assert len(DataValueIndex(index_path)) == 0
+    
+    @pytest.mark.asyncio
+    async def test_push_delta_index_not_updated_on_error(self, datavaluesets_endpoint, tmp_path):
+        """Test that values from a failed or partly ignored push are sent again next time"""
+        index_path = tmp_path / "index.parquet"
+        endpoint = datavaluesets_endpoint
+        values = [{'dataElement': 'DE1', 'period': '202401', 'orgUnit': f'OU{i}', 'value': '1'} for i in range(2)]
+        
+        endpoint.client.post.return_value = {'status': 'ERROR', 'ignored': 2}
+        summary = await endpoint.push({'dataValues': values}, delta_index=index_path)
+        assert summary.status == 'ERROR'
+        assert not index_path.exists()
+        
+        # A failed chunk fails the merged summary too
+        endpoint.client.post.side_effect = [{'status': 'SUCCESS', 'imported': 1}, {'status': 'ERROR', 'ignored': 1}]
+        summary = await endpoint.push({'dataValues': values}, chunk_size=1, delta_index=index_path)
+        assert summary.status == 'ERROR'
+        assert not index_path.exists()
+        
+        endpoint.client.post.side_effect = None
+        endpoint.client.post.return_value = {'status': 'WARNING', 'imported': 1, 'ignored': 1}
+        await endpoint.push({'dataValues': values}, delta_index=index_path)
+        assert not index_path.exists()
+        
+        endpoint.client.post.reset_mock()
+        endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 2}
+        summary = await endpoint.push({'dataValues': values}, delta_index=index_path)
+        assert summary.imported == 2
+        assert len(DataValueIndex(index_path)) == 2
+    
+    @pytest.fixture
+    def job_client(self):
+        """Mock client that queues async import jobs and completes them after a few polls"""
+        client = AsyncMock()
+        client.jobs = {}
+        client.task_polls = 0
+        
+        async def fake_post(endpoint, data=None, params=None):
+            assert params['async'] == 'true'
+            task_id = f"job{len(client.jobs)}"
+            client.jobs[task_id] = len(data['dataValues'])
+            return {
+                'httpStatus': 'OK',
+                'message': 'Initiated DATAVALUE_IMPORT',
+                'response': {'id': task_id, 'jobType': 'DATAVALUE_IMPORT', 'name': 'DATAVALUE_IMPORT'}
+            }
+        
+        async def fake_get(endpoint, params=None, **kwargs):
+            if endpoint == '/api/system/tasks/DATAVALUE_IMPORT':
+                client.task_polls += 1
+                return {
+                    task_id: [{'message': 'Import done', 'completed': client.task_polls >= 3}]
+                    for task_id in client.jobs
+                }
+            task_id = endpoint.rsplit('/', 1)[-1]
+            return {'status': 'SUCCESS', 'importCount': {'imported': client.jobs[task_id], 'updated': 0, 'ignored': 0}}
+        
+        client.post.side_effect = fake_post
+        client.get.side_effect = fake_get
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_async_import_jobs_polled_together(self, job_client):
+        """Test that queued import jobs share one polling loop and summaries are merged"""
+        endpoint = DataValueSetsEndpoint(job_client)
+        endpoint.job_poller = ImportJobPoller(job_client, min_interval=0.01, max_interval=0.02)
+        data = {'dataValues': [{'dataElement': 'DE1', 'value': str(i)} for i in range(10)]}
+        config = ImportConfig(atomic=False, async_import=True, max_concurrent_chunks=4)
+        
+        summary = await endpoint.push(data, config=config, chunk_size=3)
+        
+        assert summary.imported == 10
+        assert summary.total == 10
+        assert len(job_client.jobs) == 4
+        # All four jobs were followed through the same task polls
+        assert job_client.task_polls == 3
+        assert endpoint.job_poller.get_stats() == {'pending': 0, 'completed': 4, 'polls': 3}
+    
+    @pytest.mark.asyncio
+    async def test_async_import_job_timeout(self, job_client):
+        """Test that a job that never completes raises ImportJobError"""
+        async def never_done(endpoint, params=None, **kwargs):
+            return {'job0': [{'message': 'Importing', 'completed': False}]}
+        
+        job_client.get.side_effect = never_done
+        endpoint = DataValueSetsEndpoint(job_client)
+        endpoint.job_poller = ImportJobPoller(job_client, min_interval=0.01, job_timeout=0.03)
+        
+        with pytest.raises(ImportJobError):
+            await endpoint.push({'dataValues': [{'value': '1'}]}, config=ImportConfig(async_import=True))
+    
+    @pytest.mark.asyncio
+    async def test_async_import_synchronous_response(self, datavaluesets_endpoint):
+        """Test that a summary returned directly is used as is"""
+        datavaluesets_endpoint.client.post.return_value = {'status': 'SUCCESS', 'imported': 1}
+        
+        summary = await datavaluesets_endpoint.push(
+            {'dataValues': [{'value': '1'}]}, config=ImportConfig(async_import=True)
+        )
+        
+        assert summary.imported == 1
+        datavaluesets_endpoint.client.get.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_push_chunked_atomic_is_serial(self, datavaluesets_endpoint):
+        """Test that atomic pushes ignore max_concurrent_chunks"""
+        data = {'dataValues': [{'dataElement': 'DE1', 'value': str(i)} for i in range(6)]}
+        in_flight = {'now': 0, 'max': 0}
+        
+        async def fake_post(endpoint, data=None, params=None):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            in_flight['now'] -= 1
+            return {'status': 'SUCCESS', 'imported': 2}
+        
+        datavaluesets_endpoint.client.post.side_effect = fake_post
+        summary = await datavaluesets_endpoint.push(
+            data, config=ImportConfig(max_concurrent_chunks=4), chunk_size=2
+        )
+        
+        assert in_flight['max'] == 1
+        assert summary.imported == 6
+    
     
     @pytest.mark.asyncio
     async def test_export_to_file_all_formats(self, datavaluesets_endpoint, sample_datavaluesets_response):
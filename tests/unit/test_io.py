@@ -10,7 +10,8 @@ from pydhis2.io.to_pandas import (
     TrackerConverter,
     ImportSummaryConverter
 )
-from pydhis2.io.arrow import ArrowConverter
+from pydhis2.io.arrow import AnalyticsArrowConverter, ArrowConverter
+from pydhis2.io.store import DataValueIndex, PartitionedParquetStore
 
 
 class TestAnalyticsDataFrameConverter:
@@ -87,6 +88,197 @@ class TestAnalyticsDataFrameConverter:
             assert pd.api.types.is_numeric_dtype(df['value'])
 
 
+class TestAnalyticsArrowConverter:
+    """Tests for the AnalyticsArrowConverter class"""
+    
+    @pytest.fixture
+    def converter(self):
+        """Analytics Arrow converter instance"""
+        return AnalyticsArrowConverter()
+    
+    @pytest.fixture
+    def sample_analytics_data(self):
+        """Sample Analytics API response with a category option combo"""
+        return {
+            "headers": [
+                {"name": "dx", "column": "Data", "type": "TEXT"},
+                {"name": "co", "column": "Category option combo", "type": "TEXT"},
+                {"name": "pe", "column": "Period", "type": "TEXT"},
+                {"name": "ou", "column": "Organisation unit", "type": "TEXT"},
+                {"name": "value", "column": "Value", "type": "NUMBER"}
+            ],
+            "rows": [
+                ["DE123", "CO1", "202301", "OU456", "100"],
+                ["DE123", "CO2", "202302", "OU456", "1.5"],
+                ["DE789", "CO1", "202301", "OU456", "200"]
+            ],
+            "metaData": {"items": {}, "dimensions": {}}
+        }
+    
+    def test_to_table_long_format(self, converter, sample_analytics_data):
+        """Test dictionary-encoded dimensions and a float64 value column"""
+        table = converter.to_table(sample_analytics_data)
+        
+        assert table.column_names == ["dx", "categoryOptionCombo", "period", "orgUnit", "value"]
+        for name in ["dx", "categoryOptionCombo", "period", "orgUnit"]:
+            assert pa.types.is_dictionary(table.schema.field(name).type)
+        assert table.schema.field("value").type == pa.float64()
+        assert table.column("value").to_pylist() == [100.0, 1.5, 200.0]
+        assert table.column("dx").to_pylist() == ["DE123", "DE123", "DE789"]
+    
+    def test_to_table_wide_format(self, converter, sample_analytics_data):
+        """Test that wide format keeps header names and raw values"""
+        table = converter.to_table(sample_analytics_data, long_format=False)
+        
+        assert table.column_names == ["dx", "co", "pe", "ou", "value"]
+        assert table.column("value").to_pylist() == ["100", "1.5", "200"]
+    
+    def test_unparseable_values_become_null(self, converter, sample_analytics_data):
+        """Test that values that are not numbers are coerced to null"""
+        sample_analytics_data["rows"][1][4] = "n/a"
+        sample_analytics_data["rows"][2][4] = 7
+        table = converter.to_table(sample_analytics_data)
+        
+        assert table.column("value").to_pylist() == [100.0, None, 7.0]
+    
+    def test_include_names(self, converter, sample_analytics_data):
+        """Test name columns resolved from metaData items"""
+        sample_analytics_data["metaData"]["items"] = {
+            "DE123": {"name": "ANC 1st visit"},
+            "DE789": {"name": "ANC 2nd visit"},
+            "OU456": {"name": "Bo"},
+            "202301": {"name": "January 2023"},
+            "CO1": {"name": "default"},
+        }
+        table = converter.to_table(sample_analytics_data, include_names=True)
+        
+        assert table.column_names[-4:] == ["dxName", "peName", "ouName", "coName"]
+        assert table.column("dxName").to_pylist() == ["ANC 1st visit", "ANC 1st visit", "ANC 2nd visit"]
+        assert table.column("peName").to_pylist() == ["January 2023", None, "January 2023"]
+        assert table.column("coName").to_pylist() == ["default", None, "default"]
+        
+        # One dictionary entry per distinct name, not per row
+        ou_names = table.column("ouName").combine_chunks()
+        assert pa.types.is_dictionary(ou_names.type)
+        assert ou_names.dictionary.to_pylist() == ["Bo"]
+    
+    def test_names_ignored_without_long_format(self, converter, sample_analytics_data):
+        """Test that wide format does not add name columns"""
+        table = converter.to_table(sample_analytics_data, long_format=False, include_names=True)
+        assert "dxName" not in table.column_names
+    
+    def test_from_csv(self, converter, sample_analytics_data):
+        """Test that a CSV body gives the same table as the JSON rows"""
+        body = (
+            "\ufeffData,Category option combo,Period,Organisation unit,Value\r\n"
+            "DE123,CO1,202301,OU456,100\r\n"
+            "DE123,CO2,202302,OU456,1.5\r\n"
+            "DE789,CO1,202301,OU456,200\r\n"
+        ).encode("utf-8")
+        
+        assert converter.from_csv(body).equals(converter.to_table(sample_analytics_data))
+        assert converter.from_csv(body, long_format=False).column_names == ["dx", "co", "pe", "ou", "value"]
+        assert converter.from_csv(b"").num_columns == 0
+    
+    def test_from_csv_unparseable_values(self, converter):
+        """Test that CSV values that are not numbers become null"""
+        body = b"dx,pe,ou,value\nDE1,202301,OU1,5\nDE1,202302,OU1,\nDE1,202303,OU1,n/a\n"
+        table = converter.from_csv(body)
+        
+        assert table.column("value").to_pylist() == [5.0, None, None]
+        assert table.column("period").to_pylist() == ["202301", "202302", "202303"]
+    
+    def test_empty_response(self, converter):
+        """Test that missing rows give an empty table and frame"""
+        table = converter.to_table({"headers": [{"name": "dx"}], "rows": []})
+        
+        assert table.num_columns == 0
+        assert converter.to_pandas(table).empty
+    
+    def test_to_pandas_view(self, converter, sample_analytics_data):
+        """Test that the DataFrame view has plain string dimension columns"""
+        df = converter.to_pandas(converter.to_table(sample_analytics_data))
+        
+        assert df["dx"].dtype == object
+        assert df["value"].dtype == np.float64
+        assert df["orgUnit"].tolist() == ["OU456"] * 3
+    
+    def test_from_pandas_round_trip(self, converter, sample_analytics_data):
+        """Test that a long-format frame converts back to an encoded table"""
+        table = converter.to_table(sample_analytics_data)
+        round_trip = converter.from_pandas(converter.to_pandas(table))
+        
+        assert round_trip.equals(table)
+
+
+class TestCategoricalColumns:
+    """Tests for categorical identifier columns"""
+    
+    @pytest.fixture
+    def analytics_data(self):
+        """Analytics response with repeated identifiers"""
+        return {
+            "headers": [
+                {"name": "dx", "column": "Data", "type": "TEXT"},
+                {"name": "pe", "column": "Period", "type": "TEXT"},
+                {"name": "ou", "column": "Organisation unit", "type": "TEXT"},
+                {"name": "value", "column": "Value", "type": "NUMBER"}
+            ],
+            "rows": [["DE1", "202301", f"OU{i % 3}", str(i)] for i in range(9)]
+        }
+    
+    def test_analytics_categorical(self, analytics_data):
+        """Test categorical dimension columns in analytics frames"""
+        df = AnalyticsDataFrameConverter().to_dataframe(analytics_data, categorical=True)
+        
+        for col in ["dx", "period", "orgUnit"]:
+            assert isinstance(df[col].dtype, pd.CategoricalDtype)
+        assert sorted(df["orgUnit"].cat.categories) == ["OU0", "OU1", "OU2"]
+        assert df["value"].dtype == np.float64
+    
+    def test_small_frames_stay_object(self, analytics_data):
+        """Test that the default leaves small frames with object columns"""
+        df = AnalyticsDataFrameConverter().to_dataframe(analytics_data)
+        assert df["orgUnit"].dtype == object
+    
+    def test_large_frames_default_categorical(self, monkeypatch, analytics_data):
+        """Test that the default switches to categoricals above the row threshold"""
+        from pydhis2.io import to_pandas
+        monkeypatch.setattr(to_pandas, "CATEGORICAL_MIN_ROWS", 5)
+        
+        analytics_df = AnalyticsDataFrameConverter().to_dataframe(analytics_data)
+        dvs_df = DataValueSetsConverter().to_dataframe({"dataValues": [
+            {"dataElement": "DE1", "period": "202301", "orgUnit": f"OU{i % 2}", "value": "1"}
+            for i in range(6)
+        ]})
+        
+        assert isinstance(analytics_df["orgUnit"].dtype, pd.CategoricalDtype)
+        assert isinstance(dvs_df["dataElement"].dtype, pd.CategoricalDtype)
+        assert dvs_df["value"].tolist() == [1] * 6
+    
+    def test_datavaluesets_categorical(self):
+        """Test categorical identifier columns in dataValueSets frames"""
+        data = {"dataValues": [
+            {"dataElement": "DE1", "period": "202301", "orgUnit": "OU1",
+             "categoryOptionCombo": "COC1", "value": "5", "storedBy": "admin"}
+        ]}
+        df = DataValueSetsConverter().to_dataframe(data, categorical=True)
+        
+        for col in ["dataElement", "period", "orgUnit", "categoryOptionCombo"]:
+            assert isinstance(df[col].dtype, pd.CategoricalDtype)
+        assert df["storedBy"].dtype == object
+    
+    def test_categorical_memory_benchmark(self):
+        """Test that the benchmark reports memory saved by categoricals"""
+        from pydhis2.testing.benchmark_utils import benchmark_categorical_memory
+        
+        result = benchmark_categorical_memory(rows=20_000, org_unit_count=100)
+        
+        assert result["rows"] == 20_000
+        assert result["categorical_bytes"] < result["object_bytes"] / 2
+        assert result["memory_ratio"] < 0.5
+
+
 class TestDataValueSetsConverter:
     """Tests for the DataValueSetsConverter class"""
     
@@ -190,6 +382,35 @@ class TestDataValueSetsConverter:
         
         with pytest.raises(ValueError, match="Missing required columns"):
             converter.from_dataframe(incomplete_df)
+    
+    def test_from_dataframe_missing_values_per_row(self, converter):
+        """Test that each row only carries its non-missing columns, in column order"""
+        df = pd.DataFrame({
+            'dataElement': ['DE1', None, 'DE3'],
+            'period': pd.Categorical(['202301', '202301', '202302']),
+            'orgUnit': ['OU1', 'OU2', 'OU3'],
+            'value': [1.5, np.nan, 3.0],
+            'categoryOptionCombo': [None, 'CO1', None],
+            'followup': [True, None, False]
+        })
+        
+        result = converter.from_dataframe(df)
+        
+        assert result['dataValues'] == [
+            {'dataElement': 'DE1', 'period': '202301', 'orgUnit': 'OU1', 'value': '1.5', 'followup': True},
+            {'period': '202301', 'orgUnit': 'OU2', 'categoryOptionCombo': 'CO1'},
+            {'dataElement': 'DE3', 'period': '202302', 'orgUnit': 'OU3', 'value': '3.0', 'followup': False},
+        ]
+        assert list(result['dataValues'][0]) == ['dataElement', 'period', 'orgUnit', 'value', 'followup']
+    
+    def test_serialization_benchmark(self):
+        """Test that the benchmark reports a speedup over the row-by-row baseline"""
+        from pydhis2.testing.benchmark_utils import benchmark_datavalue_serialization
+        
+        result = benchmark_datavalue_serialization(rows=20_000, baseline_rows=5_000)
+        
+        assert result['baseline_rows'] == 5_000
+        assert result['speedup'] > 1
 
 
 class TestTrackerConverter:
@@ -418,6 +639,112 @@ class TestArrowConverter:
                 pass
 
 
+class TestFileBatches:
+    """Test reading files in fixed-size batches"""
+    
+    def test_parquet_batches_cross_row_groups(self, tmp_path):
+        import pyarrow.parquet as pq
+        
+        path = tmp_path / "values.parquet"
+        pq.write_table(pa.table({"value": list(range(1000))}), path, row_group_size=300)
+        
+        batches = list(ArrowConverter().iter_file_batches(path, 256))
+        
+        assert [b.num_rows for b in batches] == [256, 256, 256, 232]
+        assert batches[1].column("value")[0].as_py() == 256
+    
+    def test_csv_batches_as_strings(self, tmp_path):
+        path = tmp_path / "values.csv"
+        path.write_text("dataElement,value\n" + "".join(f"DE{i},{i:03d}\n" for i in range(10)) + "DE10,\n")
+        
+        batches = list(ArrowConverter().iter_file_batches(path, 4))
+        
+        assert [b.num_rows for b in batches] == [4, 4, 3]
+        assert batches[0].column("value").to_pylist() == ["000", "001", "002", "003"]
+        assert batches[-1].column("value").to_pylist()[-1] is None
+    
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            list(ArrowConverter().iter_file_batches(tmp_path / "values.json", 10))
+
+
+class TestPartitionedParquetStore:
+    """Test the partitioned Parquet store"""
+    
+    def test_write_read_and_reopen(self, tmp_path):
+        store = PartitionedParquetStore(str(tmp_path), partition_column="period")
+        assert not store.exists
+        store.write_partition("202301", pa.table({"period": ["202301"], "value": [1.0]}))
+        store.write_partition("202302", pa.table({"period": ["202302"] * 2, "value": [2.0, 3.0]}))
+        store.write_partition("202303", pa.table({"period": pa.array([], pa.string()), "value": pa.array([], pa.float64())}))
+        store.state["watermark"] = "2024-01-01"
+        store.save()
+        
+        reopened = PartitionedParquetStore(str(tmp_path), partition_column="period")
+        assert reopened.partitions() == ["202301", "202302", "202303"]
+        assert reopened.partition_info("202303")["rows"] == 0
+        assert reopened.state == {"watermark": "2024-01-01"}
+        assert reopened.read().column("value").to_pylist() == [1.0, 2.0, 3.0]
+        assert reopened.read(["202302"]).num_rows == 2
+        assert not list(tmp_path.glob("**/*.tmp"))
+    
+    def test_retain_drops_partitions(self, tmp_path):
+        store = PartitionedParquetStore(str(tmp_path), partition_column="period")
+        for period in ["202301", "202302", "202303"]:
+            store.write_partition(period, pa.table({"period": [period]}))
+        
+        assert store.retain(["202303", "202302"]) == ["202301"]
+        assert store.partitions() == ["202303", "202302"]
+        assert not (tmp_path / "period=202301").exists()
+    
+    def test_partition_column_mismatch(self, tmp_path):
+        PartitionedParquetStore(str(tmp_path), partition_column="period").save()
+        with pytest.raises(ValueError):
+            PartitionedParquetStore(str(tmp_path), partition_column="orgUnit")
+
+
+class TestDataValueIndex:
+    """Test the data value hash index used by delta pushes"""
+    
+    def test_changed_update_and_reopen(self, tmp_path):
+        path = tmp_path / "index.parquet"
+        values = [
+            {"dataElement": "DE1", "period": "202401", "orgUnit": f"OU{i}", "value": str(i)}
+            for i in range(5)
+        ]
+        index = DataValueIndex(path)
+        keys, hashes = index.hash_values(values)
+        assert index.changed(keys, hashes).all()
+        
+        index.update(keys, hashes)
+        index.save()
+        reopened = DataValueIndex(path)
+        assert len(reopened) == 5
+        
+        edited = [dict(v) for v in values]
+        edited[1]["value"] = "100"
+        edited[3]["comment"] = "checked"
+        edited.append({"dataElement": "DE1", "period": "202401", "orgUnit": "OU0",
+                       "categoryOptionCombo": "COC1", "value": "0"})
+        keys, hashes = reopened.hash_values(edited)
+        assert reopened.changed(keys, hashes).tolist() == [False, True, False, True, False, True]
+    
+    def test_update_keeps_last_and_remove(self, tmp_path):
+        index = DataValueIndex(tmp_path / "index.parquet")
+        values = [
+            {"dataElement": "DE1", "period": "202401", "orgUnit": "OU1", "value": "1"},
+            {"dataElement": "DE1", "period": "202401", "orgUnit": "OU1", "value": "2"},
+            {"dataElement": "DE2", "period": "202401", "orgUnit": "OU1", "value": "3"},
+        ]
+        keys, hashes = index.hash_values(values)
+        index.update(keys, hashes)
+        
+        assert len(index) == 2
+        assert index.changed(keys, hashes).tolist() == [True, False, False]
+        index.remove(keys[2:])
+        assert index.changed(keys, hashes).tolist() == [True, False, True]
+
+
 class TestImportSummaryConverter:
     """Tests for the ImportSummaryConverter class"""
     
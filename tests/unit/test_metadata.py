@@ -8,7 +8,8 @@ from unittest.mock import AsyncMock, patch
 import pandas as pd
 import pytest
 
-from pydhis2.endpoints.metadata import MetadataEndpoint, MetadataImportSummary
+from pydhis2.core.cache import HTTPCache
+from pydhis2.endpoints.metadata import MetadataCache, MetadataEndpoint, MetadataImportSummary
 from pydhis2.core.errors import ImportConflictError
 from pydhis2.core.types import ExportFormat
 
@@ -515,6 +516,101 @@ class TestMetadataEndpoint:
         )
 
 
+class TestMetadataCache:
+    """Tests for the long-TTL metadata cache tier"""
+    
+    @pytest.fixture
+    def server_state(self):
+        """Mutable server-side state for the fake client"""
+        return {'lastUpdated': '2024-01-01T00:00:00.000', 'total': 2, 'version': 1}
+    
+    @pytest.fixture
+    def client(self, server_state):
+        """Fake client answering probes and full fetches"""
+        async def fake_get(endpoint, params=None, **kwargs):
+            if params and params.get('fields') == 'lastUpdated':
+                return {
+                    'pager': {'page': 1, 'total': server_state['total']},
+                    'dataElements': [{'lastUpdated': server_state['lastUpdated']}],
+                }
+            return {'dataElements': [{'id': 'de1', 'version': server_state['version']}]}
+        
+        client = AsyncMock()
+        client.get.side_effect = fake_get
+        client._build_url = lambda endpoint: f"https://test.dhis2.org{endpoint}"
+        return client
+    
+    @pytest.fixture
+    def endpoint(self, client, tmp_path):
+        """Metadata endpoint with the cache tier enabled"""
+        cache = MetadataCache(HTTPCache(cache_dir=tmp_path, ttl=3600), probe_interval=0)
+        return MetadataEndpoint(client, metadata_cache=cache)
+    
+    def _full_fetches(self, client):
+        return [c for c in client.get.call_args_list if c.kwargs['params'].get('fields') != 'lastUpdated']
+    
+    async def test_unchanged_metadata_served_from_cache(self, endpoint, client):
+        """Test that an unchanged object type is not downloaded again"""
+        first = await endpoint.get_data_elements()
+        second = await endpoint.get_data_elements()
+        
+        assert first == second
+        assert len(self._full_fetches(client)) == 1
+        assert endpoint.metadata_cache.get_stats()['hits'] == 1
+        assert endpoint.metadata_cache.get_stats()['probes'] == 2
+    
+    async def test_probe_request(self, endpoint, client):
+        """Test that the probe asks for a single lastUpdated value"""
+        await endpoint.get_data_elements()
+        
+        probe_call = client.get.call_args_list[0]
+        assert probe_call.args[0] == '/api/dataElements'
+        assert probe_call.kwargs['params']['order'] == 'lastUpdated:desc'
+        assert probe_call.kwargs['params']['pageSize'] == 1
+    
+    async def test_updated_object_invalidates(self, endpoint, client, server_state):
+        """Test that a newer lastUpdated triggers a re-fetch"""
+        await endpoint.get_data_elements()
+        server_state.update(lastUpdated='2024-02-01T00:00:00.000', version=2)
+        
+        result = await endpoint.get_data_elements()
+        
+        assert result['dataElements'][0]['version'] == 2
+        assert len(self._full_fetches(client)) == 2
+        assert endpoint.metadata_cache.get_stats()['invalidations'] == 1
+    
+    async def test_deleted_object_invalidates(self, endpoint, client, server_state):
+        """Test that a changed object count triggers a re-fetch"""
+        await endpoint.get_data_elements()
+        server_state['total'] = 1
+        
+        await endpoint.get_data_elements()
+        
+        assert len(self._full_fetches(client)) == 2
+    
+    async def test_probe_interval(self, client, tmp_path):
+        """Test that probe results are reused within the probe interval"""
+        cache = MetadataCache(HTTPCache(cache_dir=tmp_path), probe_interval=60)
+        endpoint = MetadataEndpoint(client, metadata_cache=cache)
+        
+        await endpoint.get_data_elements()
+        await endpoint.get_data_elements(fields="id,name")
+        await endpoint.get_data_elements()
+        
+        assert cache.get_stats()['probes'] == 1
+        assert len(self._full_fetches(client)) == 2
+    
+    async def test_cache_survives_restart(self, client, tmp_path):
+        """Test that a new run reuses entries stored by an earlier one"""
+        endpoint = MetadataEndpoint(client, metadata_cache=MetadataCache(HTTPCache(cache_dir=tmp_path)))
+        await endpoint.get_option_sets()
+        
+        endpoint = MetadataEndpoint(client, metadata_cache=MetadataCache(HTTPCache(cache_dir=tmp_path)))
+        await endpoint.get_option_sets()
+        
+        assert len(self._full_fetches(client)) == 1
+
+
 class TestMetadataIntegration:
     """Tests for metadata endpoint integration scenarios"""
     
@@ -0,0 +1,488 @@
+"""Tests for the analytics query planner and partitioned fetching"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pandas as pd
+import pytest
+
+from pydhis2.core.errors import DHIS2HTTPError, PartitionFetchError
+from pydhis2.core.planner import (
+    AdaptiveChunkSizer,
+    OrgUnitIndex,
+    QueryCostEstimator,
+    QueryPlanner,
+    is_literal_item,
+    query_dimension_items,
+    relative_period_count,
+)
+from pydhis2.core.types import AnalyticsQuery
+from pydhis2.endpoints.analytics import AnalyticsEndpoint
+
+PERIODS = [f"2023{m:02d}" for m in range(1, 13)]
+ORG_UNITS = ["OU1", "OU2", "OU3"]
+DATA_ELEMENTS = ["DE1", "DE2"]
+
+
+def fake_analytics_response(params):
+    """Build an analytics response for the items requested in params"""
+    items = {}
+    for dimension in params["dimension"]:
+        name, values = dimension.split(":", 1)
+        items[name] = values.split(";")
+
+    rows = []
+    for dx in items["dx"]:
+        for pe in items["pe"]:
+            for ou in items["ou"]:
+                value = int(dx[-1]) * 100 + int(pe[-2:]) + int(ou[-1])
+                rows.append([dx, pe, ou, str(value)])
+    return {
+        "headers": [
+            {"name": "dx", "column": "Data", "type": "TEXT"},
+            {"name": "pe", "column": "Period", "type": "TEXT"},
+            {"name": "ou", "column": "Organisation unit", "type": "TEXT"},
+            {"name": "value", "column": "Value", "type": "NUMBER"}
+        ],
+        "rows": rows,
+        "metaData": {"items": {}, "dimensions": {}},
+    }
+
+
+def sort_frame(df):
+    """Sort a long analytics frame by its dimension columns"""
+    return df.sort_values(["dx", "period", "orgUnit"]).reset_index(drop=True)
+
+
+class TestQueryPlanner:
+    """Tests for the QueryPlanner class"""
+
+    def test_estimate_cells(self):
+        """Test that cells are the product of dimension item counts"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+        assert QueryPlanner.estimate_cells(query) == 2 * 3 * 12
+
+    def test_no_split_under_budget(self):
+        """Test that a query within the budget is a single partition"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+        partitions = QueryPlanner(max_cells=100).partition(query)
+
+        assert len(partitions) == 1
+        assert partitions[0].query is query
+
+    def test_split_by_period_first(self):
+        """Test that periods are split before other dimensions"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+        partitions = QueryPlanner(max_cells=24).partition(query)
+
+        assert len(partitions) == 3
+        assert [p.index for p in partitions] == [0, 1, 2]
+        assert all(p.cells <= 24 for p in partitions)
+        assert all(p.query.ou == ORG_UNITS for p in partitions)
+        split_periods = [pe for p in partitions for pe in p.query.pe]
+        assert split_periods == PERIODS
+
+    def test_split_falls_through_dimensions(self):
+        """Test that later dimensions are split once periods are single items"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+        partitions = QueryPlanner(max_cells=2).partition(query)
+
+        assert all(p.cells <= 2 for p in partitions)
+        assert sum(p.cells for p in partitions) == 72
+
+    def test_unsplittable_partition_kept(self):
+        """Test that single-item dimensions stay over budget rather than fail"""
+        query = AnalyticsQuery(dx="DE1", ou="OU1", pe="2023")
+        partitions = QueryPlanner(max_cells=1).partition(query)
+        assert len(partitions) == 1
+
+    def test_invalid_budget(self):
+        """Test that a non-positive budget is rejected"""
+        with pytest.raises(ValueError):
+            QueryPlanner(max_cells=0)
+
+    def test_overlapping_items(self):
+        """Test detection of partitions that may return the same rows"""
+        planner = QueryPlanner(max_cells=1)
+        literal = planner.partition(AnalyticsQuery(dx="DE1", ou=ORG_UNITS, pe="2023"))
+        keyword = planner.partition(AnalyticsQuery(dx="DE1", ou=["OU1", "OU2", "LEVEL-3"], pe="2023"))
+
+        assert not planner.has_overlapping_items(literal)
+        assert planner.has_overlapping_items(keyword)
+
+    def test_split_first(self):
+        """Test splitting off the leading chunk of a query"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+        head, rest = QueryPlanner(max_cells=30).split_first(query)
+
+        assert head.pe == PERIODS[:5]
+        assert rest.pe == PERIODS[5:]
+        assert QueryPlanner(max_cells=100).split_first(query) == (query, None)
+
+    def test_split_keeps_org_unit_selectors(self):
+        """Test that LEVEL-/OU_GROUP- selectors stay with the boundary units they apply to"""
+        planner = QueryPlanner(max_cells=1)
+        query = AnalyticsQuery(dx="DE1", ou=["OU1", "OU2", "OU3", "LEVEL-3"], pe="2023")
+        ou_chunks = [p.query.ou for p in planner.partition(query)]
+        assert ou_chunks == [["OU1", "LEVEL-3"], ["OU2", "LEVEL-3"], ["OU3", "LEVEL-3"]]
+
+        # Around a single boundary unit the selectors are split instead
+        query = AnalyticsQuery(dx="DE1", ou="ImspTQPwCqd;LEVEL-2;OU_GROUP-abc", pe="2023")
+        ou_chunks = [p.query.ou for p in planner.partition(query)]
+        assert ou_chunks == [["LEVEL-2", "ImspTQPwCqd"], ["OU_GROUP-abc", "ImspTQPwCqd"]]
+
+        # A boundary unit and one selector cannot be split
+        query = AnalyticsQuery(dx="DE1", ou="ImspTQPwCqd;LEVEL-2", pe="2023")
+        assert planner.split_first(query) == (query, None)
+
+        # Selectors alone select under the user's units and split freely
+        query = AnalyticsQuery(dx="DE1", ou="LEVEL-2;LEVEL-3", pe="2023")
+        assert [p.query.ou for p in planner.partition(query)] == [["LEVEL-2"], ["LEVEL-3"]]
+
+    def test_dimension_items(self):
+        """Test dimension item extraction and keyword detection"""
+        items = query_dimension_items(AnalyticsQuery(dx="DE1;DE2", ou="OU1", pe=["2023"]))
+        assert items == {"dx": ("DE1", "DE2"), "ou": ("OU1",), "pe": ("2023",)}
+        assert is_literal_item("202301")
+        assert not is_literal_item("LAST_12_MONTHS")
+        assert not is_literal_item("LEVEL-3")
+
+
+class TestPartitionedFetch:
+    """Tests for partitioned analytics fetching"""
+
+    @pytest.fixture
+    def analytics_endpoint(self):
+        """Analytics endpoint backed by a fake analytics server"""
+        client = AsyncMock()
+        client.config.concurrency = 4
+
+        async def fake_get(endpoint, params=None, **kwargs):
+            return fake_analytics_response(params)
+
+        client.get.side_effect = fake_get
+        endpoint = AnalyticsEndpoint(client)
+        endpoint.partition_retry_delay = 0
+        return endpoint
+
+    @pytest.mark.asyncio
+    async def test_merged_result_matches_unsplit(self, analytics_endpoint):
+        """Test that the merged partitions equal the unsplit result"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+
+        unsplit = await analytics_endpoint.to_pandas(query)
+        split = await analytics_endpoint.to_pandas(query, max_cells=10, concurrency=2)
+
+        assert analytics_endpoint.client.get.call_count > 2
+        pd.testing.assert_frame_equal(sort_frame(split), sort_frame(unsplit))
+
+    @pytest.mark.asyncio
+    async def test_to_arrow_partitioned(self, analytics_endpoint):
+        """Test that to_arrow accepts a cell budget"""
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+        table = await analytics_endpoint.to_arrow(query, max_cells=36)
+
+        assert table.num_rows == 72
+        assert analytics_endpoint.client.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_partition_retried_alone(self, analytics_endpoint):
+        """Test that only the failing partition is fetched again"""
+        calls = []
+        failures = {"remaining": 1}
+
+        async def flaky_get(endpoint, params=None, **kwargs):
+            calls.append(params["dimension"])
+            if "pe:202302" in params["dimension"] and failures["remaining"]:
+                failures["remaining"] -= 1
+                raise ConnectionError("connection reset")
+            return fake_analytics_response(params)
+
+        analytics_endpoint.client.get.side_effect = flaky_get
+        query = AnalyticsQuery(dx="DE1", ou=ORG_UNITS, pe=PERIODS[:3])
+
+        df = await analytics_endpoint.to_pandas(query, max_cells=3)
+
+        assert len(df) == 9
+        assert len(calls) == 4
+        assert sum("pe:202302" in dims for dims in calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_partition_fetch_error(self, analytics_endpoint):
+        """Test that a partition failing all retries raises PartitionFetchError"""
+        async def failing_get(endpoint, params=None, **kwargs):
+            if "pe:202303" in params["dimension"]:
+                raise ConnectionError("connection reset")
+            return fake_analytics_response(params)
+
+        analytics_endpoint.client.get.side_effect = failing_get
+        analytics_endpoint.partition_retries = 1
+        query = AnalyticsQuery(dx="DE1", ou=ORG_UNITS, pe=PERIODS[:3])
+
+        with pytest.raises(PartitionFetchError) as exc_info:
+            await analytics_endpoint.to_pandas(query, max_cells=3)
+
+        assert exc_info.value.failed_partitions == [2]
+        assert exc_info.value.total_partitions == 3
+        assert "connection reset" in exc_info.value.errors[0]
+
+    @pytest.mark.asyncio
+    async def test_keyword_partitions_deduplicated(self, analytics_endpoint):
+        """Test that rows returned by several keyword partitions appear once"""
+        async def keyword_get(endpoint, params=None, **kwargs):
+            # OU2 lies under OU1, so both partitions return its level-3 unit OU3
+            params = dict(params)
+            params["dimension"] = [
+                "ou:OU3" if d.startswith("ou:") else d for d in params["dimension"]
+            ]
+            return fake_analytics_response(params)
+
+        analytics_endpoint.client.get.side_effect = keyword_get
+        query = AnalyticsQuery(dx="DE1", ou=["OU1", "OU2", "LEVEL-3"], pe="202301")
+
+        df = await analytics_endpoint.to_pandas(query, max_cells=1)
+
+        assert analytics_endpoint.client.get.call_count == 2
+        assert len(df) == 1
+
+
+class TestAdaptiveChunkSizer:
+    """Tests for the AdaptiveChunkSizer class"""
+
+    def test_grows_under_target_latency(self):
+        """Test that fast responses grow the chunk size up to the maximum"""
+        sizer = AdaptiveChunkSizer(initial_cells=1000, min_cells=100, max_cells=2000, target_latency=5.0)
+        sizer.record_response(1000, 1.0)
+        assert sizer.current_cells == 1250
+
+        for _ in range(10):
+            sizer.record_response(sizer.current_cells, 1.0)
+        assert sizer.current_cells == 2000
+
+    def test_shrinks_on_overload(self):
+        """Test that timeouts and 5xx responses shrink the chunk size"""
+        sizer = AdaptiveChunkSizer(initial_cells=1000, min_cells=100, max_cells=2000)
+        sizer.record_response(1000, 30.0, status_code=504)
+        assert sizer.current_cells == 500
+        assert sizer.learned_ceiling == 1000
+
+        sizer.record_response(500, 30.0, timed_out=True)
+        sizer.record_response(250, 30.0, status_code=500)
+        sizer.record_response(125, 30.0, status_code=413)
+        assert sizer.current_cells == 100
+
+    def test_ceiling_caps_growth(self):
+        """Test that growth stops below the smallest failing chunk size"""
+        sizer = AdaptiveChunkSizer(initial_cells=1000, min_cells=100, max_cells=10_000, target_latency=5.0)
+        sizer.record_response(1000, 3.0, status_code=503)
+        for _ in range(10):
+            sizer.record_response(sizer.current_cells, 3.0)
+
+        assert sizer.current_cells == 900
+        assert sizer.learned_ceiling == 1000
+
+        # A fast response near the ceiling forgets it
+        sizer.record_response(900, 1.0)
+        assert sizer.learned_ceiling is None
+
+    def test_slow_success_scales_down(self):
+        """Test that a slow but successful chunk scales towards the target"""
+        sizer = AdaptiveChunkSizer(initial_cells=1000, min_cells=100, target_latency=5.0)
+        sizer.record_response(1000, 20.0)
+        assert sizer.current_cells == 250
+
+    def test_stats(self):
+        """Test the exported chunk sizing statistics"""
+        sizer = AdaptiveChunkSizer(initial_cells=1000, min_cells=100, max_cells=2000)
+        sizer.record_response(1000, 2.0)
+        sizer.record_response(1250, 4.0, status_code=502)
+        stats = sizer.get_stats()
+
+        assert stats["current_cells"] == sizer.current_cells
+        assert stats["learned_ceiling"] == 1250
+        assert stats["total_requests"] == 2
+        assert stats["error_count"] == 1
+        assert stats["avg_response_time"] == 3.0
+
+    def test_invalid_bounds(self):
+        """Test that inconsistent bounds are rejected"""
+        with pytest.raises(ValueError):
+            AdaptiveChunkSizer(initial_cells=10, min_cells=100)
+
+    def test_per_cell_latency_holds_growth(self):
+        """Test that growth pauses once larger chunks get slower per cell"""
+        sizer = AdaptiveChunkSizer(
+            initial_cells=1000, min_cells=100, max_cells=10_000, target_latency=10.0, per_cell_tolerance=0.5
+        )
+        sizer.record_response(1000, 3.0)
+        assert sizer.current_cells == 1250
+        assert sizer.best_cell_latency == 0.003
+
+        # 1250 cells in 6s is twice as slow per cell: hold the size
+        sizer.record_response(1250, 6.0)
+        assert sizer.current_cells == 1250
+
+        # Back to flat per-cell latency: keep growing
+        sizer.record_response(1250, 3.75)
+        assert sizer.current_cells == 1562
+
+    def test_failure_status(self):
+        """Test how failed requests are classified"""
+        assert AdaptiveChunkSizer.failure_status(DHIS2HTTPError(413, "/api/dataValueSets")) == (413, False)
+        assert AdaptiveChunkSizer.failure_status(asyncio.TimeoutError()) == (408, True)
+        assert AdaptiveChunkSizer.failure_status(ValueError("bad")) == (0, False)
+
+
+class TestAdaptiveFetch:
+    """Tests for analytics fetching with an adaptive chunk size"""
+
+    @pytest.mark.asyncio
+    async def test_timeout_splits_chunk(self):
+        """Test that a chunk failing with 504 is split at the reduced size"""
+        client = AsyncMock()
+        client.config.concurrency = 2
+        requested = []
+
+        async def fake_get(endpoint, params=None, **kwargs):
+            requested.append(params["dimension"])
+            pe = next(d for d in params["dimension"] if d.startswith("pe:"))
+            if len(pe.split(";")) > 6:
+                raise DHIS2HTTPError(504, "/api/analytics")
+            return fake_analytics_response(params)
+
+        client.get.side_effect = fake_get
+        sizer = AdaptiveChunkSizer(initial_cells=72, min_cells=1, max_cells=1000)
+        endpoint = AnalyticsEndpoint(client, chunk_sizer=sizer)
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS)
+
+        df = await endpoint.to_pandas(query)
+
+        assert len(df) == 72
+        assert sizer.learned_ceiling == 72
+        assert sizer.get_stats()["error_count"] == 1
+        assert len(requested) > 2
+
+        expected = AnalyticsEndpoint(AsyncMock()).converter.to_dataframe(
+            fake_analytics_response(query.to_params())
+        )
+        pd.testing.assert_frame_equal(sort_frame(df), sort_frame(expected))
+
+    @pytest.mark.asyncio
+    async def test_client_stats_include_chunking(self):
+        """Test that the client exports chunk sizing statistics"""
+        from pydhis2.core.client import AsyncDHIS2Client
+        from pydhis2.core.types import DHIS2Config
+
+        config = DHIS2Config(
+            base_url="http://localhost:8080",
+            auth=("admin", "district"),
+            enable_cache=False,
+            analytics_adaptive_chunking=True,
+        )
+        client = AsyncDHIS2Client(config)
+        client._init_endpoints()
+
+        assert client.get_stats()["analytics_chunking"]["current_cells"] == 50_000
+        assert client.get_stats()["push_chunking"] is None
+
+        config = config.model_copy(update={"push_adaptive_chunking": True})
+        client = AsyncDHIS2Client(config)
+        client._init_endpoints()
+        assert client.get_stats()["push_chunking"]["current_cells"] == 5000
+
+
+def sample_hierarchy():
+    """A country with 4 districts of 25 facilities each"""
+    units = [{"id": "ROOT", "level": 1, "path": "/ROOT"}]
+    for d in range(4):
+        units.append({"id": f"D{d}", "level": 2, "path": f"/ROOT/D{d}"})
+        for f in range(25):
+            units.append({"id": f"F{d}{f:02d}", "level": 3, "path": f"/ROOT/D{d}/F{d}{f:02d}"})
+    return units
+
+
+class TestQueryCostEstimator:
+    """Test the preflight cost estimator"""
+
+    def test_relative_period_count(self):
+        assert relative_period_count("LAST_12_MONTHS") == 12
+        assert relative_period_count("LAST_52_WEEKS") == 52
+        assert relative_period_count("QUARTERS_THIS_YEAR") == 4
+        assert relative_period_count("MONTHS_LAST_YEAR") == 12
+        assert relative_period_count("THIS_FINANCIAL_YEAR") == 1
+        assert relative_period_count("TODAY") == 1
+        assert relative_period_count("202301") is None
+
+    def test_org_unit_index(self):
+        index = OrgUnitIndex(sample_hierarchy(), user_org_units=["D1"], groups={"G1": ["F000", "F101"]})
+
+        assert index.resolve(["LEVEL-3"]) == (25, [])  # under the user's district
+        assert index.resolve(["ROOT", "LEVEL-3"]) == (100, [])
+        assert index.resolve(["D0", "D2", "LEVEL-3"]) == (50, [])
+        assert index.resolve(["USER_ORGUNIT", "USER_ORGUNIT_CHILDREN"]) == (26, [])
+        assert index.resolve(["ROOT", "OU_GROUP-G1"]) == (2, [])
+        assert index.resolve(["OU_GROUP-G2", "D0"]) == (2, ["OU_GROUP-G2"])
+        assert index.resolve(["D0", "D1"]) == (2, [])
+
+    def test_org_unit_subtrees(self):
+        index = OrgUnitIndex(sample_hierarchy())
+
+        assert index.subtrees(["ROOT"], 2) == (["D0", "D1", "D2", "D3"], ["ROOT"])
+        subtrees, upper = index.subtrees(["D1"], 3)
+        assert len(subtrees) == 25 and all(uid.startswith("F1") for uid in subtrees)
+        assert upper == ["D1"]
+        # Roots at or below the level, and unknown roots, are subtrees themselves
+        assert index.subtrees(["F000", "D2", "XX"], 2) == (["D2", "F000", "XX"], [])
+
+    def test_explain_without_metadata(self):
+        query = AnalyticsQuery(dx=DATA_ELEMENTS, ou="LEVEL-3", pe="LAST_12_MONTHS")
+        explanation = query.explain()
+
+        assert explanation.dimension_counts == {"dx": 2, "ou": 1, "pe": 12}
+        assert explanation.cells == 24
+        assert explanation.unresolved_items == ["LEVEL-3"]
+        assert explanation.warnings
+        assert explanation.fetch_options() == {"max_cells": None, "concurrency": 1, "transport": "json"}
+
+    def test_explain_picks_split_and_transport(self):
+        index = OrgUnitIndex(sample_hierarchy(), user_org_units=["ROOT"])
+        query = AnalyticsQuery(dx=[f"DE{i}" for i in range(100)], ou="LEVEL-3", pe=PERIODS)
+        explanation = query.explain(org_units=index, max_cells=100_000, max_concurrency=4)
+
+        assert explanation.cells == 120_000
+        assert explanation.partitions == 2
+        assert explanation.split_dimensions == ["pe"]
+        assert explanation.concurrency == 2
+        assert explanation.transport == "csv"
+        assert query.explain(org_units=index, include_names=True).transport == "json"
+        assert "120,000" in str(explanation)
+
+    def test_explain_unsplittable(self):
+        index = OrgUnitIndex(sample_hierarchy(), user_org_units=["ROOT"])
+        query = AnalyticsQuery(dx="DE1", ou="LEVEL-3", pe="LAST_52_WEEKS")
+        explanation = QueryCostEstimator(org_units=index, max_cells=1_000).explain(query)
+
+        assert explanation.cells == 5_200
+        assert explanation.needs_split
+        assert explanation.partitions == 1
+        assert any("partition" in warning for warning in explanation.warnings)
+
+    @pytest.mark.asyncio
+    async def test_endpoint_explain_uses_metadata(self):
+        client = AsyncMock()
+        client.config.concurrency = 3
+        client.metadata.get_organisation_units.return_value = {"organisationUnits": sample_hierarchy()}
+        client.get.return_value = {"organisationUnits": [{"id": "D2"}]}
+        endpoint = AnalyticsEndpoint(client)
+
+        explanation = await endpoint.explain(
+            AnalyticsQuery(dx=DATA_ELEMENTS, ou="USER_ORGUNIT;LEVEL-3", pe=PERIODS)
+        )
+        assert explanation.dimension_counts["ou"] == 25
+        assert explanation.cells == 600
+        client.get.assert_called_once_with("/api/me", params={"fields": "organisationUnits[id]"})
+        client.metadata.get_organisation_unit_groups.assert_not_called()
+
+        client.reset_mock()
+        await endpoint.explain(AnalyticsQuery(dx=DATA_ELEMENTS, ou=ORG_UNITS, pe=PERIODS))
+        client.metadata.get_organisation_units.assert_not_called()